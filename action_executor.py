@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Исполнитель побочных действий вне event loop
+Буфер обмена, браузер и звуковые уведомления выполняются в пуле потоков
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ActionExecutor:
+    """Очередь действий с таймаутами и сохранением порядка в пределах тикера"""
+
+    def __init__(self, workers: int = 2, timeout: float = 5.0):
+        """
+        Args:
+            workers: Количество потоков для действий
+            timeout: Таймаут одного действия в секундах по умолчанию
+        """
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='actions')
+        # Для каждого тикера своя очередь и задача-обработчик: действия одного
+        # тикера выполняются строго по порядку, разных тикеров - параллельно
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._consumers: Dict[str, asyncio.Task] = {}
+        self.stats = {
+            'actions_submitted': 0,
+            'actions_completed': 0,
+            'actions_failed': 0,
+            'actions_timed_out': 0
+        }
+
+    def submit(self, key: str, name: str, func: Callable, *args, timeout: Optional[float] = None,
+               on_done: Optional[Callable[[], None]] = None):
+        """
+        Ставит действие в очередь, не блокируя event loop
+
+        Args:
+            key: Ключ упорядочивания (тикер)
+            name: Название действия для логов
+            func: Блокирующая функция
+            timeout: Таймаут действия (по умолчанию self.timeout)
+            on_done: Вызывается в event loop после завершения действия (в том числе с ошибкой)
+        """
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._queues[key] = queue
+            self._consumers[key] = asyncio.create_task(self._consume(key, queue))
+        queue.put_nowait((name, func, args, timeout or self.timeout, on_done))
+        self.stats['actions_submitted'] += 1
+
+    async def _consume(self, key: str, queue: asyncio.Queue):
+        """Последовательно выполняет действия одного тикера"""
+        loop = asyncio.get_running_loop()
+        try:
+            while not queue.empty():
+                name, func, args, timeout, on_done = queue.get_nowait()
+                try:
+                    await asyncio.wait_for(loop.run_in_executor(self._pool, func, *args), timeout)
+                    self.stats['actions_completed'] += 1
+                except asyncio.TimeoutError:
+                    # Поток нельзя прервать - просто перестаем его ждать
+                    self.stats['actions_timed_out'] += 1
+                    logger.warning(f"⏱️ Действие {name} для {key} превысило таймаут {timeout} с")
+                except Exception as e:
+                    self.stats['actions_failed'] += 1
+                    logger.error(f"Ошибка действия {name} для {key}: {e}")
+                finally:
+                    queue.task_done()
+                    if on_done is not None:
+                        try:
+                            on_done()
+                        except Exception as e:
+                            logger.error(f"Ошибка обработчика завершения {name} для {key}: {e}")
+        finally:
+            # Очередь пуста - освобождаем ключ, новое действие создаст новую очередь
+            del self._queues[key]
+            del self._consumers[key]
+
+    async def join(self):
+        """Дожидается выполнения всех поставленных действий"""
+        while self._consumers:
+            await asyncio.gather(*list(self._consumers.values()))
+
+    async def shutdown(self, timeout: float = 5.0):
+        """Дожидается выполнения очереди (не дольше timeout) и останавливает пул потоков"""
+        consumers = list(self._consumers.values())
+        if consumers:
+            done, pending = await asyncio.wait(consumers, timeout=timeout)
+            # Не начатые действия отбрасываем: отмена задачи может потеряться в wait_for,
+            # и обработчик попытался бы отправить их в уже остановленный пул
+            dropped = 0
+            for queue in self._queues.values():
+                while not queue.empty():
+                    queue.get_nowait()
+                    queue.task_done()
+                    dropped += 1
+            if dropped:
+                logger.warning(f"⚠️ Остановка: отброшено {dropped} невыполненных действий")
+            for task in pending:
+                task.cancel()
+        self._pool.shutdown(wait=False)
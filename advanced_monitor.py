@@ -5,52 +5,50 @@
 Автоматически обрабатывает все сообщения от настроенных ботов
 """
 
+# Первым: отсчет времени запуска начинается до остальных импортов
+from startup import STARTUP
+
 import asyncio
 import json
 import logging
-import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
-import webbrowser
-import pyperclip
-import re
-
-try:
-    from telethon import TelegramClient, events
-    from telethon.tl.types import User
-except ImportError:
-    print("❌ Ошибка: Необходимо установить telethon")
-    print("Выполните: pip install telethon")
-    sys.exit(1)
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from corpus import collect_button_urls, collect_embedded_urls
+from dedup import MessageIdCache
+from dedup_journal import DedupJournal
+from action_executor import ActionExecutor
+from checkpoints import CatchUp, ChatCheckpoints
+from entity_cache import EntityCache
+from ingest import IngestQueue, IngestRecord
+from latency import LatencyTracker, SignalTrace
+from log_setup import setup_logging
+from signal_journal import SignalJournal
+from signal_store import SignalStore
+from config_watcher import ConfigWatcher
+from pipeline import VERDICT_STALE, SignalPipeline
+
+if TYPE_CHECKING:
+    from sessions import SessionWorker
+
+# Telethon импортируется вместе с sessions только при подключении: офлайн-прогону он не нужен
+STARTUP.mark('imports')
 
 class AdvancedBotMonitor:
-    def __init__(self, config_file: str = 'config.json'):
-        """Инициализация монитора с конфигурацией"""
-        self.config = self.load_config(config_file)
-        
-        # Настройка логирования
-        log_level = getattr(logging, self.config['settings']['log_level'])
-        logging.basicConfig(
-            level=log_level,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('bot_monitor.log', encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
-        
-        # Инициализация клиента
-        api_id = self.config['telegram']['api_id'] or os.getenv('TELEGRAM_API_ID')
-        api_hash = self.config['telegram']['api_hash'] or os.getenv('TELEGRAM_API_HASH')
-        session_name = self.config['telegram']['session_name']
+    def __init__(self, config_file: str = 'config.json', config: Optional[Dict] = None,
+                 offline: bool = False):
+        """
+        Инициализация монитора с конфигурацией
         
-        if not api_id or not api_hash:
-            raise ValueError("Необходимо указать API ключи в config.json или переменных окружения")
-        
-        self.client = TelegramClient(session_name, api_id, api_hash)
+        Args:
+            config_file: Файл конфигурации
+            config: Готовая конфигурация (вместо чтения config_file)
+            offline: Без TelegramClient - для офлайн-прогона записанных сообщений
+        """
+        self.config = config if config is not None else self.load_config(config_file)
         
         # Статистика
         self.stats = {
@@ -58,36 +56,118 @@ class AdvancedBotMonitor:
             'tickers_found': 0,
             'blacklisted_tickers': 0,
             'duplicated_tickers': 0,
+            'stale_signals': 0,
+            'reconnects': 0,
+            'downtime_s': 0.0,
             'errors': 0,
             'start_time': None,
             'last_activity': None
         }
         
-        # Черный список
-        self.blacklist_enabled = self.config.get('blacklist', {}).get('enabled', False)
-        self.blacklisted_tickers = set(self.config.get('blacklist', {}).get('tickers', []))
+        # Общий конвейер: маршрутизатор, парсер, черный список, дедупликация, обогащение, действия
+        self.pipeline = SignalPipeline(self.config, self.stats, on_rejected=self._journal_signal,
+                                       on_new_ticker=self._record_new_ticker)
+        # Маршрутизатор и дедупликатор переживают перезагрузку конфигурации - ссылки на них постоянны
+        self.router = self.pipeline.router
+        self.ticker_dedup = self.pipeline.filters.ticker_dedup
+        self.entity_cache = EntityCache(self.config['settings'].get('entity_cache_file', 'entity_cache.json'))
+        
+        # Побочные действия (буфер обмена, браузер, звук) выполняются вне event loop
+        self.actions = ActionExecutor(workers=self.config['settings'].get('action_workers', 2))
+        self.action_timeouts = self.config['settings'].get('action_timeouts', {})
+        # Задержки сигналов по этапам и ботам
+        self.latency = LatencyTracker()
+        self.latency_dump_file = self.config['settings'].get('latency_dump_file', 'latency_stats.json')
+        # Файл перцентилей пишется в своем потоке: print_stats вызывается из обработчика
+        self._latency_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='latency-dump')
+        # Журнал сигналов JSONL для последующего анализа
+        journal_settings = self.config['settings'].get('signal_journal', {})
+        self.signal_journal = SignalJournal(
+            journal_settings.get('file', 'signals.jsonl'),
+            max_bytes=int(journal_settings.get('max_mb', 10) * 1024 * 1024),
+            rotate_seconds=journal_settings.get('rotate_hours', 24) * 3600,
+            fsync=journal_settings.get('fsync', False)
+        )
+        # Все разобранные сигналы в SQLite для запросов истории по тикеру, контракту и боту
+        store_settings = self.config['settings'].get('signal_store', {})
+        self.signal_store = None
+        if store_settings.get('enabled', True):
+            self.signal_store = SignalStore(
+                store_settings.get('file', 'signals.db'),
+                flush_interval=store_settings.get('flush_interval', 1.0),
+                retention_days=store_settings.get('retention_days', 30)
+            )
+        # Очередь между обработчиком Telethon и разбором сообщений
+        ingest_settings = self.config['settings'].get('ingest', {})
+        self.ingest = IngestQueue(
+            self._process_record,
+            maxsize=ingest_settings.get('queue_size', 1000),
+            workers=ingest_settings.get('workers', 4),
+            overflow_policy=ingest_settings.get('overflow_policy', 'block')
+        )
+        
+        # Настройка логирования: запись в файл и консоль выполняет фоновый поток
+        log_level = getattr(logging, self.config['settings']['log_level'])
+        setup_logging(self.config['settings'].get('log_file', 'bot_monitor.log'), log_level)
+        self.logger = logging.getLogger(__name__)
         
-        # Система дедупликации тикеров
-        self.deduplication_enabled = self.config.get('deduplication', {}).get('enabled', True)
-        self.deduplication_window = self.config.get('deduplication', {}).get('window_minutes', 5)
-        self.recent_tickers = {}  # {ticker: timestamp}
-        self.max_deduplication_entries = 1000
+        # Сессии Telegram: каждая слушает свою часть ботов, обработка и дедупликация общие
+        self.sessions = None
+        self.client = None
+        if not offline:
+            from sessions import SessionSupervisor
+            self.sessions = SessionSupervisor(self.config, self.entity_cache, self.router)
+            self.client = self.sessions.primary.client
         
-        # Кэш для избежания дублирования
-        self.processed_messages = set()
-        self.max_cache_size = 1000
+        # Последний обработанный message_id каждого чата: после переподключения догружаются только более новые
+        self.checkpoints = ChatCheckpoints(self.config['settings'].get('checkpoint_file', 'checkpoints.json'))
+        catch_up_settings = self.config['settings'].get('catch_up', {})
+        self.catch_up_enabled = catch_up_settings.get('enabled', True)
+        self.catch_up_fetcher = CatchUp(
+            self.checkpoints,
+            max_messages=catch_up_settings.get('max_messages', 200),
+            max_age_seconds=catch_up_settings.get('max_age_minutes', 60) * 60,
+            stale_seconds=catch_up_settings.get('stale_seconds', 120),
+            batch_wait=catch_up_settings.get('batch_wait', 0.5)
+        )
+        # Снимки контрольных точек на момент обрыва по сессиям: живые сообщения после
+        # переподключения сдвигают точки раньше, чем начнется догрузка
+        self._catch_up_since: Dict[str, Dict[str, int]] = {}
+        self._stopped = False
+        
+        # Перезагрузка config.json на лету: паттерны, черный список и дедупликация без переподключения
+        self.config_watcher = None
+        reload_settings = self.config['settings'].get('config_reload', {})
+        if not offline and config is None and reload_settings.get('enabled', True):
+            self.config_watcher = ConfigWatcher(config_file, self.reload_config,
+                                                interval=reload_settings.get('interval', 2.0))
+        
+        # Кэш для избежания дублирования: (peer_id, message_id) в порядке LRU
+        self.processed_messages = MessageIdCache(self.config['settings'].get('processed_cache_size', 1000))
+        
+        # Журнал дедупликации: после перезапуска догоняющая пачка сообщений не открывает вкладки повторно
+        self.dedup_journal = DedupJournal(
+            self.config['settings'].get('dedup_journal_file', 'dedup_journal.log'),
+            self.ticker_dedup,
+            self.processed_messages
+        )
+        self.dedup_journal.load()
         
         # Логирование настроек
-        if self.blacklist_enabled:
-            self.logger.info(f"🚫 Черный список активен: {len(self.blacklisted_tickers)} тикеров")
-            self.logger.info(f"📋 Заблокированные тикеры: {', '.join(sorted(self.blacklisted_tickers))}")
+        filters = self.pipeline.filters
+        if filters.blacklist_enabled:
+            self.logger.info(f"🚫 Черный список активен: {len(filters.blacklisted_tickers)} тикеров")
+            # Полный список сортируется только для отладочного лога
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"📋 Заблокированные тикеры: {', '.join(sorted(filters.blacklisted_tickers))}")
         else:
             self.logger.info("✅ Черный список отключен")
         
-        if self.deduplication_enabled:
-            self.logger.info(f"🔄 Дедупликация активна: окно {self.deduplication_window} мин")
+        if filters.deduplication_enabled:
+            self.logger.info(f"🔄 Дедупликация активна: окно {filters.deduplication_window} мин")
         else:
             self.logger.info("✅ Дедупликация отключена")
+        STARTUP.mark('init')
 
     def load_config(self, config_file: str) -> Dict:
         """Загружает конфигурацию из файла"""
@@ -103,408 +183,156 @@ class AdvancedBotMonitor:
 
     async def start(self):
         """Запуск клиента"""
-        await self.client.start()
+        # Локальные компоненты готовы до подключения: первое сообщение сразу попадает к воркерам
+        self.dedup_journal.start()
+        self.signal_journal.start()
+        if self.signal_store is not None:
+            self.signal_store.start()
+        self.checkpoints.start()
+        self.ingest.start()
+        await self.sessions.start()
+        STARTUP.mark('connected')
         self.logger.info("🚀 Продвинутый монитор ботов запущен")
         self.stats['start_time'] = datetime.now()
+        if self.config_watcher is not None:
+            self.config_watcher.start()
 
     async def stop(self):
-        """Остановка клиента"""
-        await self.client.disconnect()
+        """Остановка клиента (повторный вызов ничего не делает)"""
+        # При max_errors stop() вызывается из обработчика, а затем еще раз из finally в run():
+        # журналы нельзя закрывать дважды - их пулы потоков уже остановлены
+        if self._stopped:
+            return
+        self._stopped = True
+        if self.config_watcher is not None:
+            await self.config_watcher.close()
+        await self.ingest.stop()
+        await self.actions.shutdown()
+        await self.dedup_journal.close()
+        await self.signal_journal.close()
+        if self.signal_store is not None:
+            await self.signal_store.close()
+        await self.checkpoints.close()
+        self._latency_writer.shutdown(wait=True)
+        if self.sessions is not None:
+            await self.sessions.stop()
         self.logger.info("🛑 Монитор остановлен")
 
+    @property
+    def patterns(self):
+        """Паттерны текущего снимка конфигурации"""
+        return self.pipeline.patterns
+
+    def reload_config(self, config: Dict) -> bool:
+        """
+        Применяет новую конфигурацию без переподключения сессий
+
+        Returns:
+            False - конфигурация отклонена, работает прежняя
+        """
+        try:
+            settings = config.get('settings')
+            if not isinstance(settings, dict):
+                raise ValueError("в конфигурации нет settings")
+            for key in ('stats_interval', 'max_errors'):
+                if isinstance(settings.get(key), bool) or not isinstance(settings.get(key), int) \
+                        or settings[key] <= 0:
+                    raise ValueError(f"settings.{key} должен быть положительным целым")
+            self.pipeline.reload(config)
+        except Exception as e:
+            self.logger.error(f"❌ Конфигурация не применена, работает прежняя: {e}")
+            return False
+
+        old_config, self.config = self.config, config
+        self.action_timeouts = settings.get('action_timeouts', {})
+
+        filters = self.pipeline.filters
+        blacklist = f"{len(filters.blacklisted_tickers)} тикеров" if filters.blacklist_enabled else "отключен"
+        deduplication = f"окно {filters.deduplication_window} мин" if filters.deduplication_enabled else "отключена"
+        self.logger.info(f"🔁 Конфигурация перезагружена: ботов {len(self.router)}, "
+                         f"черный список {blacklist}, дедупликация {deduplication}")
+
+        # Клиенты и фильтры чатов Telethon созданы при запуске - эти изменения ждут перезапуска
+        restart_sections = [section for section in ('telegram', 'sessions')
+                            if config.get(section) != old_config.get(section)]
+        if restart_sections:
+            self.logger.warning(f"⚠️ Изменения секций {', '.join(restart_sections)} применятся после перезапуска")
+        old_usernames = {bot_config.get('username', name).lower()
+                         for name, bot_config in old_config['monitored_bots'].items()
+                         if bot_config.get('enabled', True)}
+        added = self.router.usernames() - old_usernames
+        if added and self.sessions is not None:
+            self.logger.warning(f"⚠️ Новые боты {', '.join(sorted(added))} попадут в фильтр чатов после перезапуска")
+        return True
+
     def is_ticker_blacklisted(self, ticker: str) -> bool:
         """Проверяет, находится ли тикер в черном списке"""
-        if not self.blacklist_enabled:
-            return False
-        
-        ticker_upper = ticker.upper()
-        is_blacklisted = ticker_upper in self.blacklisted_tickers
-        
-        if is_blacklisted:
-            self.stats['blacklisted_tickers'] += 1
-            self.logger.info(f"🚫 Тикер {ticker} в черном списке - игнорируем")
-        
-        return is_blacklisted
+        return self.pipeline.filters.is_blacklisted(ticker)
 
     def is_ticker_recently_processed(self, ticker: str) -> bool:
         """Проверяет, был ли тикер недавно обработан"""
-        if not self.deduplication_enabled:
-            return False
-        
-        ticker_upper = ticker.upper()
-        current_time = datetime.now()
-        
-        # Очищаем старые записи
-        self._cleanup_old_tickers(current_time)
-        
-        # Проверяем, есть ли тикер в недавних
-        if ticker_upper in self.recent_tickers:
-            last_processed = self.recent_tickers[ticker_upper]
-            time_diff = (current_time - last_processed).total_seconds() / 60  # в минутах
-            
-            if time_diff < self.deduplication_window:
-                self.stats['duplicated_tickers'] += 1
-                self.logger.info(f"🔄 Тикер {ticker} уже обработан {time_diff:.1f} мин назад - пропускаем")
-                return True
-        
-        # Добавляем тикер в недавние
-        self.recent_tickers[ticker_upper] = current_time
-        
-        # Ограничиваем размер кэша
-        if len(self.recent_tickers) > self.max_deduplication_entries:
-            # Удаляем самые старые записи
-            oldest_tickers = sorted(self.recent_tickers.items(), key=lambda x: x[1])[:100]
-            for old_ticker, _ in oldest_tickers:
-                del self.recent_tickers[old_ticker]
-        
-        return False
-
-    def _cleanup_old_tickers(self, current_time: datetime):
-        """Очищает старые записи из кэша дедупликации"""
-        old_tickers = []
-        for ticker, timestamp in self.recent_tickers.items():
-            time_diff = (current_time - timestamp).total_seconds() / 60
-            if time_diff >= self.deduplication_window:
-                old_tickers.append(ticker)
-        
-        for ticker in old_tickers:
-            del self.recent_tickers[ticker]
+        return self.pipeline.filters.is_recently_processed(ticker)
 
-    def extract_ticker_data(self, message: str, bot_name: str) -> Optional[Dict]:
+    def _record_new_ticker(self, ticker: str, now: float):
+        """Новый тикер попадает в журнал дедупликации"""
+        self.dedup_journal.record_ticker(ticker, now)
+
+    def extract_ticker_data(self, message: str, bot_name: str,
+                            trace: Optional[SignalTrace] = None) -> Optional[Dict]:
         """Извлекает данные тикера из сообщения"""
-        try:
-            bot_config = self.config['monitored_bots'][bot_name]
-            pattern = bot_config['pattern']
-            
-            # Ищем тикер
-            ticker_match = re.search(pattern, message)
-            if not ticker_match:
-                return None
-            
-            ticker = None
-            direction = None
-            
-            if bot_name == 'pumply_futures_dex':
-                direction = ticker_match.group(1)
-                ticker = ticker_match.group(2)
-            elif bot_name == 'mexcTracker':
-                ticker = ticker_match.group(1)
-                direction = ticker_match.group(2)
-            elif bot_name == 'MexcDexSpreadTracker':
-                direction = ticker_match.group(2)
-                ticker = ticker_match.group(3)
-            else:  # kormushka_mexc
-                ticker = ticker_match.group(1)
-            
-            # Проверяем черный список
-            if self.is_ticker_blacklisted(ticker):
-                return None
-            
-            # Проверяем дедупликацию
-            if self.is_ticker_recently_processed(ticker):
-                return None
-            
-            # Ищем контракт и сеть в сообщении
-            dex_info = self.extract_contract_info(message)
-            
-            return {
-                'ticker': ticker,
-                'direction': direction,
-                'dex_info': dex_info,
-                'bot_name': bot_name,
-                'timestamp': datetime.now()
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Ошибка извлечения данных из {bot_name}: {e}")
-            return None
+        return self.pipeline.extract(message, bot_name, trace)
 
     def extract_contract_info(self, message: str) -> Optional[Dict]:
         """Извлекает информацию о контракте и сети из сообщения"""
-        try:
-            # 0. Детект одиночного солана-минта по присутствию #SOLANA/sol/solana и base58-адреса
-            solana_mint_match = re.search(r'\b([1-9A-HJ-NP-Za-km-z]{32,44})\b', message)
-            if solana_mint_match and re.search(r'(#?SOLANA|\bsolana\b|\bSOL\b)', message, re.IGNORECASE):
-                contract = solana_mint_match.group(1)
-                chain = 'sol'
-                self.logger.info(f"🔍 Найден Solana mint: {contract}")
-                return {
-                    'type': 'gmgn',
-                    'chain': chain,
-                    'contract': contract,
-                    'url': f"https://gmgn.ai/{chain}/token/{contract}"
-                }
-
-            # 1. Сначала ищем прямую ссылку на GMGN в сообщении
-            gmgn_match = re.search(r'gmgn\.ai/(\w+)/token/([a-fA-F0-9x]+|[1-9A-HJ-NP-Za-km-z]+)', message)
-            if gmgn_match:
-                chain = gmgn_match.group(1)
-                contract = gmgn_match.group(2)
-                self.logger.info(f"🔍 Найдена GMGN ссылка: {chain}/{contract}")
-                return {
-                    'type': 'gmgn',
-                    'chain': chain,
-                    'contract': contract,
-                    'url': f"https://gmgn.ai/{chain}/token/{contract}"
-                }
-            
-            # 2. Ищем контракт в формате CA: (полный контракт)
-            ca_match = re.search(r'CA:\s*([^\s\n]+)', message)
-            if ca_match:
-                contract = ca_match.group(1)
-                self.logger.info(f"🔍 Найден контракт CA: {contract}")
-                
-                # Ищем сеть в сообщении
-                chain_match = re.search(r'Chain:\s*(\w+)', message)
-                if chain_match:
-                    chain = chain_match.group(1).lower()
-                    self.logger.info(f"🔍 Найдена сеть Chain: {chain}")
-                else:
-                    # Пробуем найти сеть в ссылках dexscreener
-                    chain_match = re.search(r'dexscreener\.com/(\w+)/', message)
-                    if chain_match:
-                        chain = chain_match.group(1).lower()
-                        self.logger.info(f"🔍 Найдена сеть в dexscreener: {chain}")
-                    else:
-                        # По умолчанию ethereum
-                        chain = 'ethereum'
-                        self.logger.info(f"🔍 Используем сеть по умолчанию: {chain}")
-                
-                # Конвертируем названия сетей в формат GMGN
-                chain_mapping = {
-                    'ethereum': 'eth',
-                    'arbitrum': 'arb',
-                    'bsc': 'bsc',
-                    'polygon': 'polygon',
-                    'base': 'base',
-                    'solana': 'sol',
-                    'avalanche': 'avax',
-                    'sol': 'sol',  # Добавляем для network: SOL
-                    'bep20': 'bsc'  # Добавляем для network: BEP20
-                }
-                
-                gmgn_chain = chain_mapping.get(chain.lower(), chain.lower())
-                self.logger.info(f"🔍 GMGN сеть: {gmgn_chain}")
-                
-                return {
-                    'type': 'contract',
-                    'chain': gmgn_chain,
-                    'contract': contract,
-                    'url': f"https://gmgn.ai/{gmgn_chain}/token/{contract}"
-                }
-            
-            # 3. Ищем контракт в формате contract: (для pumply_futures_dex)
-            contract_match = re.search(r'contract:\s*([^\s\n]+)', message, re.IGNORECASE)
-            if contract_match:
-                contract = contract_match.group(1)
-                self.logger.info(f"🔍 Найден контракт contract: {contract}")
-                
-                # Ищем сеть в сообщении
-                network_match = re.search(r'network:\s*(\w+)', message, re.IGNORECASE)
-                if network_match:
-                    chain = network_match.group(1).lower()
-                    self.logger.info(f"🔍 Найдена сеть network: {chain}")
-                else:
-                    # Пробуем найти сеть в ссылках dexscreener
-                    chain_match = re.search(r'dexscreener\.com/(\w+)/', message)
-                    if chain_match:
-                        chain = chain_match.group(1).lower()
-                        self.logger.info(f"🔍 Найдена сеть в dexscreener: {chain}")
-                    else:
-                        # По умолчанию ethereum
-                        chain = 'ethereum'
-                        self.logger.info(f"🔍 Используем сеть по умолчанию: {chain}")
-                
-                # Конвертируем названия сетей в формат GMGN
-                chain_mapping = {
-                    'ethereum': 'eth',
-                    'arbitrum': 'arb',
-                    'bsc': 'bsc',
-                    'polygon': 'polygon',
-                    'base': 'base',
-                    'solana': 'sol',
-                    'avalanche': 'avax',
-                    'sol': 'sol',  # Добавляем для network: SOL
-                    'bep20': 'bsc'  # Добавляем для network: BEP20
-                }
-                
-                gmgn_chain = chain_mapping.get(chain.lower(), chain.lower())
-                self.logger.info(f"🔍 GMGN сеть: {gmgn_chain}")
-                
-                return {
-                    'type': 'contract',
-                    'chain': gmgn_chain,
-                    'contract': contract,
-                    'url': f"https://gmgn.ai/{gmgn_chain}/token/{contract}"
-                }
-            
-            
-            # 4. Если ничего не найдено, ищем в ссылках dexscreener
-            dexscreener_match = re.search(r'dexscreener\.com/(\w+)/([^)]+)', message)
-            if dexscreener_match:
-                chain = dexscreener_match.group(1)
-                contract = dexscreener_match.group(2)
-                self.logger.info(f"🔍 Найден контракт в dexscreener: {contract} на сети {chain}")
-                
-                # Конвертируем названия сетей в формат GMGN
-                chain_mapping = {
-                    'ethereum': 'eth',
-                    'arbitrum': 'arb',
-                    'bsc': 'bsc',
-                    'polygon': 'polygon',
-                    'base': 'base',
-                    'solana': 'sol',
-                    'avalanche': 'avax',
-                    'sol': 'sol',
-                    'bep20': 'bsc'  # Добавляем для network: BEP20
-                }
-                
-                gmgn_chain = chain_mapping.get(chain.lower(), chain.lower())
-                
-                return {
-                    'type': 'dexscreener',
-                    'chain': gmgn_chain,
-                    'contract': contract,
-                    'url': f"https://gmgn.ai/{gmgn_chain}/token/{contract}"
-                }
-            
-            self.logger.info("🔍 Контракт не найден в сообщении")
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"Ошибка извлечения контракта: {e}")
-            return None
-
-    def convert_ticker_to_mexc(self, ticker: str) -> str:
-        """Конвертирует тикер в формат MEXC"""
-        return f"MEXC:{ticker}USDT.p"
+        return self.pipeline.enrich(message)
 
-    def copy_to_clipboard(self, text: str) -> bool:
-        """Копирует текст в буфер обмена"""
+    async def process_message(self, message: str, bot_name: str, message_id: int,
+                              peer_id: Optional[int] = None, trace: Optional[SignalTrace] = None,
+                              stale: bool = False):
+        """Обрабатывает сообщение от бота (stale - догруженный старый сигнал: без действий)"""
+        if trace is None:
+            trace = SignalTrace(bot_name, message_id, peer_id)
+            trace.mark('received')
         try:
-            if self.config['settings']['auto_copy_clipboard']:
-                pyperclip.copy(text)
-                return True
-            return False
-        except Exception as e:
-            self.logger.error(f"Ошибка копирования в буфер обмена: {e}")
-            return False
-
-    def open_gmgn(self, dex_info: Dict) -> bool:
-        """Открывает GMGN в браузере"""
-        try:
-            self.logger.info(f"🔍 Попытка открыть GMGN: auto_open_gmgn={self.config['settings']['auto_open_gmgn']}, dex_info={dex_info is not None}")
-            
-            if not self.config['settings']['auto_open_gmgn']:
-                self.logger.info("⏭️ Автооткрытие GMGN отключено в настройках")
-                return False
-                
-            if not dex_info:
-                self.logger.info("⏭️ Нет информации о DEX для открытия")
-                return False
-                
-            url = dex_info['url']
-            self.logger.info(f"🌐 Открываем URL: {url}")
-            
-            # Пробуем разные способы открытия браузера
-            try:
-                webbrowser.open(url)
-                self.logger.info("✅ Браузер открыт через webbrowser.open()")
-                return True
-            except Exception as e:
-                self.logger.warning(f"⚠️ webbrowser.open() не сработал: {e}")
-                
-                # Пробуем через subprocess
-                import subprocess
-                try:
-                    subprocess.run(['start', url], shell=True, check=True)
-                    self.logger.info("✅ Браузер открыт через subprocess")
-                    return True
-                except Exception as e2:
-                    self.logger.warning(f"⚠️ subprocess тоже не сработал: {e2}")
-                    
-                    # Пробуем через os.startfile
-                    import os
-                    try:
-                        os.startfile(url)
-                        self.logger.info("✅ Браузер открыт через os.startfile()")
-                        return True
-                    except Exception as e3:
-                        self.logger.error(f"❌ Все способы открытия браузера не сработали: {e3}")
-                        return False
-                        
-        except Exception as e:
-            self.logger.error(f"❌ Критическая ошибка открытия GMGN: {e}")
-            return False
-
-    def send_notification(self, message: str):
-        """Отправляет уведомление"""
-        if not self.config['notifications']['enabled']:
-            return
-        
-        try:
-            if self.config['notifications']['desktop']:
-                # Простое уведомление в консоль
-                self.logger.info(f"🔔 {message}")
-            
-            if self.config['notifications']['sound']:
-                # Звуковое уведомление (Windows)
-                try:
-                    import winsound
-                    winsound.Beep(1000, 200)
-                except ImportError:
-                    pass
-        except Exception as e:
-            self.logger.error(f"Ошибка отправки уведомления: {e}")
-
-    async def process_message(self, message: str, bot_name: str, message_id: int):
-        """Обрабатывает сообщение от бота"""
-        try:
-            # Проверяем дублирование
-            message_hash = hash(f"{bot_name}_{message_id}_{message[:100]}")
-            if message_hash in self.processed_messages:
+            # Проверяем дублирование; ID сообщений уникальны в пределах чата
+            message_peer = peer_id if peer_id is not None else bot_name
+            if self.processed_messages.seen(message_peer, message_id):
                 return
-            
-            # Добавляем в кэш
-            self.processed_messages.add(message_hash)
-            if len(self.processed_messages) > self.max_cache_size:
-                # Очищаем старые записи
-                self.processed_messages = set(list(self.processed_messages)[-self.max_cache_size//2:])
+            self.dedup_journal.record_message(message_peer, message_id)
             
             self.stats['messages_processed'] += 1
             self.stats['last_activity'] = datetime.now()
             
+            if stale:
+                self._record_stale(message, bot_name, trace)
+                return
+            
             # Извлекаем данные тикера
-            ticker_data = self.extract_ticker_data(message, bot_name)
+            ticker_data = self.extract_ticker_data(message, bot_name, trace)
             if not ticker_data:
-                self.logger.debug(f"Тикер не найден в сообщении от {bot_name}")
+                self.latency.record(trace)
+                self.logger.debug("Тикер не найден в сообщении от %s", bot_name)
                 return
             
-            self.stats['tickers_found'] += 1
             ticker = ticker_data['ticker']
             direction = ticker_data.get('direction', 'N/A')
             dex_info = ticker_data.get('dex_info')
+            mexc_ticker = ticker_data['mexc_ticker']
             
-            # Конвертируем тикер
-            mexc_ticker = self.convert_ticker_to_mexc(ticker)
-            
-            # Копируем в буфер обмена
-            if self.copy_to_clipboard(mexc_ticker):
-                self.logger.info(f"📋 Скопировано: {mexc_ticker}")
-            
-            # Открываем GMGN
-            self.logger.info(f"🔍 Пытаемся открыть GMGN с данными: {dex_info}")
-            if self.open_gmgn(dex_info):
-                self.logger.info(f"🌐 Открыто GMGN: {dex_info['url']}")
-            else:
-                self.logger.warning("⚠️ Не удалось открыть GMGN")
-            
-            # Отправляем уведомление
-            notification_msg = f"Новый тикер от @{bot_name}: {ticker} -> {mexc_ticker}"
-            self.send_notification(notification_msg)
+            # Буфер обмена, GMGN и уведомление уходят в пул потоков:
+            # порядок сохраняется в пределах тикера, event loop не ждет
+            self.logger.debug("🔍 Пытаемся открыть GMGN с данными: %s", dex_info)
+            self.pipeline.dispatch(ticker_data, self.actions, self.action_timeouts,
+                                   on_done=lambda: self._complete_trace(trace))
+            trace.mark('action_dispatched')
+            self._journal_signal('processed', bot_name, ticker, ticker_data.get('direction'), dex_info, trace)
             
             # Логируем результат
-            self.logger.info(f"✅ Обработано от @{bot_name}: {ticker} -> {mexc_ticker} ({direction})")
+            self.logger.info("✅ Обработано от @%s: %s -> %s (%s)", bot_name, ticker, mexc_ticker, direction)
+            if self.signal_store is not None and dex_info:
+                # Как часто бот отмечал этот контракт: окно 24 часа в памяти, без запроса к базе
+                self.logger.info("📈 @%s %s: %s", bot_name, dex_info['contract'],
+                                 self.signal_store.found_line(dex_info['contract'], bot_name=bot_name))
             
             # Выводим статистику
             if self.stats['messages_processed'] % self.config['settings']['stats_interval'] == 0:
@@ -520,117 +348,241 @@ class AdvancedBotMonitor:
                 await self.stop()
                 sys.exit(1)
 
+    def _record_stale(self, message: str, bot_name: str, trace: SignalTrace):
+        """
+        Устаревший сигнал только логируется и пишется в журнал
+
+        Фильтры не вызываются: старый сигнал не должен занимать окно дедупликации свежего
+        """
+        parsed = self.pipeline.parser.parse(message, bot_name)
+        if parsed is None:
+            return
+        ticker, direction = parsed
+        self.stats['stale_signals'] += 1
+        self.logger.info("⏰ Устаревший сигнал от @%s: %s (%s) - без действий", bot_name, ticker, direction)
+        self._journal_signal(VERDICT_STALE, bot_name, ticker, direction, self.pipeline.enrich(message), trace)
+
+    def _journal_signal(self, verdict: str, bot_name: str, ticker: str, direction: Optional[str],
+                        dex_info: Optional[Dict], trace: Optional[SignalTrace]):
+        """Записывает сигнал и решение по нему в журнал JSONL и хранилище SQLite"""
+        if trace is None:
+            self.signal_journal.record(verdict, bot_name, ticker, direction, dex_info)
+        else:
+            self.signal_journal.record(verdict, bot_name, ticker, direction, dex_info,
+                                       trace.message_id, trace.peer_id, trace.marks, trace.date)
+        if self.signal_store is not None:
+            # Догруженный сигнал датируется публикацией, а не обработкой - иначе он попал бы в окно 15m
+            self.signal_store.record(verdict, bot_name, ticker, direction, dex_info,
+                                     trace.message_id if trace is not None else None,
+                                     trace.peer_id if trace is not None else None,
+                                     trace.date if trace is not None else None)
+
+    def _complete_trace(self, trace: SignalTrace):
+        """Последнее действие сигнала выполнено - учитываем задержку"""
+        trace.mark('action_completed')
+        self.latency.record(trace)
+
     def print_stats(self):
         """Выводит статистику"""
         uptime = datetime.now() - self.stats['start_time'] if self.stats['start_time'] else "N/A"
         last_activity = self.stats['last_activity'].strftime("%H:%M:%S") if self.stats['last_activity'] else "N/A"
+        ingest_metrics = self.ingest.metrics()
+        if self.sessions is not None:
+            self.stats.update(self.sessions.totals())
         
         self.logger.info(f"📊 Статистика: Обработано {self.stats['messages_processed']} сообщений, "
                         f"найдено {self.stats['tickers_found']} тикеров, "
                         f"заблокировано {self.stats['blacklisted_tickers']} тикеров, "
                         f"дубликатов {self.stats['duplicated_tickers']} тикеров, "
+                        f"устаревших {self.stats['stale_signals']}, "
+                        f"отклонено маршрутизатором {self.router.rejected}, "
+                        f"действий выполнено {self.actions.stats['actions_completed']}, "
+                        f"с таймаутом {self.actions.stats['actions_timed_out']}, "
+                        f"кэш сообщений {self.processed_messages.hits}/{self.processed_messages.misses}/"
+                        f"{self.processed_messages.evictions} (попаданий/промахов/вытеснений), "
+                        f"очередь {ingest_metrics['depth']} (макс. {ingest_metrics['max_depth']}, "
+                        f"отброшено {ingest_metrics['dropped']}, ожидание {ingest_metrics['wait_ms_avg']:.1f}/"
+                        f"{ingest_metrics['wait_ms_max']:.1f} мс ср./макс.), "
+                        f"переподключений {self.stats['reconnects']} (простой {self.stats['downtime_s']:.0f} с), "
                         f"ошибок {self.stats['errors']}, время работы: {uptime}, "
                         f"последняя активность: {last_activity}")
+        if self.sessions is not None:
+            for line in self.sessions.format_lines():
+                self.logger.info(line)
+        catch_up_stats = self.catch_up_fetcher.stats
+        if catch_up_stats['runs']:
+            self.logger.info(f"📥 Догрузка: запусков {catch_up_stats['runs']}, сообщений {catch_up_stats['messages']}, "
+                             f"устаревших {catch_up_stats['stale']}, обрезано по лимиту {catch_up_stats['truncated']}, "
+                             f"ошибок {catch_up_stats['errors']}")
+        for line in self.latency.format_lines():
+            self.logger.info(line)
+        if self._stopped:
+            # После остановки event loop уже ничего не обрабатывает
+            self.latency.dump(self.latency_dump_file)
+        else:
+            asyncio.get_running_loop().run_in_executor(
+                self._latency_writer, LatencyTracker.write, self.latency_dump_file, self.latency.snapshot()
+            )
 
     def _collect_embedded_urls(self, event) -> List[str]:
         """Извлекает встроенные URL из сущностей Telegram (включая скрытые ссылки)."""
-        urls: List[str] = []
-        try:
-            from telethon.tl.types import MessageEntityTextUrl, MessageEntityUrl
-            if getattr(event, 'message', None) is None:
-                return urls
-            entities = getattr(event.message, 'entities', None) or []
-            message_text = event.message.message or ""
-            for ent in entities:
-                # Явные URL в тексте
-                if isinstance(ent, MessageEntityUrl):
-                    try:
-                        urls.append(message_text[ent.offset: ent.offset + ent.length])
-                    except Exception:
-                        pass
-                # Скрытые ссылки вида [GMGN](https://gmgn.ai/..)
-                if isinstance(ent, MessageEntityTextUrl) and getattr(ent, 'url', None):
-                    urls.append(ent.url)
-        except Exception:
-            # Безопасно игнорируем ошибки извлечения
-            return urls
-        return urls
+        return collect_embedded_urls(getattr(event, 'message', None))
 
     def _collect_button_urls(self, event) -> List[str]:
         """Извлекает URL из inline-кнопок под сообщением (reply_markup)."""
-        urls: List[str] = []
-        try:
-            reply_markup = getattr(event.message, 'reply_markup', None)
-            if not reply_markup or not getattr(reply_markup, 'rows', None):
-                return urls
-            for row in reply_markup.rows:
-                buttons = getattr(row, 'buttons', []) or []
-                for btn in buttons:
-                    # У кнопки с URL атрибут обычно называется url
-                    url = getattr(btn, 'url', None)
-                    if url:
-                        urls.append(url)
-        except Exception:
-            return urls
-        return urls
-
-    @events.register(events.NewMessage)
-    async def handle_new_message(self, event):
-        """Обработчик новых сообщений"""
+        return collect_button_urls(getattr(event, 'message', None))
+
+    def _sender_username(self, event) -> Optional[str]:
+        """Username отправителя: у каналов и пользователей он есть, у чатов и без отправителя - None"""
+        return getattr(event.sender, 'username', None)
+
+    async def handle_new_message(self, event, session: Optional['SessionWorker'] = None):
+        """Обработчик новых сообщений (session - сессия, получившая сообщение)"""
+        received = time.time()
+        if 'first_message' not in STARTUP.marks:
+            STARTUP.mark('first_message')
+            self.logger.info(f"⏱️ Первое сообщение через {STARTUP.elapsed_ms('first_message'):.0f} мс после запуска")
         try:
-            # Проверяем, что это сообщение от канала или пользователя
-            from telethon.tl.types import User, Channel, Chat
-            
-            if not isinstance(event.sender, (User, Channel, Chat)):
+            # Ищем мониторимый канал/бот по индексу (peer_id, затем username)
+            route = self.router.route(event.sender_id, lambda: self._sender_username(event))
+            if not route:
                 return
             
-            sender_username = getattr(event.sender, 'username', None)
-            if not sender_username:
-                return
-            
-            # Проверяем, что это один из мониторимых каналов/ботов
-            bot_name = None
-            for name, config in self.config['monitored_bots'].items():
-                if config['username'] == sender_username and config['enabled']:
-                    bot_name = name
-                    break
-            
-            if not bot_name:
-                return
-            
-            message_text = event.message.message
-            # Дополняем текст встроенными ссылками из сущностей и кнопок, чтобы парсер видел GMGN/DEX ссылки
+            bot_name, bot_config = route
+            peer_id = self._message_peer(session, event.chat_id)
+            if session is not None:
+                session.stats['routed'] += 1
+            date = event.message.date.timestamp() if event.message.date is not None else None
+            trace = SignalTrace(bot_name, event.message.id, peer_id, date)
+            if date is not None:
+                trace.mark('message_date', date)
+            trace.mark('received', received)
+            trace.mark('routed')
+            
+            # Встроенные ссылки из сущностей и кнопок, чтобы парсер видел GMGN/DEX ссылки
             extra_urls: List[str] = []
             extra_urls.extend(self._collect_embedded_urls(event))
             extra_urls.extend(self._collect_button_urls(event))
-            if extra_urls:
-                message_text = f"{message_text}\n" + " \n".join(extra_urls)
-            message_id = event.message.id
             
-            self.logger.info(f"📨 Новое сообщение от @{sender_username}")
+            self.logger.debug("📨 Новое сообщение от @%s", bot_config['username'])
             
-            # Обрабатываем сообщение
-            await self.process_message(message_text, bot_name, message_id)
+            # Только ставим в очередь - разбор и действия выполняют воркеры
+            await self.ingest.put(IngestRecord(
+                bot_name, peer_id, event.message.id, event.message.message or "",
+                urls=extra_urls, priority=bot_config.get('priority', 0), trace=trace,
+                source=(session.name, event.chat_id) if session is not None else None
+            ))
             
         except Exception as e:
             self.stats['errors'] += 1
             self.logger.error(f"Ошибка обработки события: {e}")
 
+    def _message_peer(self, session: Optional['SessionWorker'], chat_id: Optional[int]):
+        """Ключ чата для кэша (peer_id, message_id)"""
+        # ID сообщений личного чата с ботом свои у каждого аккаунта, у канала - общие:
+        # повтор из канала, на который подписаны две сессии, отсечет общий кэш
+        if session is not None and self.sessions.sharded and chat_id is not None and chat_id > 0:
+            return f"{session.name}:{chat_id}"
+        return chat_id
+
+    async def _process_record(self, record: IngestRecord, stale: bool = False):
+        """Обрабатывает запись из очереди входящих сообщений"""
+        message_text = record.text
+        if record.urls:
+            message_text = f"{message_text}\n" + " \n".join(record.urls)
+        await self.process_message(message_text, record.bot_name, record.message_id, record.peer_id,
+                                   record.trace, stale)
+        if record.source is not None:
+            self.checkpoints.update(*record.source, record.message_id)
+
+    def _on_disconnect(self, worker: 'SessionWorker'):
+        """Сессия оборвалась - запоминаем, с каких сообщений догружать"""
+        self._catch_up_since[worker.name] = self.checkpoints.snapshot()
+
+    async def _on_reconnect(self, worker: 'SessionWorker'):
+        """Сессия переподключилась - догружаем пропущенное за время простоя"""
+        self.stats.update(self.sessions.totals())
+        await self.catch_up(self._catch_up_since.pop(worker.name, self.checkpoints.snapshot()), [worker])
+
+    async def catch_up(self, since: Dict[str, int], workers: Optional[List['SessionWorker']] = None):
+        """
+        Догружает сообщения, пропущенные сессиями за время отключения
+
+        Для каждого чата - только новее контрольной точки, не больше лимита и не старше
+        max_age; сообщения обрабатываются по порядку, устаревшие - без действий.
+        Одновременно пришедшие вживую сообщения отсекает кэш (peer_id, message_id)
+
+        Args:
+            since: Снимок контрольных точек, сделанный до того, как заработал обработчик
+            workers: Сессии для догрузки (по умолчанию все)
+        """
+        if not self.catch_up_enabled or self.sessions is None:
+            return
+        fetcher = self.catch_up_fetcher
+        fetcher.stats['runs'] += 1
+        for worker in workers if workers is not None else self.sessions.workers:
+            for chat_id in self.sessions.chat_ids(worker):
+                try:
+                    messages = await fetcher.fetch(worker.client, worker.name, chat_id, since)
+                except Exception as e:
+                    fetcher.stats['errors'] += 1
+                    self.logger.error(f"❌ Ошибка догрузки чата {chat_id} в сессии {worker.name}: {e}")
+                    continue
+                
+                for message in messages:
+                    route = None if message.out else self.router.route(chat_id, lambda: None)
+                    if route is None:
+                        # Свои сообщения в чате с ботом не обрабатываются, но и повторно не догружаются
+                        self.checkpoints.update(worker.name, chat_id, message.id)
+                        continue
+                    bot_name, bot_config = route
+                    stale = fetcher.is_stale(message)
+                    fetcher.stats['messages'] += 1
+                    fetcher.stats['stale'] += stale
+                    trace = SignalTrace(bot_name, message.id, self._message_peer(worker, chat_id),
+                                        message.date.timestamp() if message.date is not None else None)
+                    trace.mark('received')
+                    trace.mark('routed')
+                    urls = collect_embedded_urls(message) + collect_button_urls(message)
+                    await self._process_record(IngestRecord(
+                        bot_name, trace.peer_id, message.id, message.message or "",
+                        urls=urls, priority=bot_config.get('priority', 0), trace=trace,
+                        source=(worker.name, chat_id)
+                    ), stale)
+                if messages:
+                    self.logger.info(f"📥 Сессия {worker.name}, чат {chat_id}: догружено {len(messages)} сообщений")
+
     async def run(self):
         """Основной цикл работы"""
         try:
+            # Точки догрузки - до подписки: первые живые сообщения сдвинут контрольные точки
+            catch_up_since = self.checkpoints.snapshot()
+            # Если ID всех ботов есть в кэше сущностей, обработчик регистрируется до подключения
+            # и видит первые же обновления; Telethon отбрасывает обновления чужих чатов до вызова обработчика
+            if self.sessions.subscribe_cached(self.handle_new_message):
+                STARTUP.mark('handler_registered')
             await self.start()
+            # Остальные сессии - после разрешения username через сеть
+            await self.sessions.subscribe(self.handle_new_message)
+            STARTUP.mark('handler_registered')
+            # ID из кэша проверяются после подключения: неверный ID отсек бы бота фильтром чатов
+            await self.sessions.verify_cached(self.handle_new_message)
+            self.logger.info(STARTUP.format_line())
+            
+            # Модули действий догружаются в фоне, когда обработчик уже работает
+            asyncio.get_running_loop().run_in_executor(None, self.pipeline.actions.preload)
             
-            # Регистрируем обработчик событий
-            self.client.add_event_handler(self.handle_new_message)
+            # Сообщения, пришедшие, пока монитор был выключен
+            await self.catch_up(catch_up_since)
             
             # Выводим информацию о мониторинге
             enabled_bots = [f"@{config['username']}" for name, config in self.config['monitored_bots'].items() if config['enabled']]
             self.logger.info(f"🔍 Мониторинг ботов: {', '.join(enabled_bots)}")
             self.logger.info("⏳ Ожидание сообщений... (Ctrl+C для остановки)")
             
-            # Запускаем клиент
-            await self.client.run_until_disconnected()
+            # Работаем до остановки: оборванные сессии переподключаются с нарастающей задержкой,
+            # конфигурация, кэши и дедупликация остаются в памяти
+            await self.sessions.run(on_reconnect=self._on_reconnect, on_disconnect=self._on_disconnect)
             
         except KeyboardInterrupt:
             self.logger.info("🛑 Получен сигнал остановки")
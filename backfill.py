@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Загрузка истории мониторимых ботов в локальный корпус
+Параллельные задачи по чатам, пакетный iter_messages, ожидание FloodWait и докачка
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Dict, List, Optional
+
+from corpus import read_corpus, record_from_message, write_corpus
+from entity_cache import EntityCache
+from log_setup import setup_logging
+
+try:
+    from telethon import TelegramClient
+    from telethon.errors import FloodWaitError
+except ImportError:
+    print("❌ Ошибка: Необходимо установить telethon")
+    print("Выполните: pip install telethon")
+    sys.exit(1)
+
+logger = logging.getLogger(__name__)
+
+def last_stored_ids(corpus_file: str) -> Dict[str, int]:
+    """Последний сохраненный message_id по каждому боту корпуса"""
+    last_ids: Dict[str, int] = {}
+    if not os.path.exists(corpus_file):
+        return last_ids
+    try:
+        for record in read_corpus(corpus_file):
+            bot_name = record.get('bot')
+            message_id = record.get('message_id') or 0
+            if bot_name and message_id > last_ids.get(bot_name, 0):
+                last_ids[bot_name] = message_id
+    except (EOFError, OSError) as e:
+        # Хвост мог оборваться при аварийном завершении - докачаем с последнего целого ID
+        logger.warning(f"⚠️ Корпус {corpus_file} прочитан не полностью: {e}")
+    return last_ids
+
+class Backfiller:
+    """Загружает последние сообщения каждого мониторимого бота"""
+
+    def __init__(self, client, monitored_bots: Dict[str, Dict], corpus_file: str,
+                 limit: int = 1000, concurrency: int = 4, batch_wait: float = 0.5,
+                 entity_cache: Optional[EntityCache] = None):
+        """
+        Args:
+            client: Подключенный TelegramClient
+            monitored_bots: Словарь ботов в формате config['monitored_bots']
+            corpus_file: Корпус для записи (.jsonl.gz)
+            limit: Сколько последних сообщений загружать на бота
+            concurrency: Сколько чатов загружать одновременно
+            batch_wait: Пауза между пакетами по 100 сообщений внутри чата
+            entity_cache: Кэш username -> peer_id
+        """
+        self.client = client
+        self.monitored_bots = monitored_bots
+        self.corpus_file = corpus_file
+        self.limit = limit
+        self.batch_wait = batch_wait
+        self.entity_cache = entity_cache or EntityCache()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # Записи разных чатов дописываются в один файл по очереди
+        self._write_lock = asyncio.Lock()
+        self.stats = {
+            'messages': 0,
+            'flood_waits': 0,
+            'flood_wait_seconds': 0,
+            'errors': 0
+        }
+
+    async def _fetch(self, bot_name: str, username: str, peer_id: int, min_id: int) -> List[Dict]:
+        """Загружает сообщения новее min_id, переживая FloodWait"""
+        records: Dict[int, Dict] = {}
+        while len(records) < self.limit:
+            # После FloodWait продолжаем с самого старого уже загруженного сообщения
+            offset_id = min(records) if records else 0
+            try:
+                async for message in self.client.iter_messages(
+                        peer_id, limit=self.limit - len(records), min_id=min_id,
+                        offset_id=offset_id, wait_time=self.batch_wait):
+                    records[message.id] = record_from_message(message, bot_name, username, peer_id)
+                break
+            except FloodWaitError as e:
+                self.stats['flood_waits'] += 1
+                self.stats['flood_wait_seconds'] += e.seconds
+                logger.warning(f"⏳ FloodWait для @{username}: ждем {e.seconds} с")
+                await asyncio.sleep(e.seconds + 1)
+        # В корпусе сообщения идут от старых к новым, как их получал монитор
+        return [records[message_id] for message_id in sorted(records)]
+
+    async def _backfill_bot(self, bot_name: str, username: str, peer_id: int, min_id: int):
+        async with self._semaphore:
+            try:
+                records = await self._fetch(bot_name, username, peer_id, min_id)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Ошибка загрузки истории @{username}: {e}")
+                return
+            if records:
+                async with self._write_lock:
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, write_corpus, self.corpus_file, records, True
+                    )
+            self.stats['messages'] += len(records)
+            logger.info(f"📥 @{username}: загружено {len(records)} сообщений (после ID {min_id})")
+
+    async def run(self) -> Dict[str, int]:
+        """Загружает историю всех включенных ботов параллельно"""
+        bots = {name: bot_config.get('username', name)
+                for name, bot_config in self.monitored_bots.items()
+                if bot_config.get('enabled', True)}
+        peer_ids = await self.entity_cache.resolve(self.client, bots.values())
+        last_ids = last_stored_ids(self.corpus_file)
+
+        tasks = []
+        for bot_name, username in bots.items():
+            peer_id = peer_ids.get(username.lower())
+            if peer_id is None:
+                continue
+            tasks.append(self._backfill_bot(bot_name, username, peer_id, last_ids.get(bot_name, 0)))
+        await asyncio.gather(*tasks)
+        return self.stats
+
+async def backfill(config: Dict, corpus_file: str, limit: int, concurrency: int) -> Dict[str, int]:
+    """Подключается к Telegram и загружает историю в корпус"""
+    api_id = config['telegram']['api_id'] or os.getenv('TELEGRAM_API_ID')
+    api_hash = config['telegram']['api_hash'] or os.getenv('TELEGRAM_API_HASH')
+    if not api_id or not api_hash:
+        raise ValueError("Необходимо указать API ключи в config.json или переменных окружения")
+
+    client = TelegramClient(config['telegram']['session_name'], api_id, api_hash)
+    # Короткие FloodWait Telethon переждет сам, длинные обрабатываются в Backfiller
+    client.flood_sleep_threshold = 10
+    await client.start()
+    try:
+        backfiller = Backfiller(
+            client, config['monitored_bots'], corpus_file, limit=limit, concurrency=concurrency,
+            entity_cache=EntityCache(config['settings'].get('entity_cache_file', 'entity_cache.json'))
+        )
+        return await backfiller.run()
+    finally:
+        await client.disconnect()
+
+def main():
+    """Запуск загрузки истории"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Загрузка истории ботов в корпус")
+    arg_parser.add_argument('--config', default='config.json', help="Файл конфигурации")
+    arg_parser.add_argument('--corpus', default='corpus.jsonl.gz', help="Файл корпуса")
+    arg_parser.add_argument('--limit', type=int, default=5000, help="Последних сообщений на бота")
+    arg_parser.add_argument('--concurrency', type=int, default=4, help="Чатов одновременно")
+    args = arg_parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    setup_logging('backfill.log', logging.INFO)
+
+    print("📥 Загрузка истории мониторимых ботов")
+    print("=" * 50)
+    stats = asyncio.run(backfill(config, args.corpus, args.limit, args.concurrency))
+    print(f"📊 Загружено {stats['messages']} сообщений, FloodWait: {stats['flood_waits']} "
+          f"({stats['flood_wait_seconds']} с), ошибок: {stats['errors']}")
+
+if __name__ == "__main__":
+    main()
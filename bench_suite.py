@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Набор бенчмарков парсинга, извлечения контрактов и дедупликации
+Синтетические корпуса 1k/100k/1M, сохранение и сравнение JSON-бейзлайнов (отдельный скрипт, без pytest-benchmark)
+"""
+
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import contract_scanner
+from advanced_monitor import AdvancedBotMonitor
+from dedup import MessageIdCache
+from log_setup import stop_logging
+from replay import build_replay_config
+from synthetic import generate_messages
+from telegram_bot_parser import TelegramBotParser
+
+SIZES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+
+# Бейзлайн этой машины (не в git): --save и --compare без пути используют его
+BASELINE_FILE = 'bench_baseline.json'
+
+# Столько операций минимум прогоняется на каждом размере (1k повторяется 100 раз)
+MIN_OPS = 100000
+
+# Между процессами отношение к эталону у операций короче 1 мкс гуляет до 30%
+DEFAULT_TOLERANCE = 0.5
+
+# Столько раз перемеряются подозрительные цели, прежде чем признать регрессию
+RECHECKS = 2
+
+# Корпус генерируется порциями вне замера - 1M сообщений не держим в памяти
+CHUNK_SIZE = 10000
+
+def _chunks(count: int, seed: int) -> Iterable[List[Tuple[str, str]]]:
+    stream = generate_messages(count, seed)
+    while True:
+        chunk = [item for _, item in zip(range(CHUNK_SIZE), stream)]
+        if not chunk:
+            return
+        yield chunk
+
+def _reference_chunk(chunk: List[Tuple[str, str]]):
+    """Эталонная нагрузка: словарь, кортежи и поиск по строке, как у измеряемых функций"""
+    table: Dict[Tuple[str, int], int] = {}
+    for index, (bot_name, text) in enumerate(chunk):
+        table[(bot_name, index & 1023)] = text.lower().find('0x')
+        table.get((bot_name, (index * 7) & 1023))
+
+def _time_chunks(count: int, seed: int,
+                 run_chunk: Callable[[List[Tuple[str, str]]], None]) -> Tuple[float, float]:
+    """
+    Суммарное время обработки всех порций и эталонной нагрузки на тех же порциях в секундах
+
+    Эталон замеряется вплотную к цели: их отношение не зависит от скорости машины и ее загрузки
+    """
+    elapsed = 0.0
+    reference = 0.0
+    for chunk in _chunks(count, seed):
+        start = time.perf_counter()
+        _reference_chunk(chunk)
+        middle = time.perf_counter()
+        run_chunk(chunk)
+        elapsed += time.perf_counter() - middle
+        reference += middle - start
+    return elapsed, reference
+
+class SuiteTargets:
+    """Измеряемые функции с общим офлайн-монитором"""
+
+    def __init__(self, config: Dict, state_dir: str):
+        self.parser = TelegramBotParser()
+        self.monitor = AdvancedBotMonitor(config=build_replay_config(config, state_dir), offline=True)
+        # Журнал сигналов без event loop не сбрасывается - в замере он не нужен
+        self.monitor.signal_journal.record = lambda *args, **kwargs: None
+        if self.monitor.signal_store is not None:
+            self.monitor.signal_store.record = lambda *args, **kwargs: None
+        self._now = 0.0
+        self.monitor.ticker_dedup.clock = lambda: self._now
+        self._counter = 0
+        self.message_cache = MessageIdCache(1000)
+
+    def reset(self):
+        """Свежее состояние дедупликации перед каждым размером корпуса"""
+        self.monitor.ticker_dedup.clear()
+        self.message_cache = MessageIdCache(1000)
+        self._now = 0.0
+        self._counter = 0
+
+    def parser_process_message(self, chunk):
+        process = self.parser.process_message
+        for _, text in chunk:
+            process(text)
+
+    def extract_ticker_data(self, chunk):
+        extract = self.monitor.extract_ticker_data
+        for bot_name, text in chunk:
+            # Сообщение раз в секунду: окно дедупликации работает как в жизни
+            self._now += 1.0
+            extract(text, bot_name)
+
+    def extract_contract_info(self, chunk):
+        extract = contract_scanner.extract_contract_info
+        for _, text in chunk:
+            extract(text)
+
+    def is_ticker_recently_processed(self, chunk):
+        check = self.monitor.is_ticker_recently_processed
+        for _ in chunk:
+            self._now += 1.0
+            self._counter += 1
+            # 5000 тикеров вперемешку: часть попадает в окно, часть уже устарела
+            check(f"T{self._counter * 7919 % 5000}")
+
+    def processed_messages(self, chunk):
+        seen = self.message_cache.seen
+        for bot_name, _ in chunk:
+            self._counter += 1
+            # Каждое десятое сообщение - повтор недавнего
+            seen(bot_name, self._counter - 5 if self._counter % 10 == 0 else self._counter)
+
+TARGETS = ('parser_process_message', 'extract_ticker_data', 'extract_contract_info',
+           'is_ticker_recently_processed', 'processed_messages')
+
+def run_suite(config: Dict, sizes: List[str], seed: int = 0, repeat: int = 3,
+              only: Optional[Set[Tuple[str, str]]] = None) -> Dict:
+    """
+    Прогоняет все цели на корпусах заданных размеров; берется лучший из repeat прогонов
+
+    Args:
+        only: Пары (цель, размер) для повторного замера; None - все
+    """
+    logging.disable(logging.INFO)
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory(prefix='bench_') as state_dir:
+        targets = SuiteTargets(config, state_dir)
+        try:
+            for target in TARGETS:
+                run_chunk = getattr(targets, target)
+                for size in sizes:
+                    if only is not None and (target, size) not in only:
+                        continue
+                    count = SIZES[size]
+                    # Минимум устойчивее к шуму: операции по 1 мкс иначе дают ложные регрессии;
+                    # маленькие корпуса прогоняются, пока не наберется MIN_OPS операций
+                    elapsed = reference = float('inf')
+                    for _ in range(max(repeat, MIN_OPS // count, 1)):
+                        targets.reset()
+                        target_s, reference_s = _time_chunks(count, seed, run_chunk)
+                        elapsed = min(elapsed, target_s)
+                        reference = min(reference, reference_s)
+                    results.setdefault(target, {})[size] = {
+                        'us_per_op': elapsed / count * 1e6,
+                        'ops_per_s': count / elapsed if elapsed else 0.0,
+                        # Время цели в единицах эталонной нагрузки - по нему ищутся регрессии
+                        'relative': elapsed / reference if reference else 0.0,
+                    }
+        finally:
+            stop_logging()
+    return {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        },
+        'results': results,
+    }
+
+def find_regressions(current: Dict, baseline: Dict, tolerance: float) -> Dict[Tuple[str, str], str]:
+    """
+    Сравнивает с бейзлайном по времени относительно эталонной нагрузки
+
+    Абсолютные мкс/оп между процессами на одной машине расходятся до 1.5 раза,
+    отношение к эталону, замеренному рядом, - заметно меньше
+
+    Returns:
+        Описания регрессий (relative вырос больше чем на tolerance) по парам (цель, размер)
+    """
+    regressions = {}
+    for target, sizes in current['results'].items():
+        for size, values in sizes.items():
+            base = baseline.get('results', {}).get(target, {}).get(size)
+            if not base or not base.get('relative'):
+                continue
+            ratio = values['relative'] / base['relative']
+            if ratio > 1 + tolerance:
+                regressions[(target, size)] = (
+                    f"{target}[{size}]: x{base['relative']:.2f} -> x{values['relative']:.2f} "
+                    f"эталона ({base['us_per_op']:.3f} -> {values['us_per_op']:.3f} мкс/оп, x{ratio:.2f})")
+    return regressions
+
+def compare(current: Dict, baseline: Dict, tolerance: float, config: Dict,
+            recheck: int = RECHECKS) -> List[str]:
+    """
+    Сравнивает с бейзлайном; подозрительные цели перемеряются recheck раз
+
+    Регрессией считается только замедление, которое держится во всех перемерах:
+    одиночный всплеск из-за соседних процессов gate не роняет
+    """
+    regressions = find_regressions(current, baseline, tolerance)
+    seed, repeat = current['meta']['seed'], current['meta']['repeat']
+    for _ in range(recheck):
+        if not regressions:
+            break
+        sizes = sorted({size for _, size in regressions}, key=list(SIZES).index)
+        retry = run_suite(config, sizes, seed, repeat, only=set(regressions))
+        regressions = {key: line for key, line in find_regressions(retry, baseline, tolerance).items()
+                       if key in regressions}
+    return list(regressions.values())
+
+def main():
+    """Запуск набора бенчмарков"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Набор бенчмарков EugenBot")
+    arg_parser.add_argument('--config', default='config.json', help="Файл конфигурации")
+    arg_parser.add_argument('--sizes', default='1k,100k', help="Размеры корпусов: 1k,100k,1m")
+    arg_parser.add_argument('--seed', type=int, default=0, help="Зерно синтетического корпуса")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Прогонов каждой цели (берется лучший)")
+    arg_parser.add_argument('--save', nargs='?', const=BASELINE_FILE,
+                            help=f"Сохранить результаты как бейзлайн JSON (по умолчанию {BASELINE_FILE})")
+    arg_parser.add_argument('--compare', nargs='?', const=BASELINE_FILE,
+                            help=f"Сравнить с бейзлайном JSON (по умолчанию {BASELINE_FILE})")
+    arg_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help="Допустимое замедление относительно бейзлайна (0.5 = 50%%)")
+    args = arg_parser.parse_args()
+
+    sizes = [size.strip().lower() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        arg_parser.error(f"Неизвестные размеры: {', '.join(unknown)}")
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"❌ Бейзлайна {args.compare} нет - сохраните его на этой машине: python bench_suite.py --save")
+            sys.exit(2)
+
+    current = run_suite(config, sizes, args.seed, args.repeat)
+
+    print("⏱️ Набор бенчмарков (мкс на операцию)")
+    print("=" * 50)
+    for target, by_size in current['results'].items():
+        print(f"[{target}]")
+        for size, values in by_size.items():
+            print(f"  {size:<6} {values['us_per_op']:10.3f} мкс  {values['ops_per_s']:12.0f} оп/с  "
+                  f"x{values['relative']:.2f} эталона")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"💾 Бейзлайн сохранен: {args.save}")
+
+    if baseline is not None:
+        regressions = compare(current, baseline, args.tolerance, config)
+        if regressions:
+            print(f"❌ Регрессии относительно {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"✅ Регрессий относительно {args.compare} нет (допуск {args.tolerance:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,623 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Микро-бенчмарки парсинга сообщений
+Сравнивает задержку обработки одного сообщения до и после оптимизаций
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from patterns import (
+    CA_RE, CHAIN_RE, CONTRACT_RE, DEXSCREENER_CHAIN_RE, DEXSCREENER_LINK_RE,
+    GMGN_LINK_RE, NETWORK_RE, SOLANA_HINT_RE, SOLANA_MINT_RE, PatternRegistry
+)
+import contract_scanner
+import debug_contract
+import telegram_bot_parser
+from action_executor import ActionExecutor
+from dedup import MessageIdCache, TickerDeduplicator
+from dedup_journal import DedupJournal
+from entity_cache import EntityCache
+from ingest import IngestQueue, IngestRecord
+from log_setup import LOG_FORMAT, _DeferredQueueHandler
+from signal_store import SignalStore
+from startup import import_breakdown
+from routing import BotRouter
+
+def load_sample_messages() -> List[str]:
+    """Собирает тестовые сообщения из telegram_bot_parser и debug_contract"""
+    messages = list(telegram_bot_parser.TEST_MESSAGES)
+    messages.extend(message for _, message in debug_contract.TEST_MESSAGES)
+    return messages
+
+def load_golden_messages(corpus_file: str = 'golden_contracts.json') -> List[str]:
+    """Сообщения эталонного корпуса контрактов"""
+    with open(corpus_file, 'r', encoding='utf-8') as f:
+        return [entry['message'] for entry in json.load(f)]
+
+def measure(func: Callable[[str], object], messages: List[str], iterations: int) -> float:
+    """Возвращает среднее время обработки одного сообщения в микросекундах"""
+    # Прогрев
+    for message in messages:
+        func(message)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in messages:
+            func(message)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(messages)) * 1e6
+
+def _contract_legacy(message: str) -> Optional[str]:
+    """Каскад поиска контракта на строковых паттернах (как было раньше)"""
+    solana_mint_match = re.search(r'\b([1-9A-HJ-NP-Za-km-z]{32,44})\b', message)
+    if solana_mint_match and re.search(r'(#?SOLANA|\bsolana\b|\bSOL\b)', message, re.IGNORECASE):
+        return solana_mint_match.group(1)
+    gmgn_match = re.search(r'gmgn\.ai/(\w+)/token/([a-fA-F0-9x]+|[1-9A-HJ-NP-Za-km-z]+)', message)
+    if gmgn_match:
+        return gmgn_match.group(2)
+    ca_match = re.search(r'CA:\s*([^\s\n]+)', message)
+    if ca_match:
+        if not re.search(r'Chain:\s*(\w+)', message):
+            re.search(r'dexscreener\.com/(\w+)/', message)
+        return ca_match.group(1)
+    contract_match = re.search(r'contract:\s*([^\s\n]+)', message, re.IGNORECASE)
+    if contract_match:
+        if not re.search(r'network:\s*(\w+)', message, re.IGNORECASE):
+            re.search(r'dexscreener\.com/(\w+)/', message)
+        return contract_match.group(1)
+    dexscreener_match = re.search(r'dexscreener\.com/(\w+)/([^)]+)', message)
+    if dexscreener_match:
+        return dexscreener_match.group(2)
+    return None
+
+def _contract_compiled(message: str) -> Optional[str]:
+    """Тот же каскад на скомпилированных паттернах из patterns.py"""
+    solana_mint_match = SOLANA_MINT_RE.search(message)
+    if solana_mint_match and SOLANA_HINT_RE.search(message):
+        return solana_mint_match.group(1)
+    gmgn_match = GMGN_LINK_RE.search(message)
+    if gmgn_match:
+        return gmgn_match.group(2)
+    ca_match = CA_RE.search(message)
+    if ca_match:
+        if not CHAIN_RE.search(message):
+            DEXSCREENER_CHAIN_RE.search(message)
+        return ca_match.group(1)
+    contract_match = CONTRACT_RE.search(message)
+    if contract_match:
+        if not NETWORK_RE.search(message):
+            DEXSCREENER_CHAIN_RE.search(message)
+        return contract_match.group(1)
+    dexscreener_match = DEXSCREENER_LINK_RE.search(message)
+    if dexscreener_match:
+        return dexscreener_match.group(2)
+    return None
+
+def bench_patterns(config: Dict, iterations: int) -> Dict[str, float]:
+    """Строковые паттерны через кэш re против реестра скомпилированных паттернов"""
+    bots = [bot for bot in config['monitored_bots'].values() if bot['enabled']]
+    registry = PatternRegistry.from_config(config)
+    parser = telegram_bot_parser.TelegramBotParser()
+    messages = load_sample_messages()
+
+    def parse_legacy(message: str):
+        for bot in bots:
+            if re.search(bot['pattern'], message):
+                return _contract_legacy(message)
+        return None
+
+    def parse_legacy_cold(message: str):
+        # Кэш re переполнен (> 512 паттернов) - каждое сообщение перекомпилирует паттерны
+        re.purge()
+        return parse_legacy(message)
+
+    def parse_compiled(message: str):
+        for bot_patterns in registry.enabled():
+            if bot_patterns.ticker.search(message):
+                return _contract_compiled(message)
+        return None
+
+    return {
+        'legacy_re_cache_us': measure(parse_legacy, messages, iterations),
+        'legacy_cold_cache_us': measure(parse_legacy_cold, messages, max(1, iterations // 10)),
+        'registry_us': measure(parse_compiled, messages, iterations),
+        'telegram_bot_parser_us': measure(parser.process_message, messages, iterations),
+    }
+
+def bench_contracts(iterations: int) -> Dict[str, float]:
+    """Каскад регулярных выражений против однопроходного сканера"""
+    messages = load_golden_messages()
+    long_messages = [message for message in messages if len(message) >= 800]
+    return {
+        'cascade_us': measure(_contract_compiled, messages, iterations),
+        'single_pass_us': measure(contract_scanner.extract_contract_info, messages, iterations),
+        'cascade_long_us': measure(_contract_compiled, long_messages, iterations),
+        'single_pass_long_us': measure(contract_scanner.extract_contract_info, long_messages, iterations),
+    }
+
+class _ReplayEvent:
+    """Обновление из воспроизводимого потока"""
+
+    __slots__ = ('chat_id', 'sender_id', 'username', 'counters')
+
+    def __init__(self, peer_id: int, username: str, counters: Dict[str, int]):
+        self.chat_id = peer_id
+        self.sender_id = peer_id
+        self.username = username
+        self.counters = counters
+
+    @property
+    def sender(self):
+        # Каждое обращение к отправителю - потенциальный get_sender при промахе кэша
+        self.counters['sender_lookups'] += 1
+        return self
+
+class _ResolveClient:
+    """Клиент-заглушка, считающий запросы разрешения username"""
+
+    def __init__(self, peer_ids: Dict[str, int]):
+        self.peer_ids = peer_ids
+        self.calls = 0
+
+    async def get_peer_id(self, username: str) -> int:
+        self.calls += 1
+        return self.peer_ids[username.lower()]
+
+def _replay_stream(config: Dict, updates: int, chats: int) -> List[tuple]:
+    """Поток обновлений: мониторимые боты среди сотен других чатов"""
+    rng = random.Random(42)
+    monitored = [bot['username'] for bot in config['monitored_bots'].values() if bot['enabled']]
+    peers = [(-1000000000000 - i, f"channel_{i}") for i in range(chats)]
+    peers.extend((-1000000000000 - chats - i, username) for i, username in enumerate(monitored))
+    # Около 2% обновлений приходит от мониторимых ботов
+    weights = [1.0] * chats + [chats * 0.02 / len(monitored)] * len(monitored)
+    return rng.choices(peers, weights=weights, k=updates)
+
+def bench_event_filter(config: Dict, updates: int, chats: int = 300) -> Dict[str, float]:
+    """Обработчик без фильтра по чатам против фильтра Telethon по peer_id"""
+    stream = _replay_stream(config, updates, chats)
+    monitored = {username.lower() for username in (
+        bot['username'] for bot in config['monitored_bots'].values() if bot['enabled'])}
+    peer_ids = {username.lower(): peer_id for peer_id, username in stream if username.lower() in monitored}
+
+    # До: обработчик вызывается на каждое обновление и читает event.sender
+    before = {'sender_lookups': 0, 'handler_calls': 0}
+    events_before = [_ReplayEvent(peer_id, username, before) for peer_id, username in stream]
+
+    def legacy_handler(event):
+        before['handler_calls'] += 1
+        sender_username = getattr(event.sender, 'username', None)
+        if not sender_username:
+            return None
+        for name, bot_config in config['monitored_bots'].items():
+            if bot_config['username'] == sender_username and bot_config['enabled']:
+                return name
+        return None
+
+    start = time.process_time()
+    for event in events_before:
+        legacy_handler(event)
+    cpu_before = time.process_time() - start
+
+    # После: ID разрешены при запуске, Telethon проверяет chat_id до вызова обработчика
+    after = {'sender_lookups': 0, 'handler_calls': 0}
+    events_after = [_ReplayEvent(peer_id, username, after) for peer_id, username in stream]
+    router = BotRouter.from_config(config)
+    for username, peer_id in peer_ids.items():
+        router.bind_peer(username, peer_id)
+    chat_filter = set(peer_ids.values())
+
+    def handler(event):
+        after['handler_calls'] += 1
+        return router.route(event.sender_id, lambda: event.sender.username)
+
+    start = time.process_time()
+    for event in events_after:
+        if event.chat_id in chat_filter:
+            handler(event)
+    cpu_after = time.process_time() - start
+
+    # Запросы разрешения username при холодном и теплом запуске
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_file = os.path.join(tmp_dir, 'entity_cache.json')
+        client = _ResolveClient(peer_ids)
+        asyncio.run(EntityCache(cache_file).resolve(client, peer_ids))
+        cold_calls = client.calls
+        asyncio.run(EntityCache(cache_file).resolve(client, peer_ids))
+        warm_calls = client.calls - cold_calls
+
+    return {
+        'updates': updates,
+        'handler_calls_before': before['handler_calls'],
+        'handler_calls_after': after['handler_calls'],
+        'sender_lookups_before': before['sender_lookups'],
+        'sender_lookups_after': after['sender_lookups'],
+        'handler_cpu_ms_before': cpu_before * 1000,
+        'handler_cpu_ms_after': cpu_after * 1000,
+        'resolve_calls_cold_start': cold_calls,
+        'resolve_calls_warm_start': warm_calls,
+    }
+
+# Шаблоны дополнительных форматов для префильтра: те же макеты с другими литералами
+_FORMAT_TEMPLATES = (
+    r'(?P<ticker>\w+)\s+\+[\d.]+%\s+in\s+\d+\s+mins{i}!',
+    r'🔺\s+(?P<direction>SHORT|LONG)\s+\$(?P<ticker>\w+)\s+\+[\d.]+%\s+on\s+Exchange{i}',
+    r'(?:🔴|🟢)\s+(?P<direction>SHORT|LONG)\?\s+#(?P<ticker>\w+)\s+Gap{i}',
+    r'(?P<ticker>\w+)\s+\|\s+[\d.]+%\s+\|\s+(?P<direction>Long|Short)\s+venue{i}',
+)
+
+def bench_prefilter(config: Dict, messages: int = 2000, formats: tuple = (4, 20, 52)) -> Dict[str, float]:
+    """Сообщение неизвестного источника: перебор паттернов против префильтра по якорям"""
+    from synthetic import generate_messages
+
+    signals = [text for _, text in generate_messages(messages, seed=7)]
+    # Половина - сообщения без строки сигнала: перебору приходится проверить все паттерны
+    corpus = signals[::2] + [text.split('\n', 3)[-1] for text in signals[1::2]]
+    base = {name: bot for name, bot in config['monitored_bots'].items() if bot['enabled']}
+    results: Dict[str, float] = {}
+    for count in formats:
+        bots = dict(base)
+        for i in range(count - len(base)):
+            bots[f'format{i}'] = {'pattern': _FORMAT_TEMPLATES[i % len(_FORMAT_TEMPLATES)].format(i=i)}
+        registry = PatternRegistry(bots)
+
+        def sequential(message: str):
+            for bot_patterns in registry.enabled():
+                ticker_match = bot_patterns.ticker.search(message)
+                if ticker_match:
+                    return bot_patterns.name
+            return None
+
+        def combined(message: str):
+            found = registry.matcher.match(message)
+            return found[0].name if found else None
+
+        mismatches = sum(sequential(message) != combined(message) for message in corpus)
+        results[f'sequential_{count}_us'] = measure(sequential, corpus, 3)
+        results[f'combined_{count}_us'] = measure(combined, corpus, 3)
+        results[f'mismatches_{count}'] = mismatches
+    return results
+
+# Длительность побочных действий: winsound.Beep(1000, 200) блокирует 200 мс
+SIDE_EFFECT_SECONDS = {'clipboard': 0.01, 'browser': 0.05, 'notification': 0.2}
+
+async def _loop_lag_probe(stop: asyncio.Event, interval: float = 0.001) -> Dict[str, float]:
+    """Измеряет, насколько event loop опаздывает с пробуждением корутины"""
+    blocked = 0.0
+    max_stall = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = time.perf_counter() - start - interval
+        if lag > 0.002:
+            blocked += lag
+            max_stall = max(max_stall, lag)
+    return {'blocked_ms': blocked * 1000, 'max_stall_ms': max_stall * 1000}
+
+async def _measure_actions(inline: bool, signals: int) -> Dict[str, float]:
+    """Несколько сигналов в одну секунду: действия inline или через ActionExecutor"""
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_loop_lag_probe(stop))
+    await asyncio.sleep(0.01)
+    executor = ActionExecutor(workers=2)
+    start = time.perf_counter()
+    for i in range(signals):
+        for name, seconds in SIDE_EFFECT_SECONDS.items():
+            if inline:
+                time.sleep(seconds)
+            else:
+                executor.submit(f"TICKER{i}", name, time.sleep, seconds)
+    dispatched = time.perf_counter() - start
+    await executor.shutdown(timeout=10)
+    await asyncio.sleep(0.01)
+    stop.set()
+    result = await probe
+    result['dispatch_ms'] = dispatched * 1000
+    return result
+
+def bench_actions(signals: int = 2) -> Dict[str, float]:
+    """Время блокировки event loop побочными действиями до и после"""
+    before = asyncio.run(_measure_actions(inline=True, signals=signals))
+    after = asyncio.run(_measure_actions(inline=False, signals=signals))
+    return {
+        'loop_blocked_ms_before': before['blocked_ms'],
+        'loop_blocked_ms_after': after['blocked_ms'],
+        'max_stall_ms_before': before['max_stall_ms'],
+        'max_stall_ms_after': after['max_stall_ms'],
+        'dispatch_ms_before': before['dispatch_ms'],
+        'dispatch_ms_after': after['dispatch_ms'],
+    }
+
+class _LegacyTickerDedup:
+    """Прежняя дедупликация: полный обход словаря на каждую проверку"""
+
+    def __init__(self, window_minutes: float, max_entries: int):
+        self.window_minutes = window_minutes
+        self.max_entries = max_entries
+        self.recent_tickers = {}
+
+    def check(self, ticker: str, now: float) -> bool:
+        old_tickers = [t for t, ts in self.recent_tickers.items()
+                       if (now - ts) / 60 >= self.window_minutes]
+        for t in old_tickers:
+            del self.recent_tickers[t]
+        if ticker in self.recent_tickers and (now - self.recent_tickers[ticker]) / 60 < self.window_minutes:
+            return True
+        self.recent_tickers[ticker] = now
+        if len(self.recent_tickers) > self.max_entries:
+            oldest_tickers = sorted(self.recent_tickers.items(), key=lambda x: x[1])[:100]
+            for t, _ in oldest_tickers:
+                del self.recent_tickers[t]
+        return False
+
+def bench_dedup(checks: int = 100000, window_minutes: float = 5,
+                max_entries: int = 1000) -> Dict[str, float]:
+    """Проверка тикеров за час потока: полный обход против очереди по времени"""
+    rng = random.Random(6)
+    step = 3600 / checks
+    stream = [(f"T{rng.randrange(checks // 4)}", i * step) for i in range(checks)]
+
+    legacy = _LegacyTickerDedup(window_minutes, max_entries)
+    start = time.perf_counter()
+    legacy_dups = sum(legacy.check(ticker, now) for ticker, now in stream)
+    legacy_us = (time.perf_counter() - start) / checks * 1e6
+
+    dedup = TickerDeduplicator(window_minutes, max_entries=max_entries)
+    start = time.perf_counter()
+    dups = sum(dedup.check(ticker, now) is not None for ticker, now in stream)
+    ordered_us = (time.perf_counter() - start) / checks * 1e6
+
+    if dups != legacy_dups:
+        raise AssertionError(f"Расхождение дедупликации: {legacy_dups} != {dups}")
+    return {
+        'check_us_before': legacy_us,
+        'check_us_after': ordered_us,
+        'duplicates': dups,
+    }
+
+def bench_dedup_journal(entries: int = 100000) -> Dict[str, float]:
+    """Восстановление состояния дедупликации из журнала на entries записей"""
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal_file = os.path.join(tmp_dir, 'dedup_journal.log')
+        with open(journal_file, 'w', encoding='utf-8') as f:
+            for i in range(entries // 2):
+                f.write(f"t\t{now - 3600 + i * 7200 / entries:.3f}\tT{i}\n")
+                f.write(f"m\t-100{i % 300}\t{i}\n")
+
+        timings = []
+        for _ in range(5):
+            journal = DedupJournal(journal_file, TickerDeduplicator(5, 1000), MessageIdCache(1000))
+            start = time.perf_counter()
+            replayed = journal.load()
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'journal_entries': entries,
+        'replayed': replayed,
+        'replay_ms': min(timings),
+    }
+
+async def _measure_ingest(queued: bool, burst: int, processing_seconds: float) -> Dict[str, float]:
+    """Пачка сигналов: обработчик ждет разбор inline или только ставит запись в очередь"""
+    async def process(record: IngestRecord):
+        # Разбор и фильтры с точкой переключения, как у process_message
+        time.sleep(processing_seconds)
+        await asyncio.sleep(0)
+
+    queue = IngestQueue(process, maxsize=burst, workers=4)
+    queue.start()
+    held = []
+    start = time.perf_counter()
+    for i in range(burst):
+        record = IngestRecord('bench', -1000, i, f"TICKER{i}")
+        handler_start = time.perf_counter()
+        if queued:
+            await queue.put(record)
+        else:
+            await process(record)
+        held.append((time.perf_counter() - handler_start) * 1000)
+    await queue.stop(timeout=30)
+    return {
+        'handler_ms_max': max(held),
+        'handler_ms_total': sum(held),
+        'drain_ms': (time.perf_counter() - start) * 1000,
+        'wait_ms_max': queue.metrics()['wait_ms_max'],
+    }
+
+def bench_ingest(burst: int = 200, processing_seconds: float = 0.001) -> Dict[str, float]:
+    """Время удержания диспетчера Telethon обработчиком при пачке сигналов"""
+    before = asyncio.run(_measure_ingest(False, burst, processing_seconds))
+    after = asyncio.run(_measure_ingest(True, burst, processing_seconds))
+    return {
+        'handler_ms_total_before': before['handler_ms_total'],
+        'handler_ms_total_after': after['handler_ms_total'],
+        'handler_ms_max_before': before['handler_ms_max'],
+        'handler_ms_max_after': after['handler_ms_max'],
+        'queue_wait_ms_max': after['wait_ms_max'],
+    }
+
+def _log_signal_before(log: logging.Logger, ticker: str, dex_info: Dict):
+    """Логи одного сигнала до оптимизации: f-строки, все на INFO"""
+    log.info(f"📨 Новое сообщение от @{'pumply_futures_dex'}")
+    log.info(f"🔍 Найден контракт в dexscreener: {dex_info['contract']} на сети {'solana'}")
+    log.info(f"🔍 GMGN сеть: {dex_info['chain']}")
+    log.info(f"🔍 Пытаемся открыть GMGN с данными: {dex_info}")
+    log.info(f"📋 Скопировано: MEXC:{ticker}USDT.p")
+    log.info(f"🔍 Попытка открыть GMGN: auto_open_gmgn={True}, dex_info={dex_info is not None}")
+    log.info(f"🌐 Открываем URL: {dex_info['url']}")
+    log.info("✅ Браузер открыт через webbrowser.open()")
+    log.info(f"🔔 Новый тикер от @{'pumply_futures_dex'}: {ticker} -> MEXC:{ticker}USDT.p")
+    log.info(f"✅ Обработано от @{'pumply_futures_dex'}: {ticker} -> MEXC:{ticker}USDT.p ({'SHORT'})")
+
+def _log_signal_after(log: logging.Logger, ticker: str, dex_info: Dict):
+    """Логи одного сигнала после: ленивое форматирование, детали этапов на DEBUG"""
+    log.debug("📨 Новое сообщение от @%s", 'pumply_futures_dex')
+    log.debug("🔍 Найден контракт в dexscreener: %s на сети %s", dex_info['contract'], 'solana')
+    log.debug("🔍 GMGN сеть: %s", dex_info['chain'])
+    log.debug("🔍 Пытаемся открыть GMGN с данными: %s", dex_info)
+    log.debug("📋 Скопировано: %s", f"MEXC:{ticker}USDT.p")
+    log.debug("🔍 Попытка открыть GMGN: auto_open_gmgn=%s, dex_info=%s", True, dex_info is not None)
+    log.info("🌐 Открываем URL: %s", dex_info['url'])
+    log.debug("✅ Браузер открыт через webbrowser.open()")
+    log.info("🔔 %s", f"Новый тикер от @pumply_futures_dex: {ticker} -> MEXC:{ticker}USDT.p")
+    log.info("✅ Обработано от @%s: %s -> %s (%s)", 'pumply_futures_dex', ticker, f"MEXC:{ticker}USDT.p", 'SHORT')
+
+def bench_logging(signals: int = 2000) -> Dict[str, float]:
+    """Время логирования одного сигнала в потоке event loop до и после"""
+    import logging.handlers
+    import queue
+
+    dex_info = {'type': 'dexscreener', 'chain': 'sol', 'contract': 'So11111111111111111111111111111111111111112',
+                'url': 'https://gmgn.ai/sol/token/So11111111111111111111111111111111111111112'}
+    results = {}
+    # main() глушит INFO для остальных секций - здесь замеряется именно логирование
+    disabled = logging.root.manager.disable
+    logging.disable(logging.NOTSET)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for variant, log_signal in (('before', _log_signal_before), ('after', _log_signal_after)):
+            formatter = logging.Formatter(LOG_FORMAT)
+            stream = open(os.path.join(tmp_dir, f'{variant}.console'), 'w', encoding='utf-8')
+            handlers = [logging.FileHandler(os.path.join(tmp_dir, f'{variant}.log'), encoding='utf-8'),
+                        logging.StreamHandler(stream)]
+            for handler in handlers:
+                handler.setFormatter(formatter)
+
+            log = logging.Logger(f'bench_{variant}', logging.INFO)
+            listener = None
+            if variant == 'before':
+                for handler in handlers:
+                    log.addHandler(handler)
+            else:
+                log_queue = queue.SimpleQueue()
+                log.addHandler(_DeferredQueueHandler(log_queue))
+                listener = logging.handlers.QueueListener(log_queue, *handlers)
+                listener.start()
+
+            start = time.perf_counter()
+            for i in range(signals):
+                log_signal(log, f"TICKER{i}", dex_info)
+            results[f'loop_us_per_signal_{variant}'] = (time.perf_counter() - start) / signals * 1e6
+
+            if listener is not None:
+                listener.stop()
+            for handler in handlers:
+                handler.close()
+            stream.close()
+    logging.disable(disabled)
+    return results
+
+async def _measure_signal_store(db_file: str, rows: int, queries: int) -> Dict[str, float]:
+    store = SignalStore(db_file, retention_days=0)
+    rng = random.Random(25)
+    bots = ['mexcTracker', 'kormushka_mexc', 'pumply_futures_dex', 'MexcDexSpreadTracker']
+    contracts = [f"0x{rng.getrandbits(160):040x}" for _ in range(rows // 20)]
+    now = time.time()
+
+    start = time.perf_counter()
+    for index in range(rows):
+        contract = rng.choice(contracts)
+        store.record('processed', rng.choice(bots), f"T{index % 5000}", 'LONG',
+                     {'chain': 'bsc', 'contract': contract, 'url': ''},
+                     timestamp=now - rng.uniform(0, 7 * 86400))
+    record_us = (time.perf_counter() - start) / rows * 1e6
+    start = time.perf_counter()
+    await store.flush()
+    flush_s = time.perf_counter() - start
+
+    samples = [(rng.choice(contracts), rng.choice(bots)) for _ in range(queries)]
+    store.counts(*samples[0][:1], bot_name=samples[0][1])  # соединение чтения и кэш страниц
+    start = time.perf_counter()
+    for contract, bot_name in samples:
+        store.counts(contract, bot_name=bot_name)
+    counts_us = (time.perf_counter() - start) / queries * 1e6
+    start = time.perf_counter()
+    for contract, _ in samples:
+        store.counts(ticker=None, contract=contract)
+    contract_us = (time.perf_counter() - start) / queries * 1e6
+    start = time.perf_counter()
+    for contract, bot_name in samples:
+        store.found_line(contract, bot_name)
+    found_line_us = (time.perf_counter() - start) / queries * 1e6
+    await store.close()
+    return {
+        'rows': rows,
+        'record_us': record_us,
+        'flush_rows_per_s': rows / flush_s if flush_s else 0.0,
+        'counts_contract_bot_us': counts_us,
+        'counts_contract_us': contract_us,
+        'found_line_us': found_line_us,
+    }
+
+def bench_signal_store(rows: int = 200000, queries: int = 2000) -> Dict[str, float]:
+    """Запись в буфер, пакетная вставка, запросы счетчиков 15m/3h/24h к базе и строка Found из памяти"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        return asyncio.run(_measure_signal_store(os.path.join(tmp_dir, 'signals.db'), rows, queries))
+
+def bench_startup(repeats: int = 3) -> Dict[str, float]:
+    """Время импорта монитора: прежний набор модулей против ленивых импортов (лучшее из repeats)"""
+    def best(module: str) -> float:
+        return min(import_breakdown(module)[0] for _ in range(repeats))
+
+    return {
+        # До: telethon, pyperclip и webbrowser импортировались вместе с монитором
+        'monitor_import_ms_before': best('advanced_monitor, sessions, pyperclip, webbrowser'),
+        # После: без них импортируется офлайн-прогон; монитор догружает telethon при подключении
+        'monitor_import_ms_after': best('advanced_monitor'),
+        'parser_import_ms_before': best('telegram_bot_parser, pyperclip, webbrowser'),
+        'parser_import_ms_after': best('telegram_bot_parser'),
+    }
+
+def main():
+    """Запуск бенчмарков"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Бенчмарки парсинга EugenBot")
+    arg_parser.add_argument('--config', default='config.json', help="Файл конфигурации")
+    arg_parser.add_argument('--iterations', type=int, default=2000, help="Количество прогонов корпуса")
+    arg_parser.add_argument('--updates', type=int, default=100000, help="Размер воспроизводимого потока обновлений")
+    arg_parser.add_argument('--json', action='store_true', help="Вывести результаты в JSON")
+    args = arg_parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    # Логи сканера не должны влиять на замеры
+    logging.disable(logging.INFO)
+
+    results = {
+        'patterns': bench_patterns(config, args.iterations),
+        'prefilter': bench_prefilter(config),
+        'contracts': bench_contracts(args.iterations),
+        'event_filter': bench_event_filter(config, args.updates),
+        'actions': bench_actions(),
+        'dedup': bench_dedup(),
+        'dedup_journal': bench_dedup_journal(),
+        'ingest': bench_ingest(),
+        'logging': bench_logging(),
+        'signal_store': bench_signal_store(),
+        'startup': bench_startup(),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("⏱️ Результаты бенчмарков (*_us - мкс на сообщение)")
+    print("=" * 50)
+    for section, values in results.items():
+        print(f"[{section}]")
+        for name, value in values.items():
+            formatted = f"{value:10.2f}" if isinstance(value, float) else f"{value:10}"
+            print(f"  {name:<28} {formatted}")
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,11 @@ import logging
 import os
 import sys
 from datetime import datetime
-from typing import Dict, List, Optional
-import webbrowser
-import pyperclip
+from typing import List, Optional
+
+from entity_cache import EntityCache
+from log_setup import setup_logging
+from pipeline import DEFAULT_MONITORED_BOTS, SignalPipeline
 
 try:
     from telethon import TelegramClient, events
@@ -22,15 +24,8 @@ except ImportError:
     print("Выполните: pip install telethon")
     sys.exit(1)
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot_monitor.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Настройка логирования: запись в файл и консоль выполняет фоновый поток
+setup_logging('bot_monitor.log', logging.INFO)
 logger = logging.getLogger(__name__)
 
 class BotMonitor:
@@ -45,28 +40,6 @@ class BotMonitor:
         """
         self.client = TelegramClient(session_name, api_id, api_hash)
         
-        # Список ботов для мониторинга
-        self.monitored_bots = {
-            'mexcTracker': {
-                'username': 'mexcTracker',
-                'pattern': r'(\w+)\s+\|\s+[\d.]+%\s+\|\s+(Long|Short)',
-                'dex_pattern': r'dexscreener\.com/(\w+)/([a-fA-F0-9x]+)',
-                'enabled': True
-            },
-            'kormushka_mexc': {
-                'username': 'kormushka_mexc',
-                'pattern': r'(\w+)\s+\+[\d.]+%\s+in\s+\d+\s+secs!',
-                'dex_pattern': r'gmgn\.ai/(\w+)/token/([a-fA-F0-9x]+)',
-                'enabled': True
-            },
-            'pumply_futures_dex': {
-                'username': 'pumply_futures_dex',
-                'pattern': r'🔻\s+(SHORT|LONG)\s+\$(\w+)\s+\+[\d.]+%\s+on\s+MEXC',
-                'dex_pattern': r'dexscreener\.com/(\w+)/([a-fA-F0-9x]+)',
-                'enabled': True
-            }
-        }
-        
         # Статистика
         self.stats = {
             'messages_processed': 0,
@@ -74,6 +47,12 @@ class BotMonitor:
             'errors': 0,
             'start_time': None
         }
+        
+        # Общий конвейер с ботами по умолчанию, без черного списка и дедупликации
+        self.pipeline = SignalPipeline.with_defaults(self.stats)
+        self.monitored_bots = DEFAULT_MONITORED_BOTS
+        self.router = self.pipeline.router
+        self.entity_cache = EntityCache()
 
     async def start(self):
         """Запуск клиента"""
@@ -86,118 +65,27 @@ class BotMonitor:
         await self.client.disconnect()
         logger.info("🛑 Telegram клиент остановлен")
 
-    def extract_ticker(self, message: str, bot_name: str) -> Optional[Dict]:
-        """Извлекает тикер из сообщения"""
-        try:
-            import re
-            
-            bot_config = self.monitored_bots[bot_name]
-            pattern = bot_config['pattern']
-            dex_pattern = bot_config['dex_pattern']
-            
-            # Ищем тикер
-            ticker_match = re.search(pattern, message)
-            if not ticker_match:
-                return None
-            
-            ticker = None
-            direction = None
-            
-            if bot_name == 'pumply_futures_dex':
-                direction = ticker_match.group(1)
-                ticker = ticker_match.group(2)
-            elif bot_name == 'mexc_tracker':
-                ticker = ticker_match.group(1)
-                direction = ticker_match.group(2)
-            else:  # kormushka_mexc
-                ticker = ticker_match.group(1)
-            
-            # Ищем DEX информацию
-            dex_match = re.search(dex_pattern, message)
-            dex_info = None
-            if dex_match:
-                if 'gmgn' in dex_pattern:
-                    chain = dex_match.group(1)
-                    contract = dex_match.group(2)
-                    dex_info = {
-                        'type': 'gmgn',
-                        'chain': chain,
-                        'contract': contract,
-                        'url': f"https://gmgn.ai/{chain}/token/{contract}"
-                    }
-                elif 'dexscreener' in dex_pattern:
-                    chain = dex_match.group(1)
-                    contract = dex_match.group(2)
-                    dex_info = {
-                        'type': 'dexscreener',
-                        'chain': chain,
-                        'contract': contract,
-                        'url': f"https://gmgn.ai/{chain}/token/{contract}"  # Конвертируем в GMGN
-                    }
-            
-            return {
-                'ticker': ticker,
-                'direction': direction,
-                'dex_info': dex_info,
-                'bot_name': bot_name
-            }
-            
-        except Exception as e:
-            logger.error(f"Ошибка извлечения тикера из {bot_name}: {e}")
-            return None
-
-    def convert_ticker_to_mexc(self, ticker: str) -> str:
-        """Конвертирует тикер в формат MEXC"""
-        return f"MEXC:{ticker}USDT.p"
-
-    def copy_to_clipboard(self, text: str) -> bool:
-        """Копирует текст в буфер обмена"""
-        try:
-            pyperclip.copy(text)
-            return True
-        except Exception as e:
-            logger.error(f"Ошибка копирования в буфер обмена: {e}")
-            return False
-
-    def open_gmgn(self, dex_info: Dict) -> bool:
-        """Открывает GMGN в браузере"""
-        try:
-            if not dex_info:
-                return False
-                
-            url = dex_info['url']
-            webbrowser.open(url)
-            return True
-        except Exception as e:
-            logger.error(f"Ошибка открытия GMGN: {e}")
-            return False
-
     async def process_message(self, message: str, bot_name: str, message_id: int):
         """Обрабатывает сообщение от бота"""
         try:
             self.stats['messages_processed'] += 1
             
             # Извлекаем тикер
-            ticker_data = self.extract_ticker(message, bot_name)
+            ticker_data = self.pipeline.extract(message, bot_name)
             if not ticker_data:
                 logger.debug(f"Тикер не найден в сообщении от {bot_name}")
                 return
             
-            self.stats['tickers_found'] += 1
             ticker = ticker_data['ticker']
             direction = ticker_data.get('direction', 'N/A')
-            dex_info = ticker_data.get('dex_info')
+            mexc_ticker = ticker_data['mexc_ticker']
             
-            # Конвертируем тикер
-            mexc_ticker = self.convert_ticker_to_mexc(ticker)
-            
-            # Копируем в буфер обмена
-            if self.copy_to_clipboard(mexc_ticker):
+            # Буфер обмена и GMGN
+            results = self.pipeline.dispatch(ticker_data)
+            if results['clipboard']:
                 logger.info(f"📋 Скопировано: {mexc_ticker}")
-            
-            # Открываем GMGN
-            if dex_info and self.open_gmgn(dex_info):
-                logger.info(f"🌐 Открыто GMGN: {dex_info['url']}")
+            if results['browser']:
+                logger.info(f"🌐 Открыто GMGN: {ticker_data['dex_info']['url']}")
             
             # Логируем результат
             logger.info(f"✅ Обработано от @{bot_name}: {ticker} -> {mexc_ticker} ({direction})")
@@ -215,30 +103,41 @@ class BotMonitor:
         uptime = datetime.now() - self.stats['start_time'] if self.stats['start_time'] else "N/A"
         logger.info(f"📊 Статистика: Обработано {self.stats['messages_processed']} сообщений, "
                    f"найдено {self.stats['tickers_found']} тикеров, "
+                   f"отклонено маршрутизатором {self.router.rejected}, "
                    f"ошибок {self.stats['errors']}, время работы: {uptime}")
 
-    @events.register(events.NewMessage)
+    def _sender_username(self, event) -> Optional[str]:
+        """Username отправителя, если это пользователь (бот)"""
+        if not isinstance(event.sender, User):
+            return None
+        return event.sender.username
+
+    async def _resolve_monitored_chats(self) -> Optional[List[int]]:
+        """Разрешает username ботов в peer_id для фильтра событий Telethon"""
+        usernames = {config['username'].lower(): config['username']
+                     for config in self.monitored_bots.values() if config['enabled']}
+        # Неверные ID из кэша удаляются и разрешаются заново
+        await self.entity_cache.verify(self.client, usernames.values())
+        peer_ids = await self.entity_cache.resolve(self.client, usernames.values())
+        for username, peer_id in peer_ids.items():
+            self.router.bind_peer(username, peer_id)
+        
+        if len(peer_ids) < len(usernames):
+            logger.warning("⚠️ Не все боты разрешены - фильтр по чатам отключен")
+            return None
+        return list(peer_ids.values())
+
     async def handle_new_message(self, event):
         """Обработчик новых сообщений"""
         try:
-            # Проверяем, что это сообщение от пользователя (бота)
-            if not isinstance(event.sender, User):
-                return
-            
-            sender_username = event.sender.username
-            if not sender_username:
-                return
-            
             # Проверяем, что это один из мониторимых ботов
-            bot_name = None
-            for name, config in self.monitored_bots.items():
-                if config['username'] == sender_username and config['enabled']:
-                    bot_name = name
-                    break
-            
-            if not bot_name:
+            route = self.router.route(event.sender_id, lambda: self._sender_username(event))
+            if not route:
                 return
             
+            bot_name, bot_config = route
+            sender_username = bot_config['username']
+            
             message_text = event.message.message
             message_id = event.message.id
             
@@ -256,8 +155,9 @@ class BotMonitor:
         try:
             await self.start()
             
-            # Регистрируем обработчик событий
-            self.client.add_event_handler(self.handle_new_message)
+            # Регистрируем обработчик событий только для мониторимых чатов
+            chats = await self._resolve_monitored_chats()
+            self.client.add_event_handler(self.handle_new_message, events.NewMessage(chats=chats))
             
             # Выводим информацию о мониторинге
             enabled_bots = [name for name, config in self.monitored_bots.items() if config['enabled']]
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Контрольные точки чатов и догрузка пропущенных сообщений
+Последний обработанный message_id каждого чата сохраняется, после переподключения догружаются только более новые
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class ChatCheckpoints:
+    """Последний обработанный message_id по (сессия, чат) с фоновым сохранением"""
+
+    def __init__(self, checkpoint_file: str = 'checkpoints.json', flush_interval: float = 2.0):
+        """
+        Args:
+            checkpoint_file: Файл контрольных точек
+            flush_interval: Период сохранения изменений в секундах
+        """
+        self.checkpoint_file = checkpoint_file
+        self.flush_interval = flush_interval
+        # ID сообщений личного чата с ботом у каждого аккаунта свои - ключ включает имя сессии
+        self.last_ids: Dict[str, int] = self._load()
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(session_name: str, chat_id: int) -> str:
+        return f"{session_name}:{chat_id}"
+
+    def _load(self) -> Dict[str, int]:
+        """Загружает контрольные точки из файла"""
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                return {key: int(message_id) for key, message_id in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"⚠️ Контрольные точки {self.checkpoint_file} повреждены, догрузка начнется заново: {e}")
+            return {}
+
+    def get(self, session_name: str, chat_id: int, snapshot: Optional[Dict[str, int]] = None) -> Optional[int]:
+        """Последний обработанный message_id чата (текущий или из снимка) или None"""
+        return (snapshot if snapshot is not None else self.last_ids).get(self._key(session_name, chat_id))
+
+    def snapshot(self) -> Dict[str, int]:
+        """Копия контрольных точек до подписки или на момент обрыва - живые сообщения ее не сдвигают"""
+        return dict(self.last_ids)
+
+    def update(self, session_name: str, chat_id: int, message_id: int):
+        """Запоминает обработанное сообщение (воркеры завершают записи не по порядку - храним максимум)"""
+        key = self._key(session_name, chat_id)
+        if message_id > self.last_ids.get(key, 0):
+            self.last_ids[key] = message_id
+            self._dirty = True
+
+    def save(self):
+        """Атомарно сохраняет контрольные точки в файл"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        tmp_file = f"{self.checkpoint_file}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.last_ids, f, indent=2, sort_keys=True)
+            os.replace(tmp_file, self.checkpoint_file)
+        except OSError as e:
+            self._dirty = True
+            logger.error(f"Ошибка сохранения контрольных точек: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.save()
+
+    def start(self):
+        """Запускает фоновое сохранение"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Останавливает фоновое сохранение и записывает последние изменения"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.save()
+
+class CatchUp:
+    """Ограниченная догрузка сообщений, пропущенных за время отключения"""
+
+    def __init__(self, checkpoints: ChatCheckpoints, max_messages: int = 200,
+                 max_age_seconds: float = 3600, stale_seconds: float = 120, batch_wait: float = 0.5):
+        """
+        Args:
+            checkpoints: Контрольные точки чатов
+            max_messages: Сколько самых новых пропущенных сообщений догружать на чат
+            max_age_seconds: Более старые сообщения не догружаются
+            stale_seconds: Сигналы старше обрабатываются без действий (только лог и журнал)
+            batch_wait: Пауза между пакетами по 100 сообщений
+        """
+        self.checkpoints = checkpoints
+        self.max_messages = max_messages
+        self.max_age_seconds = max_age_seconds
+        self.stale_seconds = stale_seconds
+        self.batch_wait = batch_wait
+        self.stats = {
+            'runs': 0,
+            'messages': 0,
+            'stale': 0,
+            'truncated': 0,
+            'errors': 0
+        }
+
+    async def fetch(self, client, session_name: str, chat_id: int,
+                    since: Optional[Dict[str, int]] = None) -> List:
+        """
+        Сообщения чата новее контрольной точки, от старых к новым
+
+        Чат без контрольной точки ничего не догружает: точкой становится его последнее сообщение
+
+        Args:
+            since: Снимок контрольных точек (ChatCheckpoints.snapshot); без него - текущие точки
+        """
+        min_id = self.checkpoints.get(session_name, chat_id, since)
+        if min_id is None:
+            latest = await client.get_messages(chat_id, limit=1)
+            if latest:
+                self.checkpoints.update(session_name, chat_id, latest[0].id)
+            return []
+
+        cutoff = time.time() - self.max_age_seconds
+        messages = []
+        # iter_messages идет от новых к старым пакетами по 100: останавливаемся на лимите или возрасте
+        async for message in client.iter_messages(chat_id, limit=self.max_messages, min_id=min_id,
+                                                  wait_time=self.batch_wait):
+            if message.date is not None and message.date.timestamp() < cutoff:
+                break
+            messages.append(message)
+        if len(messages) >= self.max_messages:
+            self.stats['truncated'] += 1
+            logger.warning(f"⚠️ Догрузка {chat_id}: пропущено больше {self.max_messages} сообщений, "
+                           f"обрабатываются только последние")
+        messages.reverse()
+        return messages
+
+    def is_stale(self, message) -> bool:
+        """Сигнал слишком старый для открытия браузера"""
+        return message.date is not None and time.time() - message.date.timestamp() > self.stale_seconds
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Отслеживание изменений config.json
+Новая конфигурация применяется без перезапуска сессий Telegram
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ConfigWatcher:
+    """Опрашивает файл конфигурации и передает разобранный JSON обработчику"""
+
+    def __init__(self, config_file: str, on_change: Callable[[Dict], bool], interval: float = 2.0):
+        """
+        Args:
+            config_file: Путь к файлу конфигурации
+            on_change: Применяет конфигурацию; False - конфигурация отклонена
+            interval: Период проверки файла в секундах
+        """
+        self.config_file = config_file
+        self.on_change = on_change
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        # (mtime_ns, размер) последней просмотренной версии и ее текст
+        self._signature: Optional[Tuple[int, int]] = self._stat()
+        self._content: Optional[str] = self._read() if self._signature else None
+        self.stats = {
+            'reloads': 0,
+            'failed': 0
+        }
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> Optional[str]:
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"❌ Не удалось прочитать {self.config_file}: {e}")
+            return None
+
+    def check(self) -> bool:
+        """
+        Проверяет файл и применяет изменившуюся конфигурацию
+
+        Returns:
+            True если новая конфигурация применена
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        # Запоминаем версию сразу: ошибка в файле логируется один раз, а не на каждом опросе
+        self._signature = signature
+
+        content = self._read()
+        if content is None or content == self._content:
+            return False
+        self._content = content
+
+        try:
+            config = json.loads(content)
+            if not isinstance(config, dict):
+                raise ValueError("корень конфигурации должен быть объектом")
+        except ValueError as e:
+            self.stats['failed'] += 1
+            logger.error(f"❌ {self.config_file} не применен, работает прежняя конфигурация: {e}")
+            return False
+
+        if not self.on_change(config):
+            self.stats['failed'] += 1
+            return False
+        self.stats['reloads'] += 1
+        return True
+
+    async def _watch_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"❌ Ошибка перезагрузки конфигурации: {e}")
+
+    def start(self):
+        """Запускает фоновую проверку файла"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch_loop())
+            logger.info(f"👀 Отслеживаются изменения {self.config_file} (каждые {self.interval:g} с)")
+
+    async def close(self):
+        """Останавливает проверку файла"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Поиск контракта в сообщении
+Кандидаты собираются отдельными поисками после проверки подстрок, затем применяются правила приоритета
+"""
+
+import logging
+from typing import Dict, Optional
+
+from patterns import (
+    CA_RE, CHAIN_RE, CONTRACT_RE, DEXSCREENER_CHAIN_RE, DEXSCREENER_LINK_RE,
+    GMGN_LINK_RE, NETWORK_RE, SOLANA_HINT_RE, SOLANA_MINT_RE
+)
+
+logger = logging.getLogger(__name__)
+
+# Конвертация названий сетей в формат GMGN
+CHAIN_MAPPING = {
+    'ethereum': 'eth',
+    'arbitrum': 'arb',
+    'bsc': 'bsc',
+    'polygon': 'polygon',
+    'base': 'base',
+    'solana': 'sol',
+    'avalanche': 'avax',
+    'sol': 'sol',  # Для network: SOL
+    'bep20': 'bsc'  # Для network: BEP20
+}
+
+class ContractCandidates:
+    """Первые вхождения каждого вида кандидатов в сообщении"""
+
+    __slots__ = ('mint', 'sol_hint', 'gmgn', 'dex_chain', 'dex_link',
+                 'ca', 'chain', 'contract', 'network')
+
+    def __init__(self):
+        self.mint: Optional[str] = None
+        self.sol_hint = False
+        self.gmgn: Optional[tuple] = None
+        self.dex_chain: Optional[str] = None
+        self.dex_link: Optional[tuple] = None
+        self.ca: Optional[str] = None
+        self.chain: Optional[str] = None
+        self.contract: Optional[str] = None
+        self.network: Optional[str] = None
+
+def _first_group(pattern, message: str) -> Optional[str]:
+    match = pattern.search(message)
+    return match.group(1) if match else None
+
+def scan_candidates(message: str) -> ContractCandidates:
+    """
+    Собирает кандидатов отдельными поисками, отсеянными по подстрокам
+
+    Текст один раз приводится к нижнему регистру. Для каждого кандидата
+    сначала проверяется ключевое слово ('sol', 'gmgn.ai/', 'dexscreener.com/',
+    'CA:', 'Chain:', 'contract:', 'network:'), и только при его наличии
+    запускается свое регулярное выражение - не более одного раза на паттерн.
+    Минт Solana с признаком сети завершает поиск сразу.
+    Общий паттерн-альтернатива в re не умеет быстрый поиск по литералу
+    и на длинных сообщениях медленнее отдельных поисков в 3-4 раза.
+    """
+    found = ContractCandidates()
+    lowered = message.lower()
+
+    # Поиск минта - самая дорогая проверка, без признака Solana он не нужен.
+    # 'ſ' (U+017F) совпадает с 's' при re.IGNORECASE, но lower() его не меняет
+    if 'sol' in lowered or '\u017fol' in lowered:
+        found.mint = _first_group(SOLANA_MINT_RE, message)
+        if found.mint is not None:
+            # Подстрока "solana" в любом регистре - уже признак, regex нужен только для слова SOL
+            found.sol_hint = ('solana' in lowered or '\u017folana' in lowered
+                              or SOLANA_HINT_RE.search(message) is not None)
+            if found.sol_hint:
+                # Приоритет 0 уже определен - остальные кандидаты не нужны
+                return found
+
+    if 'gmgn.ai/' in message:
+        gmgn_match = GMGN_LINK_RE.search(message)
+        if gmgn_match:
+            found.gmgn = (gmgn_match.group(1), gmgn_match.group(2))
+
+    if 'dexscreener.com/' in message:
+        found.dex_chain = _first_group(DEXSCREENER_CHAIN_RE, message)
+        dex_match = DEXSCREENER_LINK_RE.search(message)
+        if dex_match:
+            found.dex_link = (dex_match.group(1), dex_match.group(2))
+
+    if 'CA:' in message:
+        found.ca = _first_group(CA_RE, message)
+    if 'Chain:' in message:
+        found.chain = _first_group(CHAIN_RE, message)
+    if 'contract:' in lowered:
+        found.contract = _first_group(CONTRACT_RE, message)
+    if 'network:' in lowered:
+        found.network = _first_group(NETWORK_RE, message)
+    return found
+
+def _contract_result(type_: str, chain: str, contract: str) -> Dict:
+    return {
+        'type': type_,
+        'chain': chain,
+        'contract': contract,
+        'url': f"https://gmgn.ai/{chain}/token/{contract}"
+    }
+
+def _resolve_chain(field_chain: Optional[str], field_name: str, found: ContractCandidates) -> str:
+    """Сеть из поля сообщения, затем из ссылки dexscreener, иначе ethereum"""
+    if field_chain is not None:
+        chain = field_chain.lower()
+        logger.debug("🔍 Найдена сеть %s: %s", field_name, chain)
+    elif found.dex_chain is not None:
+        chain = found.dex_chain.lower()
+        logger.debug("🔍 Найдена сеть в dexscreener: %s", chain)
+    else:
+        chain = 'ethereum'
+        logger.debug("🔍 Используем сеть по умолчанию: %s", chain)
+
+    gmgn_chain = CHAIN_MAPPING.get(chain.lower(), chain.lower())
+    logger.debug("🔍 GMGN сеть: %s", gmgn_chain)
+    return gmgn_chain
+
+def select_contract_info(found: ContractCandidates) -> Optional[Dict]:
+    """Выбирает контракт из кандидатов по правилам приоритета"""
+    # 0. Одиночный солана-минт при наличии #SOLANA/sol/solana
+    if found.mint is not None and found.sol_hint:
+        logger.debug("🔍 Найден Solana mint: %s", found.mint)
+        return _contract_result('gmgn', 'sol', found.mint)
+
+    # 1. Прямая ссылка на GMGN
+    if found.gmgn is not None:
+        chain, contract = found.gmgn
+        logger.debug("🔍 Найдена GMGN ссылка: %s/%s", chain, contract)
+        return _contract_result('gmgn', chain, contract)
+
+    # 2. Контракт в формате CA: (полный контракт)
+    if found.ca is not None:
+        logger.debug("🔍 Найден контракт CA: %s", found.ca)
+        gmgn_chain = _resolve_chain(found.chain, 'Chain', found)
+        return _contract_result('contract', gmgn_chain, found.ca)
+
+    # 3. Контракт в формате contract: (для pumply_futures_dex)
+    if found.contract is not None:
+        logger.debug("🔍 Найден контракт contract: %s", found.contract)
+        gmgn_chain = _resolve_chain(found.network, 'network', found)
+        return _contract_result('contract', gmgn_chain, found.contract)
+
+    # 4. Контракт в ссылке dexscreener
+    if found.dex_link is not None:
+        chain, contract = found.dex_link
+        logger.debug("🔍 Найден контракт в dexscreener: %s на сети %s", contract, chain)
+        gmgn_chain = CHAIN_MAPPING.get(chain.lower(), chain.lower())
+        return _contract_result('dexscreener', gmgn_chain, contract)
+
+    logger.debug("🔍 Контракт не найден в сообщении")
+    return None
+
+def extract_contract_info(message: str) -> Optional[Dict]:
+    """Извлекает информацию о контракте и сети из сообщения"""
+    return select_contract_info(scan_candidates(message))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Корпус записанных сообщений для офлайн-прогона и регрессии парсеров
+JSONL (или JSONL.gz), одна запись на сообщение
+"""
+
+import gzip
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+# Поля записи корпуса:
+#   bot           - имя бота в config['monitored_bots']
+#   sender        - username отправителя (для маршрутизации)
+#   peer_id       - ID чата
+#   message_id    - ID сообщения
+#   date          - время публикации в Telegram (unix, секунды)
+#   text          - текст сообщения
+#   entity_urls   - ссылки из сущностей (в том числе скрытые)
+#   button_urls   - ссылки из inline-кнопок
+CORPUS_FIELDS = ('bot', 'sender', 'peer_id', 'message_id', 'date', 'text', 'entity_urls', 'button_urls')
+
+def collect_embedded_urls(message) -> List[str]:
+    """Извлекает встроенные URL из сущностей Telegram (включая скрытые ссылки)."""
+    urls: List[str] = []
+    try:
+        from telethon.tl.types import MessageEntityTextUrl, MessageEntityUrl
+        if message is None:
+            return urls
+        entities = getattr(message, 'entities', None) or []
+        message_text = message.message or ""
+        for ent in entities:
+            # Явные URL в тексте
+            if isinstance(ent, MessageEntityUrl):
+                try:
+                    urls.append(message_text[ent.offset: ent.offset + ent.length])
+                except Exception:
+                    pass
+            # Скрытые ссылки вида [GMGN](https://gmgn.ai/..)
+            if isinstance(ent, MessageEntityTextUrl) and getattr(ent, 'url', None):
+                urls.append(ent.url)
+    except Exception:
+        # Безопасно игнорируем ошибки извлечения
+        return urls
+    return urls
+
+def collect_button_urls(message) -> List[str]:
+    """Извлекает URL из inline-кнопок под сообщением (reply_markup)."""
+    urls: List[str] = []
+    try:
+        reply_markup = getattr(message, 'reply_markup', None)
+        if not reply_markup or not getattr(reply_markup, 'rows', None):
+            return urls
+        for row in reply_markup.rows:
+            buttons = getattr(row, 'buttons', []) or []
+            for btn in buttons:
+                # У кнопки с URL атрибут обычно называется url
+                url = getattr(btn, 'url', None)
+                if url:
+                    urls.append(url)
+    except Exception:
+        return urls
+    return urls
+
+def record_from_message(message, bot_name: str, sender: Optional[str], peer_id: Optional[int]) -> Dict:
+    """Запись корпуса из сообщения Telethon"""
+    return {
+        'bot': bot_name,
+        'sender': sender,
+        'peer_id': peer_id,
+        'message_id': message.id,
+        'date': message.date.timestamp() if message.date is not None else None,
+        'text': message.message or "",
+        'entity_urls': collect_embedded_urls(message),
+        'button_urls': collect_button_urls(message),
+    }
+
+def open_corpus(corpus_file: str, mode: str = 'r') -> TextIO:
+    """Открывает корпус, .gz сжимается и распаковывается прозрачно"""
+    if corpus_file.endswith('.gz'):
+        return gzip.open(corpus_file, mode + 't', encoding='utf-8')
+    return open(corpus_file, mode, encoding='utf-8')
+
+def read_corpus(corpus_file: str) -> Iterator[Dict]:
+    """Потоково читает записи корпуса, пропуская пустые и оборванные строки"""
+    with open_corpus(corpus_file) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def read_corpus_by_date(corpus_file: str) -> Iterable[Dict]:
+    """
+    Записи корпуса в порядке времени публикации
+
+    Backfill дописывает историю блоками по чатам, поэтому даты в файле могут идти назад.
+    Упорядоченный корпус читается потоково, остальные сортируются в памяти
+    """
+    last_date = None
+    for record in read_corpus(corpus_file):
+        date = record.get('date')
+        if date is None:
+            continue
+        if last_date is not None and date < last_date:
+            # Записи без даты остаются на месте относительно предыдущей датированной
+            ordered = []
+            current = float('-inf')
+            for record in read_corpus(corpus_file):
+                if record.get('date') is not None:
+                    current = record['date']
+                ordered.append((current, record))
+            ordered.sort(key=lambda item: item[0])
+            return [record for _, record in ordered]
+        last_date = date
+    return read_corpus(corpus_file)
+
+def write_corpus(corpus_file: str, records: Iterable[Dict], append: bool = False) -> int:
+    """
+    Записывает записи в корпус
+
+    Args:
+        corpus_file: Путь к файлу (.jsonl или .jsonl.gz)
+        records: Записи с полями CORPUS_FIELDS
+        append: Дописать в конец вместо перезаписи
+
+    Returns:
+        Количество записанных записей
+    """
+    count = 0
+    with open_corpus(corpus_file, 'a' if append else 'w') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            count += 1
+    return count
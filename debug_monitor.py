@@ -5,16 +5,20 @@
 Показывает все входящие сообщения для диагностики
 """
 
+# Первым: отсчет времени запуска начинается до остальных импортов
+from startup import STARTUP
+
 import asyncio
 import json
 import logging
 import os
 import sys
 from datetime import datetime
-from typing import Dict, List, Optional
-import webbrowser
-import pyperclip
-import re
+from typing import Dict
+
+from action_executor import ActionExecutor
+from log_setup import setup_logging
+from pipeline import SignalPipeline
 
 try:
     from telethon import TelegramClient, events
@@ -24,15 +28,10 @@ except ImportError:
     print("Выполните: pip install telethon")
     sys.exit(1)
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('debug_monitor.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+STARTUP.mark('imports')
+
+# Настройка логирования: запись в файл и консоль выполняет фоновый поток
+setup_logging('debug_monitor.log', logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DebugMonitor:
@@ -58,6 +57,15 @@ class DebugMonitor:
             'start_time': None,
             'last_activity': None
         }
+        
+        # Общий конвейер; источник сообщения заранее неизвестен - парсер перебирает всех ботов.
+        # Отладочный монитор не шлет уведомлений и не пищит, как и раньше
+        pipeline_config = dict(self.config, notifications={'enabled': False})
+        self.pipeline = SignalPipeline(pipeline_config, self.stats)
+        self.router = self.pipeline.router
+        # Буфер обмена и браузер - в пуле потоков, event loop не ждет
+        self.actions = ActionExecutor(workers=self.config['settings'].get('action_workers', 2))
+        self.action_timeouts = self.config['settings'].get('action_timeouts', {})
 
     def load_config(self, config_file: str) -> Dict:
         """Загружает конфигурацию из файла"""
@@ -74,150 +82,16 @@ class DebugMonitor:
     async def start(self):
         """Запуск клиента"""
         await self.client.start()
+        STARTUP.mark('connected')
         logger.info("🚀 Отладочный монитор запущен")
         self.stats['start_time'] = datetime.now()
 
     async def stop(self):
         """Остановка клиента"""
+        await self.actions.shutdown()
         await self.client.disconnect()
         logger.info("🛑 Монитор остановлен")
 
-    def extract_ticker_data(self, message: str, source_name: str) -> Optional[Dict]:
-        """Извлекает данные тикера из сообщения"""
-        try:
-            # Проверяем все паттерны ботов
-            for bot_name, bot_config in self.config['monitored_bots'].items():
-                if not bot_config['enabled']:
-                    continue
-                    
-                pattern = bot_config['pattern']
-                
-                # Ищем тикер
-                ticker_match = re.search(pattern, message)
-                if not ticker_match:
-                    continue
-                
-                ticker = None
-                direction = None
-                
-                if bot_name == 'pumply_futures_dex':
-                    direction = ticker_match.group(1)
-                    ticker = ticker_match.group(2)
-                elif bot_name == 'mexcTracker':
-                    ticker = ticker_match.group(1)
-                    direction = ticker_match.group(2)
-                else:  # kormushka_mexc
-                    ticker = ticker_match.group(1)
-                
-                # Ищем контракт и сеть в сообщении
-                dex_info = self.extract_contract_info(message)
-                
-                return {
-                    'ticker': ticker,
-                    'direction': direction,
-                    'dex_info': dex_info,
-                    'bot_name': bot_name,
-                    'timestamp': datetime.now()
-                }
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Ошибка извлечения данных: {e}")
-            return None
-
-    def extract_contract_info(self, message: str) -> Optional[Dict]:
-        """Извлекает информацию о контракте и сети из сообщения"""
-        try:
-            # Сначала ищем прямую ссылку на GMGN в сообщении
-            gmgn_match = re.search(r'gmgn\.ai/(\w+)/token/([a-fA-F0-9x]+)', message)
-            if gmgn_match:
-                chain = gmgn_match.group(1)
-                contract = gmgn_match.group(2)
-                return {
-                    'type': 'gmgn',
-                    'chain': chain,
-                    'contract': contract,
-                    'url': f"https://gmgn.ai/{chain}/token/{contract}"
-                }
-            
-            # Если GMGN ссылки нет, ищем контракт в формате CA: 0x...
-            ca_match = re.search(r'CA:\s*([a-fA-F0-9x]+)', message)
-            if not ca_match:
-                # Ищем контракт в ссылках dexscreener
-                dexscreener_match = re.search(r'dexscreener\.com/(\w+)/([a-fA-F0-9x]+)', message)
-                if dexscreener_match:
-                    chain = dexscreener_match.group(1)
-                    contract = dexscreener_match.group(2)
-                else:
-                    return None
-            else:
-                contract = ca_match.group(1)
-                # Ищем сеть в сообщении
-                chain_match = re.search(r'Chain:\s*(\w+)', message)
-                if chain_match:
-                    chain = chain_match.group(1).lower()
-                else:
-                    # Пробуем найти сеть в ссылках
-                    chain_match = re.search(r'dexscreener\.com/(\w+)/', message)
-                    if chain_match:
-                        chain = chain_match.group(1).lower()
-                    else:
-                        # По умолчанию ethereum
-                        chain = 'ethereum'
-            
-            # Конвертируем названия сетей в формат GMGN
-            chain_mapping = {
-                'ethereum': 'eth',
-                'arbitrum': 'arb',
-                'bsc': 'bsc',
-                'polygon': 'polygon',
-                'base': 'base',
-                'solana': 'sol',
-                'avalanche': 'avax'
-            }
-            
-            gmgn_chain = chain_mapping.get(chain.lower(), chain.lower())
-            
-            return {
-                'type': 'contract',
-                'chain': gmgn_chain,
-                'contract': contract,
-                'url': f"https://gmgn.ai/{gmgn_chain}/token/{contract}"
-            }
-            
-        except Exception as e:
-            logger.error(f"Ошибка извлечения контракта: {e}")
-            return None
-
-    def convert_ticker_to_mexc(self, ticker: str) -> str:
-        """Конвертирует тикер в формат MEXC"""
-        return f"MEXC:{ticker}USDT.p"
-
-    def copy_to_clipboard(self, text: str) -> bool:
-        """Копирует текст в буфер обмена"""
-        try:
-            if self.config['settings']['auto_copy_clipboard']:
-                pyperclip.copy(text)
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Ошибка копирования в буфер обмена: {e}")
-            return False
-
-    def open_gmgn(self, dex_info: Dict) -> bool:
-        """Открывает GMGN в браузере"""
-        try:
-            if not self.config['settings']['auto_open_gmgn'] or not dex_info:
-                return False
-                
-            url = dex_info['url']
-            webbrowser.open(url)
-            return True
-        except Exception as e:
-            logger.error(f"Ошибка открытия GMGN: {e}")
-            return False
-
     async def process_message(self, message: str, source_name: str, message_id: int):
         """Обрабатывает сообщение"""
         try:
@@ -227,26 +101,17 @@ class DebugMonitor:
             logger.info(f"📨 Сообщение от {source_name}: {message[:100]}...")
             
             # Извлекаем данные тикера
-            ticker_data = self.extract_ticker_data(message, source_name)
+            ticker_data = self.pipeline.extract(message)
             if not ticker_data:
                 logger.debug(f"Тикер не найден в сообщении от {source_name}")
                 return
             
-            self.stats['tickers_found'] += 1
             ticker = ticker_data['ticker']
             direction = ticker_data.get('direction', 'N/A')
-            dex_info = ticker_data.get('dex_info')
-            
-            # Конвертируем тикер
-            mexc_ticker = self.convert_ticker_to_mexc(ticker)
+            mexc_ticker = ticker_data['mexc_ticker']
             
-            # Копируем в буфер обмена
-            if self.copy_to_clipboard(mexc_ticker):
-                logger.info(f"📋 Скопировано: {mexc_ticker}")
-            
-            # Открываем GMGN
-            if self.open_gmgn(dex_info):
-                logger.info(f"🌐 Открыто GMGN: {dex_info['url']}")
+            # Буфер обмена и GMGN - в пуле потоков; результат каждого действия пишет SignalActions
+            self.pipeline.dispatch(ticker_data, self.actions, self.action_timeouts)
             
             # Логируем результат
             logger.info(f"✅ Обработано от {source_name}: {ticker} -> {mexc_ticker} ({direction})")
@@ -282,14 +147,10 @@ class DebugMonitor:
             logger.info(f"🔍 [{source_type}] {source_name}: {message_text[:200]}...")
             
             # Проверяем, что это один из мониторимых каналов/ботов
-            target_username = None
-            if hasattr(sender, 'username') and sender.username:
-                for bot_name, bot_config in self.config['monitored_bots'].items():
-                    if bot_config['username'] == sender.username and bot_config['enabled']:
-                        target_username = sender.username
-                        break
+            route = self.router.route(event.sender_id, lambda: getattr(sender, 'username', None))
             
-            if target_username:
+            if route:
+                target_username = route[1]['username']
                 logger.info(f"🎯 Найден мониторимый канал/бот: @{target_username}")
                 await self.process_message(message_text, target_username, message_id)
             else:
@@ -311,13 +172,17 @@ class DebugMonitor:
     async def run(self):
         """Основной цикл работы"""
         try:
+            # Обработчик регистрируется до подключения - сообщения не теряются, пока идет запуск
+            self.client.add_event_handler(self.handle_new_message)
+            STARTUP.mark('handler_registered')
             await self.start()
+            logger.info(STARTUP.format_line())
             
-            # Показываем список диалогов
-            await self.list_dialogs()
+            # Модули действий догружаются в фоне, когда обработчик уже работает
+            asyncio.get_running_loop().run_in_executor(None, self.pipeline.actions.preload)
             
-            # Регистрируем обработчик событий
-            self.client.add_event_handler(self.handle_new_message)
+            # Обход всех диалогов долгий - только после регистрации обработчика
+            await self.list_dialogs()
             
             # Выводим информацию о мониторинге
             enabled_bots = [f"@{config['username']}" for name, config in self.config['monitored_bots'].items() if config['enabled']]
@@ -336,6 +201,7 @@ class DebugMonitor:
             await self.stop()
             logger.info(f"📊 Статистика: Обработано {self.stats['messages_processed']} сообщений, "
                        f"найдено {self.stats['tickers_found']} тикеров, "
+                       f"отклонено маршрутизатором {self.router.rejected}, "
                        f"ошибок {self.stats['errors']}")
 
 def main():
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Дедупликация тикеров и сообщений
+Очереди по времени и LRU вместо полного обхода словарей
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional, Tuple
+
+class TickerDeduplicator:
+    """Хранилище недавно обработанных тикеров с амортизированной O(1) проверкой"""
+
+    def __init__(self, window_minutes: float, max_entries: int = 1000,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            window_minutes: Окно дедупликации в минутах (deduplication.window_minutes)
+            max_entries: Максимальное количество хранимых тикеров
+            clock: Источник времени в секундах
+        """
+        self.window_minutes = window_minutes
+        self.max_entries = max_entries
+        self.clock = clock
+        # {тикер: время обработки}; порядок вставки совпадает с порядком времени
+        self._entries: 'OrderedDict[str, float]' = OrderedDict()
+
+    def _evict_expired(self, now: float):
+        """Удаляет устаревшие записи с начала (самые старые)"""
+        entries = self._entries
+        while entries:
+            ticker, timestamp = next(iter(entries.items()))
+            if (now - timestamp) / 60 < self.window_minutes:
+                break
+            del entries[ticker]
+
+    def check(self, ticker: str, now: Optional[float] = None) -> Optional[float]:
+        """
+        Проверяет тикер и запоминает его, если он не дубликат
+
+        Args:
+            ticker: Тикер (регистр уже нормализован вызывающим кодом)
+            now: Текущее время в секундах (по умолчанию clock())
+
+        Returns:
+            Сколько секунд назад тикер уже был обработан, или None если не дубликат
+        """
+        if now is None:
+            now = self.clock()
+        self._evict_expired(now)
+
+        timestamp = self._entries.get(ticker)
+        if timestamp is not None:
+            # После очистки в словаре остаются только записи внутри окна
+            return now - timestamp
+
+        self._entries[ticker] = now
+        if len(self._entries) > self.max_entries:
+            # Удаляем самые старые записи
+            for _ in range(min(100, len(self._entries))):
+                self._entries.popitem(last=False)
+        return None
+
+    def restore(self, ticker: str, timestamp: float):
+        """Восстанавливает запись из журнала (записи идут в порядке времени)"""
+        self._entries[ticker] = timestamp
+        self._entries.move_to_end(ticker)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def items(self) -> List[Tuple[str, float]]:
+        """Снимок записей от старых к новым"""
+        return list(self._entries.items())
+
+    def clear(self):
+        """Удаляет все записи"""
+        self._entries.clear()
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class MessageIdCache:
+    """Ограниченный LRU-кэш обработанных сообщений по ключу (peer_id, message_id)"""
+
+    def __init__(self, max_size: int = 1000):
+        """
+        Args:
+            max_size: Максимальное количество хранимых сообщений
+        """
+        self.max_size = max_size
+        self._entries: 'OrderedDict[Tuple[Hashable, int], None]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def seen(self, peer_id: Hashable, message_id: int) -> bool:
+        """
+        Проверяет сообщение и запоминает его, если оно новое
+
+        Returns:
+            True если сообщение уже обрабатывалось
+        """
+        key = (peer_id, message_id)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        self._entries[key] = None
+        if len(self._entries) > self.max_size:
+            # Вытесняем давно не встречавшееся сообщение
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return False
+
+    def restore(self, peer_id: Hashable, message_id: int):
+        """Восстанавливает запись из журнала без учета в счетчиках"""
+        key = (peer_id, message_id)
+        self._entries[key] = None
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def keys(self) -> List[Tuple[Hashable, int]]:
+        """Снимок ключей от давних к недавним"""
+        return list(self._entries)
+
+    def __contains__(self, key: Tuple[Hashable, int]) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
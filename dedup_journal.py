@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Журнал состояния дедупликации на диске
+Переживает перезапуск: тикеры и ID сообщений восстанавливаются при старте
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Hashable, List, Optional
+
+from dedup import MessageIdCache, TickerDeduplicator
+
+logger = logging.getLogger(__name__)
+
+class DedupJournal:
+    """Append-only журнал тикеров и сообщений с фоновой записью и компактификацией
+
+    Формат - по записи на строку:
+        t<TAB>время<TAB>тикер
+        m<TAB>peer_id<TAB>message_id
+    """
+
+    def __init__(self, journal_file: str, tickers: TickerDeduplicator, messages: MessageIdCache,
+                 flush_interval: float = 1.0, compact_ratio: int = 4):
+        """
+        Args:
+            journal_file: Путь к файлу журнала
+            tickers: Дедупликатор тикеров, который восстанавливается из журнала
+            messages: Кэш обработанных сообщений
+            flush_interval: Период сброса буфера на диск в секундах
+            compact_ratio: Во сколько раз журнал может превышать живое состояние до компактификации
+        """
+        self.journal_file = journal_file
+        self.tickers = tickers
+        self.messages = messages
+        self.flush_interval = flush_interval
+        self.compact_ratio = compact_ratio
+        self._buffer: List[str] = []
+        self._journal_lines = 0
+        # Один поток: запись и компактификация никогда не идут одновременно
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dedup-journal')
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            'replayed': 0,
+            'replay_ms': 0.0,
+            'flushes': 0,
+            'compactions': 0
+        }
+
+    def load(self) -> int:
+        """
+        Восстанавливает состояние из журнала (вызывается один раз при запуске)
+
+        Returns:
+            Количество восстановленных записей
+        """
+        start = time.perf_counter()
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                lines = f.read().split('\n')
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось прочитать журнал дедупликации {self.journal_file}: {e}")
+            return 0
+
+        # Журнал упорядочен по времени, а в памяти живет только его хвост:
+        # читаем с конца, пока не наберем окно тикеров и лимит кэша сообщений
+        oldest = time.time() - self.tickers.window_minutes * 60
+        tickers = {}
+        messages = {}
+        tickers_done = self.tickers.max_entries <= 0
+        messages_done = self.messages.max_size <= 0
+        for line in reversed(lines):
+            if tickers_done and messages_done:
+                break
+            parts = line.split('\t', 2)
+            if len(parts) != 3:
+                # Пустая или оборванная при аварийном завершении строка
+                continue
+            kind, first, second = parts
+            try:
+                if kind == 't':
+                    if tickers_done or second in tickers:
+                        continue
+                    timestamp = float(first)
+                    if timestamp <= oldest:
+                        tickers_done = True
+                        continue
+                    tickers[second] = timestamp
+                    tickers_done = len(tickers) >= self.tickers.max_entries
+                elif kind == 'm':
+                    if messages_done:
+                        continue
+                    messages[(self._parse_peer(first), int(second))] = None
+                    messages_done = len(messages) >= self.messages.max_size
+            except ValueError:
+                continue
+
+        # Восстанавливаем от старых записей к новым, чтобы сохранить порядок вытеснения
+        for ticker, timestamp in reversed(list(tickers.items())):
+            self.tickers.restore(ticker, timestamp)
+        for peer_id, message_id in reversed(list(messages)):
+            self.messages.restore(peer_id, message_id)
+        replayed = len(tickers) + len(messages)
+
+        self._journal_lines = len(lines)
+        self.stats['replayed'] = replayed
+        self.stats['replay_ms'] = (time.perf_counter() - start) * 1000
+        logger.info(f"💾 Восстановлено {replayed} записей дедупликации за {self.stats['replay_ms']:.1f} мс")
+        return replayed
+
+    @staticmethod
+    def _parse_peer(value: str) -> Hashable:
+        """peer_id хранится числом, а при его отсутствии - именем бота"""
+        try:
+            return int(value)
+        except ValueError:
+            return value
+
+    def record_ticker(self, ticker: str, timestamp: float):
+        """Добавляет обработанный тикер в буфер записи"""
+        self._buffer.append(f"t\t{timestamp:.3f}\t{ticker}\n")
+
+    def record_message(self, peer_id: Hashable, message_id: int):
+        """Добавляет обработанное сообщение в буфер записи"""
+        self._buffer.append(f"m\t{peer_id}\t{message_id}\n")
+
+    def _append(self, lines: List[str]):
+        """Дописывает строки в журнал (выполняется в потоке записи)"""
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+
+    def _rewrite(self, lines: List[str]):
+        """Атомарно заменяет журнал живым состоянием (выполняется в потоке записи)"""
+        tmp_file = f"{self.journal_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        os.replace(tmp_file, self.journal_file)
+
+    def _snapshot(self) -> List[str]:
+        """Живое состояние в формате журнала"""
+        lines = [f"t\t{timestamp:.3f}\t{ticker}\n" for ticker, timestamp in self.tickers.items()]
+        lines.extend(f"m\t{peer_id}\t{message_id}\n" for peer_id, message_id in self.messages.keys())
+        return lines
+
+    async def flush(self):
+        """Сбрасывает буфер на диск, при разрастании журнала - компактифицирует его"""
+        if not self._buffer:
+            return
+        loop = asyncio.get_running_loop()
+        live = len(self.tickers) + len(self.messages)
+        if self._journal_lines + len(self._buffer) > max(live, 1000) * self.compact_ratio:
+            # Снимок уже содержит все буферизованные записи
+            lines = self._snapshot()
+            self._buffer = []
+            await loop.run_in_executor(self._writer, self._rewrite, lines)
+            self._journal_lines = len(lines)
+            self.stats['compactions'] += 1
+        else:
+            lines, self._buffer = self._buffer, []
+            await loop.run_in_executor(self._writer, self._append, lines)
+            self._journal_lines += len(lines)
+        self.stats['flushes'] += 1
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError as e:
+                logger.error(f"Ошибка записи журнала дедупликации: {e}")
+
+    def start(self):
+        """Запускает фоновый сброс журнала"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Останавливает фоновый сброс и записывает остаток буфера"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except OSError as e:
+            logger.error(f"Ошибка записи журнала дедупликации: {e}")
+        self._writer.shutdown(wait=True)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Кэш username -> peer_id мониторимых ботов
+Разрешает username один раз и сохраняет результат в локальный файл
+"""
+
+import json
+import logging
+import os
+from typing import Dict, Iterable, Set
+
+logger = logging.getLogger(__name__)
+
+class EntityCache:
+    """Постоянный кэш числовых ID каналов и ботов"""
+
+    def __init__(self, cache_file: str = 'entity_cache.json'):
+        self.cache_file = cache_file
+        self.peer_ids: Dict[str, int] = self._load()
+        # Username, ID которых в этом запуске получен или подтвержден через Telegram
+        self.verified: Set[str] = set()
+        self.network_calls = 0
+
+    def _load(self) -> Dict[str, int]:
+        """Загружает кэш из файла"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return {username.lower(): int(peer_id) for username, peer_id in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"⚠️ Кэш сущностей {self.cache_file} поврежден, будет создан заново: {e}")
+            return {}
+
+    def save(self):
+        """Атомарно сохраняет кэш в файл"""
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.peer_ids, f, indent=2, sort_keys=True)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.error(f"Ошибка сохранения кэша сущностей: {e}")
+
+    def invalidate(self, username: str):
+        """Удаляет username из кэша (например, если канал сменил username)"""
+        if self.peer_ids.pop(username.lower(), None) is not None:
+            self.save()
+
+    async def resolve(self, client, usernames: Iterable[str]) -> Dict[str, int]:
+        """
+        Разрешает username в peer_id, обращаясь к Telegram только при промахе кэша
+
+        Args:
+            client: Подключенный TelegramClient
+            usernames: Username ботов и каналов
+
+        Returns:
+            Словарь username в нижнем регистре -> peer_id для разрешенных сущностей
+        """
+        resolved: Dict[str, int] = {}
+        changed = False
+        for username in usernames:
+            key = username.lower()
+            peer_id = self.peer_ids.get(key)
+            if peer_id is None:
+                try:
+                    self.network_calls += 1
+                    peer_id = await client.get_peer_id(username)
+                except Exception as e:
+                    logger.error(f"❌ Не удалось разрешить @{username}: {e}")
+                    continue
+                self.peer_ids[key] = peer_id
+                self.verified.add(key)
+                changed = True
+                logger.info(f"🔗 @{username} -> {peer_id}")
+            resolved[key] = peer_id
+
+        if changed:
+            self.save()
+        return resolved
+
+    async def verify(self, client, usernames: Iterable[str]) -> Dict[str, int]:
+        """
+        Проверяет ID из кэша, еще не подтвержденные в этом запуске: username сущности должен совпасть
+
+        Неверный ID фильтр чатов молча и навсегда отсекает сообщения бота, поэтому
+        несовпавшие записи удаляются из кэша и при следующем resolve разрешаются заново
+
+        Args:
+            client: Подключенный TelegramClient
+            usernames: Username ботов и каналов
+
+        Returns:
+            Словарь username в нижнем регистре -> неверный peer_id из кэша
+        """
+        stale: Dict[str, int] = {}
+        for username in usernames:
+            key = username.lower()
+            peer_id = self.peer_ids.get(key)
+            if peer_id is None or key in self.verified:
+                continue
+            try:
+                self.network_calls += 1
+                entity = await client.get_entity(peer_id)
+            except ValueError:
+                # Сессия не знает такой ID
+                entity = None
+            except Exception as e:
+                # Сетевая ошибка ничего не говорит о записи - проверим в следующий раз
+                logger.error(f"❌ Не удалось проверить @{username} ({peer_id}): {e}")
+                continue
+
+            names = [getattr(entity, 'username', None)]
+            names += [getattr(item, 'username', None) for item in getattr(entity, 'usernames', None) or []]
+            if key in {name.lower() for name in names if name}:
+                self.verified.add(key)
+                continue
+            logger.warning(f"⚠️ @{username}: ID {peer_id} из кэша принадлежит другой сущности - разрешаем заново")
+            stale[key] = peer_id
+            self.invalidate(username)
+        return stale
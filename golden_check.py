@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Проверка извлечения контрактов на эталонном корпусе
+Сравнивает результат contract_scanner с сохраненными ожидаемыми значениями
+"""
+
+import json
+import logging
+import sys
+
+import contract_scanner
+
+def check_golden(corpus_file: str = 'golden_contracts.json') -> int:
+    """Возвращает количество расхождений с эталоном"""
+    with open(corpus_file, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    mismatches = 0
+    for i, entry in enumerate(corpus, 1):
+        actual = contract_scanner.extract_contract_info(entry['message'])
+        if actual != entry['expected']:
+            mismatches += 1
+            print(f"❌ Запись {i}: ожидалось {entry['expected']}, получено {actual}")
+
+    print(f"📊 Проверено {len(corpus)} сообщений, расхождений: {mismatches}")
+    return mismatches
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    corpus_file = sys.argv[1] if len(sys.argv) > 1 else 'golden_contracts.json'
+    sys.exit(1 if check_golden(corpus_file) else 0)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ограниченная очередь входящих сообщений между обработчиком Telethon и пайплайном
+Обработчик только ставит запись в очередь, разбор и действия выполняют воркеры
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'drop_lowest_priority')
+
+class IngestRecord:
+    """Легкая запись о входящем сообщении"""
+
+    __slots__ = ('bot_name', 'peer_id', 'message_id', 'text', 'urls',
+                 'priority', 'received_at', 'enqueued_at', 'trace', 'source')
+
+    def __init__(self, bot_name: str, peer_id: Optional[int], message_id: int, text: str,
+                 urls: Optional[List[str]] = None, priority: int = 0,
+                 received_at: Optional[float] = None, trace=None,
+                 source: Optional[Tuple[str, int]] = None):
+        self.bot_name = bot_name
+        self.peer_id = peer_id
+        self.message_id = message_id
+        self.text = text
+        self.urls = urls or []
+        self.priority = priority
+        self.received_at = received_at if received_at is not None else time.time()
+        self.enqueued_at = 0.0
+        # SignalTrace с отметками этапов (если задержки отслеживаются)
+        self.trace = trace
+        # (сессия, chat_id) для контрольной точки чата; None - сообщение не из Telegram
+        self.source = source
+
+class IngestQueue:
+    """Ограниченная очередь с пулом воркеров и политикой переполнения"""
+
+    def __init__(self, handler: Callable[[IngestRecord], Awaitable[None]], maxsize: int = 1000,
+                 workers: int = 4, overflow_policy: str = 'block'):
+        """
+        Args:
+            handler: Корутина обработки одной записи
+            maxsize: Максимальная глубина очереди
+            workers: Количество задач-обработчиков
+            overflow_policy: block - ждать места, drop_oldest - вытеснить самую старую запись,
+                drop_lowest_priority - вытеснить запись с наименьшим приоритетом
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Неизвестная политика переполнения: {overflow_policy}")
+        self.handler = handler
+        self.maxsize = maxsize
+        self.workers = workers
+        self.overflow_policy = overflow_policy
+        self._items: deque = deque()
+        self._changed: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+        self._in_progress = 0
+        self.stats = {
+            'enqueued': 0,
+            'processed': 0,
+            'dropped': 0,
+            'max_depth': 0,
+            'wait_ms_total': 0.0,
+            'wait_ms_max': 0.0
+        }
+
+    def start(self):
+        """Запускает воркеры (вызывается внутри event loop)"""
+        if self._tasks:
+            return
+        self._changed = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    def depth(self) -> int:
+        """Текущая глубина очереди"""
+        return len(self._items)
+
+    def _drop_one(self, record: IngestRecord) -> bool:
+        """
+        Освобождает место по политике переполнения
+
+        Returns:
+            False если отбросить нужно саму новую запись
+        """
+        if self.overflow_policy == 'drop_oldest':
+            dropped = self._items.popleft()
+        else:
+            # Переполнение редкое, линейный поиск по очереди дешевле поддержки кучи
+            dropped = min(self._items, key=lambda item: item.priority)
+            if dropped.priority > record.priority:
+                dropped = record
+            else:
+                self._items.remove(dropped)
+        self.stats['dropped'] += 1
+        logger.warning(f"⚠️ Очередь переполнена, отброшено сообщение {dropped.message_id} от {dropped.bot_name}")
+        return dropped is not record
+
+    async def put(self, record: IngestRecord):
+        """Ставит запись в очередь согласно политике переполнения"""
+        async with self._changed:
+            if len(self._items) >= self.maxsize:
+                if self.overflow_policy == 'block':
+                    await self._changed.wait_for(lambda: len(self._items) < self.maxsize)
+                elif not self._drop_one(record):
+                    return
+            record.enqueued_at = time.perf_counter()
+            self._items.append(record)
+            self.stats['enqueued'] += 1
+            if len(self._items) > self.stats['max_depth']:
+                self.stats['max_depth'] = len(self._items)
+            self._changed.notify_all()
+
+    async def _worker(self, index: int):
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: bool(self._items))
+                record = self._items.popleft()
+                self._in_progress += 1
+                # Освободилось место - будим заблокированных производителей
+                self._changed.notify_all()
+
+            wait_ms = (time.perf_counter() - record.enqueued_at) * 1000
+            self.stats['wait_ms_total'] += wait_ms
+            if wait_ms > self.stats['wait_ms_max']:
+                self.stats['wait_ms_max'] = wait_ms
+            try:
+                await self.handler(record)
+            except Exception as e:
+                logger.error(f"Ошибка обработки сообщения {record.message_id} от {record.bot_name}: {e}")
+            finally:
+                self.stats['processed'] += 1
+                async with self._changed:
+                    self._in_progress -= 1
+                    self._changed.notify_all()
+
+    def metrics(self) -> Dict[str, float]:
+        """Глубина очереди и время ожидания записей"""
+        processed = self.stats['processed']
+        return {
+            'depth': len(self._items),
+            'max_depth': self.stats['max_depth'],
+            'enqueued': self.stats['enqueued'],
+            'dropped': self.stats['dropped'],
+            'wait_ms_avg': self.stats['wait_ms_total'] / processed if processed else 0.0,
+            'wait_ms_max': self.stats['wait_ms_max']
+        }
+
+    async def stop(self, timeout: float = 5.0):
+        """Дожидается обработки очереди и останавливает воркеры"""
+        if not self._tasks:
+            return
+        # Остановка может быть вызвана из самого воркера (лимит ошибок) - его не ждем
+        current = asyncio.current_task()
+        own = 1 if current in self._tasks else 0
+        try:
+            async with self._changed:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: not self._items and self._in_progress <= own),
+                    timeout
+                )
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ В очереди осталось {len(self._items)} необработанных сообщений")
+        others = [task for task in self._tasks if task is not current]
+        for task in others:
+            task.cancel()
+        await asyncio.gather(*others, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Задержка сигнала от публикации в Telegram до выполнения действий
+Отметки времени по этапам пайплайна и перцентили задержек по ботам
+"""
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Этапы в порядке прохождения сигнала
+STAGES = ('message_date', 'received', 'routed', 'parsed', 'filtered',
+          'action_dispatched', 'action_completed')
+
+# Сводные интервалы: доставка Telegram отдельно от нашего кода
+SPANS = {
+    'telegram': ('message_date', 'received'),
+    'internal': ('received', 'action_completed'),
+    'total': ('message_date', 'action_completed'),
+}
+
+class SignalTrace:
+    """Отметки времени одного сообщения по этапам"""
+
+    __slots__ = ('bot_name', 'message_id', 'peer_id', 'date', 'marks', 'recorded')
+
+    def __init__(self, bot_name: str, message_id: Optional[int] = None, peer_id: Optional[int] = None,
+                 date: Optional[float] = None):
+        self.bot_name = bot_name
+        self.message_id = message_id
+        self.peer_id = peer_id
+        # Время публикации в Telegram: им датируется сигнал в журнале и хранилище.
+        # Отметка message_date ставится только для живых сообщений - догрузка исказила бы задержки
+        self.date = date
+        self.marks: Dict[str, float] = {}
+        self.recorded = False
+
+    def mark(self, stage: str, timestamp: Optional[float] = None):
+        """Отмечает этап (по умолчанию - текущим временем)"""
+        self.marks[stage] = timestamp if timestamp is not None else time.time()
+
+    def intervals(self) -> Dict[str, float]:
+        """Длительности этапов и сводных интервалов в миллисекундах"""
+        result: Dict[str, float] = {}
+        previous = None
+        for stage in STAGES:
+            if stage not in self.marks:
+                continue
+            if previous is not None:
+                result[f"{previous}->{stage}"] = (self.marks[stage] - self.marks[previous]) * 1000
+            previous = stage
+        for span, (begin, end) in SPANS.items():
+            if begin in self.marks and end in self.marks:
+                result[span] = (self.marks[end] - self.marks[begin]) * 1000
+        return result
+
+class LatencyHistogram:
+    """Последние замеры одного интервала с расчетом перцентилей"""
+
+    def __init__(self, max_samples: int = 2048):
+        self.samples: deque = deque(maxlen=max_samples)
+        self.count = 0
+
+    def add(self, value_ms: float):
+        self.samples.append(value_ms)
+        self.count += 1
+
+    def percentiles(self, points=(50, 95, 99)) -> Dict[str, float]:
+        """Перцентили по последним замерам (метод ближайшего ранга)"""
+        if not self.samples:
+            return {}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        result = {f"p{point}": ordered[min(last, int(round(point / 100 * last)))] for point in points}
+        result['max'] = ordered[-1]
+        result['count'] = self.count
+        return result
+
+class LatencyTracker:
+    """Гистограммы задержек по ботам и интервалам"""
+
+    def __init__(self, max_samples: int = 2048):
+        """
+        Args:
+            max_samples: Сколько последних замеров хранить на интервал
+        """
+        self.max_samples = max_samples
+        self._histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+
+    def record(self, trace: SignalTrace):
+        """Добавляет завершенный трейс в гистограммы (повторный вызов игнорируется)"""
+        if trace.recorded:
+            return
+        trace.recorded = True
+        histograms = self._histograms.setdefault(trace.bot_name, {})
+        for name, value_ms in trace.intervals().items():
+            histogram = histograms.get(name)
+            if histogram is None:
+                histogram = histograms[name] = LatencyHistogram(self.max_samples)
+            histogram.add(value_ms)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Перцентили по ботам: {бот: {интервал: {p50, p95, p99, max, count}}}"""
+        return {
+            bot_name: {name: histogram.percentiles() for name, histogram in histograms.items()}
+            for bot_name, histograms in self._histograms.items()
+        }
+
+    def format_lines(self) -> List[str]:
+        """Строки для print_stats: сводные интервалы по каждому боту"""
+        lines = []
+        for bot_name, histograms in self._histograms.items():
+            parts = []
+            for span in SPANS:
+                histogram = histograms.get(span)
+                if histogram is None or not histogram.samples:
+                    continue
+                p = histogram.percentiles()
+                parts.append(f"{span} {p['p50']:.0f}/{p['p95']:.0f}/{p['p99']:.0f}")
+            if parts:
+                lines.append(f"⏱️ @{bot_name} задержка p50/p95/p99, мс: {', '.join(parts)}")
+        return lines
+
+    def snapshot(self) -> Dict:
+        """Перцентили на текущий момент для сохранения"""
+        return {'generated_at': time.time(), 'bots': self.summary()}
+
+    def dump(self, dump_file: str):
+        """Атомарно сохраняет перцентили в JSON"""
+        self.write(dump_file, self.snapshot())
+
+    @staticmethod
+    def write(dump_file: str, snapshot: Dict):
+        """Атомарно записывает снимок перцентилей (можно вызывать из потока записи)"""
+        tmp_file = f"{dump_file}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_file, dump_file)
+        except OSError as e:
+            logger.error(f"Ошибка сохранения статистики задержек: {e}")
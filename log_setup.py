@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Неблокирующее логирование для мониторов
+Event loop только кладет запись в очередь, запись в файл и консоль - в фоновом потоке
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Кладет запись в очередь как есть: сообщение форматируется уже в потоке слушателя"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Стандартный prepare форматирует запись в вызывающем потоке (то есть в event loop).
+        # Очередь внутрипроцессная, поэтому запись можно передать без сериализации
+        return record
+
+def setup_logging(log_file: str, level: int = logging.INFO,
+                  fmt: str = LOG_FORMAT) -> logging.handlers.QueueListener:
+    """
+    Настраивает корневой логгер через QueueHandler и фоновый QueueListener
+
+    Args:
+        log_file: Файл лога
+        level: Уровень логирования
+        fmt: Формат записей
+
+    Returns:
+        Запущенный слушатель (останавливается автоматически при выходе)
+    """
+    global _listener
+
+    formatter = logging.Formatter(fmt)
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    # Повторная настройка (например, второй монитор в процессе) заменяет слушателя
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    return _listener
+
+def stop_logging():
+    """Дописывает оставшиеся записи и останавливает фоновый поток"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(stop_logging)
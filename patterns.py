@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Реестр скомпилированных регулярных выражений
+Паттерны ботов компилируются один раз при загрузке конфигурации
+"""
+
+import re
+from typing import Callable, Dict, Iterator, List, Match, Optional, Pattern, Sequence, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Паттерны извлечения контрактов (общие для всех мониторов)
+SOLANA_MINT_RE = re.compile(r'\b([1-9A-HJ-NP-Za-km-z]{32,44})\b')
+SOLANA_HINT_RE = re.compile(r'(#?SOLANA|\bsolana\b|\bSOL\b)', re.IGNORECASE)
+GMGN_LINK_RE = re.compile(r'gmgn\.ai/(\w+)/token/([a-fA-F0-9x]+|[1-9A-HJ-NP-Za-km-z]+)')
+GMGN_HEX_LINK_RE = re.compile(r'gmgn\.ai/(\w+)/token/([a-fA-F0-9x]+)')
+DEXSCREENER_LINK_RE = re.compile(r'dexscreener\.com/(\w+)/([^)]+)')
+DEXSCREENER_HEX_LINK_RE = re.compile(r'dexscreener\.com/(\w+)/([a-fA-F0-9x]+)')
+DEXSCREENER_CHAIN_RE = re.compile(r'dexscreener\.com/(\w+)/')
+CA_RE = re.compile(r'CA:\s*([^\s\n]+)')
+CA_HEX_RE = re.compile(r'CA:\s*([a-fA-F0-9x]+)')
+CHAIN_RE = re.compile(r'Chain:\s*(\w+)')
+CONTRACT_RE = re.compile(r'contract:\s*([^\s\n]+)', re.IGNORECASE)
+NETWORK_RE = re.compile(r'network:\s*(\w+)', re.IGNORECASE)
+HEX_ADDRESS_RE = re.compile(r'0x[a-fA-F0-9]+')
+LONG_HEX_RE = re.compile(r'[a-fA-F0-9]{20,}')
+
+# (тикер, направление) из совпадения паттерна бота
+TickerExtractor = Callable[[Match], Tuple[str, Optional[str]]]
+
+# Группы позиционных паттернов из старых config.json (до именованных групп)
+LEGACY_GROUPS: Dict[str, Dict[str, int]] = {
+    'mexcTracker': {'ticker': 1, 'direction': 2},
+    'kormushka_mexc': {'ticker': 1},
+    'pumply_futures_dex': {'ticker': 2, 'direction': 1},
+    'MexcDexSpreadTracker': {'ticker': 3, 'direction': 2},
+}
+
+def _resolve_group(pattern: Pattern, group_map: Dict, name: str, default: Optional[int]):
+    """
+    Группа паттерна для поля: именованная (?P<name>...), затем groups в конфигурации,
+    затем позиция по умолчанию
+    """
+    if name in pattern.groupindex:
+        return name
+    group = group_map.get(name, default)
+    if group is None:
+        return None
+    if isinstance(group, str):
+        if group not in pattern.groupindex:
+            raise ValueError(f"в паттерне нет группы '{group}' для поля {name}")
+    elif not 1 <= group <= pattern.groups:
+        raise ValueError(f"в паттерне нет группы {group} для поля {name}")
+    return group
+
+def compile_extractor(pattern: Pattern, group_map: Optional[Dict] = None) -> TickerExtractor:
+    """
+    Собирает извлечение тикера и направления один раз при загрузке конфигурации
+
+    Args:
+        pattern: Скомпилированный паттерн бота
+        group_map: Явные номера или имена групп {"ticker": 2, "direction": 1}
+            для паттернов без именованных групп
+    """
+    group_map = group_map or {}
+    # Без именованных групп и groups угадать можно только единственную группу - тикер;
+    # при нескольких группах тикером оказалось бы направление или эмодзи
+    positional = not pattern.groupindex and not group_map
+    if positional and pattern.groups > 1:
+        raise ValueError(f"в паттерне {pattern.groups} группы без имен - "
+                         f"нужны (?P<ticker>...) и (?P<direction>...) или groups")
+    ticker_group = _resolve_group(pattern, group_map, 'ticker', 1 if positional else None)
+    if ticker_group is None:
+        raise ValueError("не указана группа тикера (?P<ticker>...)")
+    direction_group = _resolve_group(pattern, group_map, 'direction', None)
+
+    if direction_group is None:
+        return lambda match: (match.group(ticker_group), None)
+    return lambda match: match.group(ticker_group, direction_group)
+
+def _literal_alternatives(items) -> Tuple[str, ...]:
+    """Строки, одна из которых целиком составляет совпадение подпаттерна; () - не литерал"""
+    items = list(items)
+    if all(op == sre_parse.LITERAL for op, _ in items):
+        return (''.join(chr(av) for _, av in items),) if items else ()
+    if len(items) != 1:
+        return ()
+    op, av = items[0]
+    if op == sre_parse.IN and all(item_op == sre_parse.LITERAL for item_op, _ in av):
+        return tuple(chr(char) for _, char in av)
+    if op == sre_parse.BRANCH:
+        alternatives: List[str] = []
+        for branch in av[1]:
+            literals = _literal_alternatives(branch)
+            if len(literals) != 1:
+                return ()
+            alternatives.append(literals[0])
+        return tuple(alternatives)
+    return ()
+
+def required_anchors(pattern: Pattern) -> Tuple[str, ...]:
+    """
+    Литералы, хотя бы один из которых есть в любом совпадении паттерна
+
+    Берется самый длинный литерал верхнего уровня ('secs!', 'Spread') или группа
+    из литералов ('Long|Short') с самой длинной короткой альтернативой.
+    Пустой кортеж - обязательного литерала нет, паттерн проверяется всегда
+    """
+    if pattern.flags & re.IGNORECASE:
+        return ()
+
+    best: Tuple[str, ...] = ()
+
+    def consider(candidate: Tuple[str, ...]):
+        nonlocal best
+        if candidate and min(map(len, candidate)) > (min(map(len, best)) if best else 0):
+            best = candidate
+
+    run: List[str] = []
+    for op, av in sre_parse.parse(pattern.pattern, pattern.flags):
+        if op == sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        consider((''.join(run),) if run else ())
+        run = []
+        if op == sre_parse.SUBPATTERN and not av[1] & re.IGNORECASE:
+            consider(_literal_alternatives(av[-1]))
+        elif op == sre_parse.IN:
+            consider(_literal_alternatives([(op, av)]))
+    consider((''.join(run),) if run else ())
+    return best
+
+class CompiledBotPatterns:
+    """Скомпилированные паттерны одного бота"""
+
+    __slots__ = ('name', 'username', 'enabled', 'ticker', 'extract', 'anchors', 'dex', 'dex_type')
+
+    def __init__(self, name: str, bot_config: Dict):
+        self.name = name
+        self.username = bot_config.get('username', name)
+        self.enabled = bot_config.get('enabled', True)
+        self.ticker: Pattern = re.compile(bot_config['pattern'])
+        try:
+            group_map = bot_config.get('groups')
+            if group_map is None and not self.ticker.groupindex:
+                group_map = LEGACY_GROUPS.get(name)
+            self.extract: TickerExtractor = compile_extractor(self.ticker, group_map)
+        except ValueError as e:
+            raise ValueError(f"Бот {name}: {e}") from None
+        # Литералы для общего префильтра: из конфигурации или выведенные из паттерна
+        anchors = bot_config.get('anchors')
+        self.anchors: Tuple[str, ...] = tuple(anchors) if anchors else required_anchors(self.ticker)
+
+        dex_pattern = bot_config.get('dex_pattern')
+        self.dex: Optional[Pattern] = re.compile(dex_pattern) if dex_pattern else None
+
+        # Тип DEX ссылки определяем один раз, а не на каждом сообщении
+        if dex_pattern and 'gmgn' in dex_pattern:
+            self.dex_type = 'gmgn'
+        elif dex_pattern and 'dexscreener' in dex_pattern:
+            self.dex_type = 'dexscreener'
+        else:
+            self.dex_type = None
+
+def _straddles(first: str, second: str) -> bool:
+    """Конец first совпадает с началом second (вхождения могут перекрываться)"""
+    return any(first.endswith(second[:size]) for size in range(1, min(len(first), len(second))))
+
+class CombinedMatcher:
+    """
+    Поиск бота по сообщению неизвестного источника за один проход по тексту
+
+    Якоря всех паттернов собраны в одно регулярное выражение: один проход
+    находит присутствующие литералы, полные паттерны проверяются только у ботов
+    с найденным якорем. Объединить сами паттерны в одну альтернативу нельзя -
+    у каждого свои группы ticker/direction
+    """
+
+    def __init__(self, bots: Sequence[CompiledBotPatterns]):
+        """
+        Args:
+            bots: Паттерны ботов в порядке приоритета (первое совпадение выигрывает)
+        """
+        self._bots = list(bots)
+        self._by_anchor: Dict[str, List[int]] = {}
+        # Паттерны без обязательного литерала проверяются на каждом сообщении
+        self._always: List[int] = []
+        for index, bot in enumerate(self._bots):
+            if not bot.anchors:
+                self._always.append(index)
+            for anchor in bot.anchors:
+                self._by_anchor.setdefault(anchor, []).append(index)
+
+        anchors = list(self._by_anchor)
+        # Якорь в совпадении покрывает и якоря внутри него ('LONG' не найдется отдельно внутри 'LONGS')
+        self._covered: Dict[str, List[int]] = {
+            anchor: sorted({index for other in anchors if other in anchor for index in self._by_anchor[other]})
+            for anchor in anchors
+        }
+        # Якорь, начало которого совпадает с концом другого, проход может перешагнуть - проверяем отдельно
+        self._straddling = [anchor for anchor in anchors
+                            if any(other != anchor and _straddles(other, anchor) for other in anchors)]
+        self._anchor_re: Optional[Pattern] = None
+        if anchors:
+            # Простая альтернатива литералов: re пропускает позиции по набору первых символов,
+            # стоимость почти не растет с числом ботов (опережающая проверка растет линейно)
+            alternatives = sorted(anchors, key=len, reverse=True)
+            self._anchor_re = re.compile('|'.join(map(re.escape, alternatives)))
+
+    def candidates(self, message: str) -> List[CompiledBotPatterns]:
+        """Боты, чьи якоря есть в сообщении, в порядке приоритета"""
+        found = set(self._always)
+        if self._anchor_re is not None:
+            covered = self._covered
+            for anchor in set(self._anchor_re.findall(message)):
+                found.update(covered[anchor])
+            for anchor in self._straddling:
+                if anchor in message:
+                    found.update(self._by_anchor[anchor])
+        return [self._bots[index] for index in sorted(found)]
+
+    def match(self, message: str) -> Optional[Tuple[CompiledBotPatterns, Match]]:
+        """(паттерны сработавшего бота, совпадение) или None"""
+        for bot in self.candidates(message):
+            ticker_match = bot.ticker.search(message)
+            if ticker_match:
+                return bot, ticker_match
+        return None
+
+class PatternRegistry:
+    """Реестр скомпилированных паттернов всех ботов"""
+
+    def __init__(self, monitored_bots: Dict[str, Dict]):
+        """
+        Компилирует паттерны ботов
+
+        Args:
+            monitored_bots: Словарь ботов в формате config['monitored_bots']
+        """
+        self._bots: Dict[str, CompiledBotPatterns] = {
+            name: CompiledBotPatterns(name, bot_config)
+            for name, bot_config in monitored_bots.items()
+        }
+        self._enabled = [bot for bot in self._bots.values() if bot.enabled]
+        # Префильтр для сообщений неизвестного источника
+        self.matcher = CombinedMatcher(self._enabled)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'PatternRegistry':
+        """Создает реестр из полной конфигурации"""
+        return cls(config.get('monitored_bots', {}))
+
+    def get(self, bot_name: str) -> Optional[CompiledBotPatterns]:
+        """Возвращает паттерны бота или None"""
+        return self._bots.get(bot_name)
+
+    def enabled(self) -> List[CompiledBotPatterns]:
+        """Возвращает паттерны включенных ботов в порядке конфигурации"""
+        return self._enabled
+
+    def __getitem__(self, bot_name: str) -> CompiledBotPatterns:
+        return self._bots[bot_name]
+
+    def __contains__(self, bot_name: str) -> bool:
+        return bot_name in self._bots
+
+    def __iter__(self) -> Iterator[CompiledBotPatterns]:
+        return iter(self._bots.values())
+
+    def __len__(self) -> int:
+        return len(self._bots)
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Общий конвейер обработки сигналов для всех точек входа
+Маршрутизатор -> парсер -> фильтры -> обогащение -> действия
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import contract_scanner
+from dedup import TickerDeduplicator
+from patterns import PatternRegistry
+from routing import BotRouter
+
+logger = logging.getLogger(__name__)
+
+# Боты по умолчанию для точек входа без config.json (bot_monitor, telegram_bot_parser)
+DEFAULT_MONITORED_BOTS = {
+    'mexcTracker': {
+        'username': 'mexcTracker',
+        'enabled': True,
+        'pattern': r'(?P<ticker>\w+)\s+\|\s+[\d.]+%\s+\|\s+(?P<direction>Long|Short)',
+        'dex_pattern': r'dexscreener\.com/(\w+)/([a-fA-F0-9x]+)'
+    },
+    'kormushka_mexc': {
+        'username': 'kormushka_mexc',
+        'enabled': True,
+        'pattern': r'(?P<ticker>\w+)\s+\+[\d.]+%\s+in\s+\d+\s+secs!',
+        'dex_pattern': r'gmgn\.ai/(\w+)/token/([a-fA-F0-9x]+)'
+    },
+    'pumply_futures_dex': {
+        'username': 'pumply_futures_dex',
+        'enabled': True,
+        'pattern': r'🔻\s+(?P<direction>SHORT|LONG)\s+\$(?P<ticker>\w+)\s+\+[\d.]+%\s+on\s+MEXC',
+        'dex_pattern': r'dexscreener\.com/(\w+)/([a-fA-F0-9x]+)'
+    },
+    'MexcDexSpreadTracker': {
+        'username': 'MexcDexSpreadTracker',
+        'enabled': True,
+        'pattern': r'(?:🔴|🟢)\s+(?P<direction>SHORT|LONG)\?\s+#(?P<ticker>\w+)\s+Spread',
+        'dex_pattern': r'gmgn\.ai/(\w+)/token/([a-fA-F0-9x]+)'
+    }
+}
+
+# Решения фильтров (совпадают с verdict в журнале сигналов)
+VERDICT_BLACKLISTED = 'blacklisted'
+VERDICT_DUPLICATE = 'duplicate'
+VERDICT_STALE = 'stale'
+
+def convert_ticker_to_mexc(ticker: str) -> str:
+    """Конвертирует тикер в формат MEXC"""
+    return f"MEXC:{ticker}USDT.p"
+
+class SignalParser:
+    """Извлекает тикер и направление экстрактором, скомпилированным для паттерна бота"""
+
+    def __init__(self, patterns: PatternRegistry):
+        self.patterns = patterns
+
+    def parse(self, message: str, bot_name: str) -> Optional[Tuple[str, Optional[str]]]:
+        """(тикер, направление) для сообщения известного бота или None"""
+        bot_patterns = self.patterns.get(bot_name)
+        if bot_patterns is None:
+            # Бот удален из конфигурации, пока сообщение ждало в очереди
+            return None
+        ticker_match = bot_patterns.ticker.search(message)
+        if not ticker_match:
+            return None
+        return bot_patterns.extract(ticker_match)
+
+    def parse_any(self, message: str) -> Optional[Tuple[str, str, Optional[str]]]:
+        """(имя бота, тикер, направление) для сообщения неизвестного источника или None"""
+        # Один проход префильтра по якорям вместо перебора паттернов всех ботов
+        found = self.patterns.matcher.match(message)
+        if found is None:
+            return None
+        bot_patterns, ticker_match = found
+        return (bot_patterns.name,) + bot_patterns.extract(ticker_match)
+
+class SignalFilters:
+    """Черный список и окно дедупликации тикеров"""
+
+    def __init__(self, config: Dict, stats: Dict,
+                 on_new_ticker: Optional[Callable[[str, float], None]] = None):
+        """
+        Args:
+            config: Полная конфигурация (секции blacklist и deduplication)
+            stats: Словарь статистики монитора - счетчики фильтров пишутся в него
+            on_new_ticker: Вызывается для нового тикера (тикер, время) - запись в журнал дедупликации
+        """
+        settings = self.read_settings(config)
+        self.ticker_dedup = TickerDeduplicator(
+            settings['deduplication_window'],
+            max_entries=settings['max_entries']
+        )
+        self.apply(settings)
+        self.stats = stats
+        self.stats.setdefault('blacklisted_tickers', 0)
+        self.stats.setdefault('duplicated_tickers', 0)
+        self.on_new_ticker = on_new_ticker
+
+    @staticmethod
+    def read_settings(config: Dict) -> Dict:
+        """
+        Настройки фильтров из конфигурации
+
+        Raises:
+            ValueError: Некорректный черный список или окно дедупликации
+        """
+        blacklist = config.get('blacklist', {})
+        deduplication = config.get('deduplication', {})
+        tickers = blacklist.get('tickers', [])
+        if not isinstance(tickers, list) or not all(isinstance(ticker, str) for ticker in tickers):
+            raise ValueError("blacklist.tickers должен быть списком строк")
+        window = deduplication.get('window_minutes', 5)
+        if isinstance(window, bool) or not isinstance(window, (int, float)) or window <= 0:
+            raise ValueError("deduplication.window_minutes должен быть положительным числом")
+        max_entries = deduplication.get('max_entries', 1000)
+        if isinstance(max_entries, bool) or not isinstance(max_entries, int) or max_entries <= 0:
+            raise ValueError("deduplication.max_entries должен быть положительным целым")
+        return {
+            'blacklist_enabled': bool(blacklist.get('enabled', False)),
+            'blacklisted_tickers': {ticker.upper() for ticker in tickers},
+            'deduplication_enabled': bool(deduplication.get('enabled', True)),
+            'deduplication_window': window,
+            'max_entries': max_entries,
+        }
+
+    def apply(self, settings: Dict):
+        """Применяет результат read_settings(); запомненные тикеры сохраняются"""
+        self.blacklist_enabled = settings['blacklist_enabled']
+        self.blacklisted_tickers = settings['blacklisted_tickers']
+        self.deduplication_enabled = settings['deduplication_enabled']
+        self.deduplication_window = settings['deduplication_window']
+        self.ticker_dedup.window_minutes = settings['deduplication_window']
+        self.ticker_dedup.max_entries = settings['max_entries']
+
+    def is_blacklisted(self, ticker: str) -> bool:
+        """Проверяет, находится ли тикер в черном списке"""
+        if not self.blacklist_enabled or ticker.upper() not in self.blacklisted_tickers:
+            return False
+        self.stats['blacklisted_tickers'] += 1
+        logger.info("🚫 Тикер %s в черном списке - игнорируем", ticker)
+        return True
+
+    def is_recently_processed(self, ticker: str) -> bool:
+        """Проверяет, был ли тикер недавно обработан (новый тикер запоминается)"""
+        if not self.deduplication_enabled:
+            return False
+
+        ticker_upper = ticker.upper()
+        now = self.ticker_dedup.clock()
+        age = self.ticker_dedup.check(ticker_upper, now)
+        if age is not None:
+            self.stats['duplicated_tickers'] += 1
+            logger.info("🔄 Тикер %s уже обработан %.1f мин назад - пропускаем", ticker, age / 60)
+            return True
+
+        if self.on_new_ticker is not None:
+            self.on_new_ticker(ticker_upper, now)
+        return False
+
+    def check(self, ticker: str) -> Optional[str]:
+        """Решение фильтров: None - пропустить дальше, иначе VERDICT_*"""
+        if self.is_blacklisted(ticker):
+            return VERDICT_BLACKLISTED
+        if self.is_recently_processed(ticker):
+            return VERDICT_DUPLICATE
+        return None
+
+class SignalActions:
+    """Буфер обмена, браузер и уведомления по настройкам конфигурации"""
+
+    def __init__(self, config: Dict):
+        """
+        Args:
+            config: Полная конфигурация (секции settings и notifications)
+        """
+        self.settings = config.get('settings', {})
+        self.notifications = config.get('notifications', {})
+
+    @staticmethod
+    def preload():
+        """
+        Импортирует модули действий заранее
+
+        pyperclip и webbrowser не нужны до первого сигнала: точки входа вызывают
+        preload() после регистрации обработчика, а не на пути к ней
+        """
+        import pyperclip
+        import webbrowser
+
+    def copy_to_clipboard(self, text: str) -> bool:
+        """Копирует текст в буфер обмена"""
+        try:
+            if not self.settings.get('auto_copy_clipboard', True):
+                return False
+            import pyperclip
+            pyperclip.copy(text)
+            logger.debug("📋 Скопировано: %s", text)
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка копирования в буфер обмена: {e}")
+            return False
+
+    def open_gmgn(self, dex_info: Optional[Dict]) -> bool:
+        """Открывает GMGN в браузере"""
+        try:
+            if not self.settings.get('auto_open_gmgn', True):
+                logger.debug("⏭️ Автооткрытие GMGN отключено в настройках")
+                return False
+
+            if not dex_info:
+                logger.debug("⏭️ Нет информации о DEX для открытия")
+                return False
+
+            url = dex_info['url']
+            logger.info("🌐 Открываем URL: %s", url)
+
+            # Пробуем разные способы открытия браузера
+            try:
+                import webbrowser
+                webbrowser.open(url)
+                logger.debug("✅ Браузер открыт через webbrowser.open()")
+                return True
+            except Exception as e:
+                logger.warning("⚠️ webbrowser.open() не сработал: %s", e)
+
+                # Пробуем через subprocess
+                import subprocess
+                try:
+                    subprocess.run(['start', url], shell=True, check=True)
+                    logger.debug("✅ Браузер открыт через subprocess")
+                    return True
+                except Exception as e2:
+                    logger.warning("⚠️ subprocess тоже не сработал: %s", e2)
+
+                    # Пробуем через os.startfile
+                    import os
+                    try:
+                        os.startfile(url)
+                        logger.debug("✅ Браузер открыт через os.startfile()")
+                        return True
+                    except Exception as e3:
+                        logger.error(f"❌ Все способы открытия браузера не сработали: {e3}")
+                        return False
+
+        except Exception as e:
+            logger.error(f"❌ Критическая ошибка открытия GMGN: {e}")
+            return False
+
+    def send_notification(self, message: str):
+        """Отправляет уведомление"""
+        if not self.notifications.get('enabled', False):
+            return
+
+        try:
+            if self.notifications.get('desktop', False):
+                # Простое уведомление в консоль
+                logger.info("🔔 %s", message)
+
+            if self.notifications.get('sound', False):
+                # Звуковое уведомление (Windows)
+                try:
+                    import winsound
+                    winsound.Beep(1000, 200)
+                except ImportError:
+                    pass
+        except Exception as e:
+            logger.error(f"Ошибка отправки уведомления: {e}")
+
+class SignalPipeline:
+    """Маршрутизатор -> парсер -> фильтры -> обогащение -> действия"""
+
+    def __init__(self, config: Dict, stats: Optional[Dict] = None,
+                 on_rejected: Optional[Callable] = None,
+                 on_new_ticker: Optional[Callable[[str, float], None]] = None):
+        """
+        Собирает этапы конвейера из конфигурации
+
+        Args:
+            config: Конфигурация в формате config.json (отсутствующие секции - значения по умолчанию)
+            stats: Словарь статистики точки входа (по умолчанию свой)
+            on_rejected: Вызывается для отфильтрованного сигнала
+                (verdict, bot_name, ticker, direction, dex_info, trace)
+            on_new_ticker: Вызывается для нового тикера (тикер, время)
+        """
+        self.config = config
+        self.stats = stats if stats is not None else {}
+        self.stats.setdefault('tickers_found', 0)
+        # Паттерны компилируются один раз при загрузке конфигурации
+        self.patterns = PatternRegistry.from_config(config)
+        self.router = BotRouter.from_config(config)
+        self.parser = SignalParser(self.patterns)
+        self.filters = SignalFilters(config, self.stats, on_new_ticker)
+        self.actions = SignalActions(config)
+        self.on_rejected = on_rejected
+
+    @classmethod
+    def with_defaults(cls, stats: Optional[Dict] = None) -> 'SignalPipeline':
+        """Конвейер для ботов по умолчанию без черного списка и дедупликации (точки входа без config.json)"""
+        return cls({
+            'monitored_bots': DEFAULT_MONITORED_BOTS,
+            'deduplication': {'enabled': False}
+        }, stats)
+
+    def reload(self, config: Dict):
+        """
+        Заменяет скомпилированный снимок конфигурации: паттерны, индекс маршрутизации,
+        черный список, окно дедупликации и настройки действий
+
+        Все, что может завершиться ошибкой, собирается до замены - при ошибке
+        остается прежний снимок. Замена идет без await: сообщение в обработке
+        видит целиком старый или целиком новый снимок. Запомненные тикеры и
+        разрешенные peer_id сохраняются
+
+        Raises:
+            ValueError, re.error: Некорректная конфигурация
+        """
+        monitored_bots = config.get('monitored_bots')
+        if not isinstance(monitored_bots, dict) or not monitored_bots:
+            raise ValueError("в конфигурации нет monitored_bots")
+        try:
+            patterns = PatternRegistry(monitored_bots)
+        except KeyError as e:
+            raise ValueError(f"у бота не указано поле {e}") from None
+        filter_settings = SignalFilters.read_settings(config)
+        actions = SignalActions(config)
+        # Последний шаг, который может упасть: индексы собираются целиком до присваивания
+        self.router.rebuild(monitored_bots)
+
+        self.config = config
+        self.patterns = patterns
+        self.parser = SignalParser(patterns)
+        self.filters.apply(filter_settings)
+        self.actions = actions
+
+    def enrich(self, message: str) -> Optional[Dict]:
+        """Извлекает информацию о контракте и сети из сообщения"""
+        try:
+            # Один проход по сообщению вместо каскада регулярных выражений
+            return contract_scanner.extract_contract_info(message)
+        except Exception as e:
+            logger.error(f"Ошибка извлечения контракта: {e}")
+            return None
+
+    def extract(self, message: str, bot_name: Optional[str] = None, trace=None) -> Optional[Dict]:
+        """
+        Парсер, фильтры и обогащение
+
+        Args:
+            message: Текст сообщения (со ссылками из сущностей и кнопок)
+            bot_name: Бот-источник; None - перебрать паттерны всех включенных ботов
+            trace: SignalTrace для отметок parsed/filtered
+
+        Returns:
+            Данные сигнала или None (тикер не найден или отфильтрован)
+        """
+        try:
+            if bot_name is None:
+                parsed = self.parser.parse_any(message)
+                if parsed is not None:
+                    bot_name, ticker, direction = parsed
+            else:
+                parsed = self.parser.parse(message, bot_name)
+                if parsed is not None:
+                    ticker, direction = parsed
+            if trace is not None:
+                trace.mark('parsed')
+            if parsed is None:
+                return None
+
+            verdict = self.filters.check(ticker)
+            if verdict is not None:
+                if self.on_rejected is not None:
+                    # Контракт нужен и отклоненному сигналу: история считает все упоминания
+                    self.on_rejected(verdict, bot_name, ticker, direction, self.enrich(message), trace)
+                return None
+            if trace is not None:
+                trace.mark('filtered')
+
+            return {
+                'ticker': ticker,
+                'direction': direction,
+                'dex_info': self.enrich(message),
+                'bot_name': bot_name,
+                'mexc_ticker': convert_ticker_to_mexc(ticker),
+                'timestamp': datetime.now()
+            }
+
+        except Exception as e:
+            logger.error(f"Ошибка извлечения данных из {bot_name}: {e}")
+            return None
+
+    def dispatch(self, signal: Dict, executor=None, timeouts: Optional[Dict] = None,
+                 on_done: Optional[Callable[[], None]] = None) -> Dict[str, bool]:
+        """
+        Выполняет действия по сигналу
+
+        Args:
+            signal: Результат extract()
+            executor: ActionExecutor - действия уходят в пул потоков; None - выполняются сразу
+            timeouts: Таймауты действий по названию (clipboard, browser, notification)
+            on_done: Вызывается после последнего действия
+
+        Returns:
+            Результаты действий (только при синхронном выполнении)
+        """
+        self.stats['tickers_found'] += 1
+        actions = self.actions
+        mexc_ticker = signal['mexc_ticker']
+        notification_msg = f"Новый тикер от @{signal['bot_name']}: {signal['ticker']} -> {mexc_ticker}"
+
+        if executor is None:
+            results = {
+                'clipboard': actions.copy_to_clipboard(mexc_ticker),
+                'browser': actions.open_gmgn(signal['dex_info']),
+            }
+            actions.send_notification(notification_msg)
+            if on_done is not None:
+                on_done()
+            return results
+
+        # Порядок сохраняется в пределах тикера, event loop не ждет
+        timeouts = timeouts or {}
+        ticker_key = signal['ticker'].upper()
+        executor.submit(ticker_key, 'clipboard', actions.copy_to_clipboard, mexc_ticker,
+                        timeout=timeouts.get('clipboard'))
+        executor.submit(ticker_key, 'browser', actions.open_gmgn, signal['dex_info'],
+                        timeout=timeouts.get('browser'))
+        executor.submit(ticker_key, 'notification', actions.send_notification, notification_msg,
+                        timeout=timeouts.get('notification'), on_done=on_done)
+        return {}
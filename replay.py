@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Офлайн-прогон записанных сообщений через AdvancedBotMonitor
+Без TelegramClient и без побочных действий: пропускная способность и задержки этапов
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Iterable, Optional
+
+from advanced_monitor import AdvancedBotMonitor
+from corpus import read_corpus_by_date
+from ingest import IngestRecord
+from latency import SignalTrace
+from log_setup import stop_logging
+
+def build_replay_config(config: Dict, state_dir: str, log_level: str = 'WARNING') -> Dict:
+    """
+    Копия конфигурации для прогона: состояние и логи в отдельном каталоге
+
+    Боевые журналы дедупликации и сигналов не должны видеть записанные сообщения
+    """
+    replay_config = json.loads(json.dumps(config))
+    settings = replay_config['settings']
+    settings['log_level'] = log_level
+    settings['log_file'] = os.path.join(state_dir, 'replay.log')
+    settings['dedup_journal_file'] = os.path.join(state_dir, 'dedup_journal.log')
+    settings['entity_cache_file'] = os.path.join(state_dir, 'entity_cache.json')
+    settings['checkpoint_file'] = os.path.join(state_dir, 'checkpoints.json')
+    settings['latency_dump_file'] = os.path.join(state_dir, 'latency_stats.json')
+    settings.setdefault('signal_journal', {})['file'] = os.path.join(state_dir, 'signals.jsonl')
+    settings.setdefault('signal_store', {})['file'] = os.path.join(state_dir, 'signals.db')
+    # Промежуточная статистика в логе только мешает замеру
+    settings['stats_interval'] = 10 ** 9
+    return replay_config
+
+class ReplayRunner:
+    """Подает записи корпуса в монитор как обработчик Telethon, но без сети"""
+
+    def __init__(self, monitor: AdvancedBotMonitor, speed: float = 0.0):
+        """
+        Args:
+            monitor: Монитор, созданный с offline=True
+            speed: 0 - максимальная скорость, иначе ускорение относительно
+                записанных времен сообщений (1.0 - реальное время)
+        """
+        self.monitor = monitor
+        self.speed = speed
+        self.side_effects = {'clipboard': 0, 'browser': 0, 'notification': 0}
+        self._virtual_now: Optional[float] = None
+        self._stub_side_effects()
+
+    def _stub_side_effects(self):
+        """Заменяет буфер обмена, браузер и уведомления счетчиками"""
+        def stub(name):
+            def action(*args):
+                self.side_effects[name] += 1
+                return True
+            return action
+
+        actions = self.monitor.pipeline.actions
+        actions.copy_to_clipboard = stub('clipboard')
+        actions.open_gmgn = stub('browser')
+        actions.send_notification = stub('notification')
+        # Окно дедупликации считается по записанным временам сообщений
+        self.monitor.ticker_dedup.clock = lambda: self._virtual_now if self._virtual_now is not None else time.time()
+
+    def _username(self, record: Dict) -> Optional[str]:
+        if record.get('sender'):
+            return record['sender']
+        bot_config = self.monitor.config['monitored_bots'].get(record.get('bot'))
+        return bot_config.get('username', record['bot']) if bot_config else None
+
+    async def run(self, records: Iterable[Dict]) -> Dict:
+        """Прогоняет записи и возвращает сводку"""
+        monitor = self.monitor
+        monitor.dedup_journal.start()
+        monitor.signal_journal.start()
+        if monitor.signal_store is not None:
+            monitor.signal_store.start()
+
+        messages = 0
+        routed = 0
+        first_date = None
+        start = time.perf_counter()
+        start_wall = time.time()
+        for record in records:
+            messages += 1
+            date = record.get('date')
+            if date is not None:
+                self._virtual_now = float(date)
+                if self.speed > 0:
+                    if first_date is None:
+                        first_date = self._virtual_now
+                    delay = (self._virtual_now - first_date) / self.speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+            peer_id = record.get('peer_id')
+            route = monitor.router.route(peer_id, lambda: self._username(record))
+            if not route:
+                continue
+            routed += 1
+            bot_name, bot_config = route
+
+            trace = SignalTrace(bot_name, record.get('message_id'), peer_id,
+                                self._virtual_now if date is not None else None)
+            if date is not None and self.speed > 0:
+                # Плановое время подачи: интервал telegram показывает отставание прогона от графика
+                trace.mark('message_date', start_wall + (self._virtual_now - first_date) / self.speed)
+            trace.mark('received')
+            trace.mark('routed')
+            urls = list(record.get('entity_urls') or []) + list(record.get('button_urls') or [])
+            await monitor._process_record(IngestRecord(
+                bot_name, peer_id, record.get('message_id', messages), record.get('text') or "",
+                urls=urls, priority=bot_config.get('priority', 0), trace=trace
+            ))
+            # Заглушки действий выполняются до следующей записи, как при живом потоке сообщений:
+            # иначе очередь копится до остановки и action_completed измеряет ее длину
+            await monitor.actions.join()
+
+        elapsed = time.perf_counter() - start
+        await monitor.stop()
+
+        return {
+            'messages': messages,
+            'routed': routed,
+            'rejected': monitor.router.rejected,
+            'elapsed_s': elapsed,
+            'messages_per_s': messages / elapsed if elapsed else 0.0,
+            'tickers_found': monitor.stats['tickers_found'],
+            'blacklisted': monitor.stats['blacklisted_tickers'],
+            'duplicates': monitor.stats['duplicated_tickers'],
+            'errors': monitor.stats['errors'],
+            'side_effects': dict(self.side_effects),
+            'latency': monitor.latency.summary(),
+        }
+
+def replay(corpus_file: str, config: Dict, speed: float = 0.0, state_dir: Optional[str] = None,
+           log_level: str = 'WARNING') -> Dict:
+    """
+    Прогоняет корпус через новый офлайн-монитор
+
+    Args:
+        corpus_file: Корпус .jsonl или .jsonl.gz
+        config: Конфигурация монитора (как в config.json)
+        speed: 0 - максимальная скорость, иначе ускорение относительно записи
+        state_dir: Каталог для журналов прогона (по умолчанию временный)
+        log_level: Уровень логирования монитора
+    """
+    with tempfile.TemporaryDirectory(prefix='replay_') as tmp_dir:
+        state_dir = state_dir or tmp_dir
+        monitor = AdvancedBotMonitor(config=build_replay_config(config, state_dir, log_level), offline=True)
+        runner = ReplayRunner(monitor, speed=speed)
+        try:
+            return asyncio.run(runner.run(read_corpus_by_date(corpus_file)))
+        finally:
+            # Закрываем лог прогона до удаления временного каталога
+            stop_logging()
+
+def main():
+    """Запуск офлайн-прогона"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Офлайн-прогон записанных сообщений")
+    arg_parser.add_argument('corpus', help="Корпус сообщений (.jsonl или .jsonl.gz)")
+    arg_parser.add_argument('--config', default='config.json', help="Файл конфигурации")
+    arg_parser.add_argument('--speed', type=float, default=0.0,
+                            help="0 - максимальная скорость, 1 - реальное время, 10 - в 10 раз быстрее")
+    arg_parser.add_argument('--state-dir', help="Каталог для журналов прогона")
+    arg_parser.add_argument('--log-level', default='WARNING', help="Уровень логирования монитора")
+    arg_parser.add_argument('--json', action='store_true', help="Вывести результаты в JSON")
+    args = arg_parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    results = replay(args.corpus, config, speed=args.speed, state_dir=args.state_dir,
+                     log_level=args.log_level)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("🔁 Офлайн-прогон")
+    print("=" * 50)
+    print(f"Сообщений: {results['messages']}, отслеживаемых: {results['routed']}, "
+          f"отклонено: {results['rejected']}")
+    print(f"Время: {results['elapsed_s']:.2f} с, {results['messages_per_s']:.0f} сообщ./с")
+    print(f"Тикеров: {results['tickers_found']}, в черном списке: {results['blacklisted']}, "
+          f"дубликатов: {results['duplicates']}, ошибок: {results['errors']}")
+    print(f"Действия (заглушки): {results['side_effects']}")
+    for bot_name, intervals in results['latency'].items():
+        print(f"[{bot_name}]")
+        for name, p in intervals.items():
+            print(f"  {name:<34} p50 {p['p50']:8.3f}  p95 {p['p95']:8.3f}  p99 {p['p99']:8.3f} мс  (n={p['count']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Маршрутизация входящих сообщений к мониторимым ботам
+Индексы по username и peer_id вместо перебора конфигурации на каждое сообщение
+"""
+
+from typing import Callable, Dict, Optional, Set, Tuple
+
+# (имя бота в конфигурации, конфигурация бота)
+Route = Tuple[str, Dict]
+
+class BotRouter:
+    """Индекс username/peer_id -> бот"""
+
+    def __init__(self, monitored_bots: Dict[str, Dict]):
+        """
+        Строит индексы маршрутизации
+
+        Args:
+            monitored_bots: Словарь ботов в формате config['monitored_bots']
+        """
+        self.rejected = 0
+        self.rebuild(monitored_bots)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'BotRouter':
+        """Создает маршрутизатор из полной конфигурации"""
+        return cls(config.get('monitored_bots', {}))
+
+    def rebuild(self, monitored_bots: Dict[str, Dict]):
+        """
+        Перестраивает индексы (вызывается только при изменении конфигурации)
+
+        Разрешенные peer_id ботов с прежним username сохраняются. Индексы собираются
+        целиком и подменяются одним присваиванием
+        """
+        by_username: Dict[str, Route] = {}
+        for name, bot_config in monitored_bots.items():
+            if not bot_config.get('enabled', True):
+                continue
+            username = bot_config.get('username', name)
+            by_username[username.lower()] = (name, bot_config)
+
+        # Привязка переносится, если у бота прежний username
+        by_peer_id: Dict[int, Route] = {}
+        for peer_id, (name, bot_config) in getattr(self, '_by_peer_id', {}).items():
+            route = by_username.get(bot_config.get('username', name).lower())
+            if route is not None and route[0] == name:
+                by_peer_id[peer_id] = route
+
+        # Остальные peer_id заполняются при первом разрешении отправителя;
+        # отказы сбрасываются - отправитель мог стать отслеживаемым
+        ignored_peers: Set[int] = set()
+        self._by_username, self._by_peer_id, self._ignored_peers = by_username, by_peer_id, ignored_peers
+
+    def route(self, peer_id: Optional[int], get_username: Callable[[], Optional[str]]) -> Optional[Route]:
+        """
+        Находит бота по peer_id, а для нового отправителя - по username
+
+        Args:
+            peer_id: Числовой ID отправителя (может быть None)
+            get_username: Возвращает username отправителя; вызывается только
+                для еще не разрешенного peer_id, чтобы не трогать event.sender
+
+        Returns:
+            (имя бота, конфигурация) или None, если сообщение не отслеживается
+        """
+        if peer_id is not None:
+            route = self._by_peer_id.get(peer_id)
+            if route is not None:
+                return route
+            if peer_id in self._ignored_peers:
+                self.rejected += 1
+                return None
+
+        username = get_username()
+        if not username:
+            # Без username отправителя нельзя запоминать отказ - он мог быть не загружен
+            self.rejected += 1
+            return None
+
+        route = self._by_username.get(username.lower())
+        if peer_id is not None:
+            if route is not None:
+                self._by_peer_id[peer_id] = route
+            else:
+                self._ignored_peers.add(peer_id)
+
+        if route is None:
+            self.rejected += 1
+        return route
+
+    def bind_peer(self, username: str, peer_id: int):
+        """Заранее связывает peer_id с ботом (ID разрешены при запуске)"""
+        route = self._by_username.get(username.lower())
+        if route is not None:
+            self._by_peer_id[peer_id] = route
+            self._ignored_peers.discard(peer_id)
+
+    def unbind_peer(self, peer_id: int):
+        """Забывает привязку peer_id (ID из кэша оказался неверным)"""
+        self._by_peer_id.pop(peer_id, None)
+
+    def usernames(self) -> Set[str]:
+        """Username всех включенных ботов в нижнем регистре"""
+        return set(self._by_username)
+
+    def __len__(self) -> int:
+        return len(self._by_username)
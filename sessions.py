@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Несколько сессий Telegram для одного монитора
+Каждая сессия владеет частью monitored_bots, все сообщения идут в общий конвейер
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from entity_cache import EntityCache
+from routing import BotRouter
+
+try:
+    from telethon import TelegramClient, events
+except ImportError:
+    print("❌ Ошибка: Необходимо установить telethon")
+    print("Выполните: pip install telethon")
+    sys.exit(1)
+
+logger = logging.getLogger(__name__)
+
+def session_configs(config: Dict) -> List[Dict]:
+    """
+    Список сессий из config['sessions'] с ключами и ботами каждой
+
+    Без секции sessions - одна сессия из config['telegram'] со всеми ботами.
+    Включенные боты, не назначенные ни одной сессии, достаются первой
+
+    Raises:
+        ValueError: Сессия без имени или ссылка на неизвестного бота
+    """
+    telegram = config['telegram']
+    enabled_bots = [name for name, bot_config in config['monitored_bots'].items()
+                    if bot_config.get('enabled', True)]
+    raw_sessions = config.get('sessions') or [{'session_name': telegram['session_name']}]
+
+    sessions = []
+    assigned = set()
+    for raw in raw_sessions:
+        session_name = raw.get('session_name')
+        if not session_name:
+            raise ValueError("У сессии в config['sessions'] не указан session_name")
+        bots = raw.get('bots')
+        if bots is None:
+            bots = enabled_bots if len(raw_sessions) == 1 else []
+        unknown = [name for name in bots if name not in config['monitored_bots']]
+        if unknown:
+            raise ValueError(f"Сессия {session_name}: неизвестные боты {', '.join(unknown)}")
+        bots = [name for name in bots if name in enabled_bots]
+        assigned.update(bots)
+        sessions.append({
+            'session_name': session_name,
+            'api_id': raw.get('api_id') or telegram['api_id'] or os.getenv('TELEGRAM_API_ID'),
+            'api_hash': raw.get('api_hash') or telegram['api_hash'] or os.getenv('TELEGRAM_API_HASH'),
+            'bots': bots,
+        })
+
+    sessions[0]['bots'].extend(name for name in enabled_bots if name not in assigned)
+    return sessions
+
+class Backoff:
+    """Экспоненциальная задержка переподключения со случайным разбросом"""
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0, factor: float = 2.0,
+                 jitter: float = 0.5, max_attempts: int = 0):
+        """
+        Args:
+            base_delay: Задержка первой попытки в секундах
+            max_delay: Потолок задержки
+            factor: Множитель задержки на каждую попытку
+            jitter: Доля задержки, которая случайно срезается (сессии не переподключаются залпом)
+            max_attempts: Попыток подряд до отказа; 0 - без ограничения
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self.attempt = 0
+
+    @classmethod
+    def from_settings(cls, settings: Dict) -> 'Backoff':
+        """Создает задержку из config['settings']['reconnect']"""
+        return cls(
+            base_delay=settings.get('base_delay', 1.0),
+            max_delay=settings.get('max_delay', 60.0),
+            factor=settings.get('factor', 2.0),
+            jitter=settings.get('jitter', 0.5),
+            max_attempts=settings.get('max_attempts', 0)
+        )
+
+    @property
+    def exhausted(self) -> bool:
+        """Попытки закончились"""
+        return bool(self.max_attempts) and self.attempt >= self.max_attempts
+
+    def next_delay(self) -> float:
+        """Задержка перед следующей попыткой"""
+        delay = min(self.max_delay, self.base_delay * self.factor ** self.attempt)
+        self.attempt += 1
+        return delay * (1 - self.jitter * random.random())
+
+    def reset(self):
+        """Соединение восстановлено - следующая серия начинается с base_delay"""
+        self.attempt = 0
+
+class SessionWorker:
+    """Одна сессия: свой клиент, свои чаты и своя статистика"""
+
+    def __init__(self, name: str, client, bots: List[str], backoff: Optional[Backoff] = None):
+        """
+        Args:
+            name: Имя сессии (файл сессии Telethon)
+            client: TelegramClient этой сессии
+            bots: Имена ботов из config['monitored_bots'], которые слушает сессия
+            backoff: Задержки переподключения после обрыва
+        """
+        self.name = name
+        self.client = client
+        self.bots = bots
+        self.backoff = backoff or Backoff()
+        self._handler: Optional[Callable[..., Awaitable[None]]] = None
+        self._stopping = False
+        self._stop_event: Optional[asyncio.Event] = None
+        self.stats = {
+            'connected': False,
+            'messages': 0,
+            'routed': 0,
+            'errors': 0,
+            'chats': 0,
+            'started_at': None,
+            'last_message_at': None,
+            'disconnects': 0,
+            'reconnects': 0,
+            'downtime_s': 0.0,
+            'disconnected_at': None,
+        }
+
+    async def _wait_retry(self, error: Exception) -> bool:
+        """
+        Ждет задержку перед следующей попыткой подключения
+
+        Returns:
+            False - попытки исчерпаны или сессия останавливается
+        """
+        if self._stopping or self.backoff.exhausted:
+            return False
+        delay = self.backoff.next_delay()
+        logger.warning(f"🔄 Сессия {self.name}: {error} - повтор через {delay:.1f} с "
+                       f"(попытка {self.backoff.attempt})")
+        if self._stop_event is None:
+            self._stop_event = asyncio.Event()
+        try:
+            # stop() прерывает ожидание сразу
+            await asyncio.wait_for(self._stop_event.wait(), delay)
+            return False
+        except asyncio.TimeoutError:
+            return not self._stopping
+
+    async def start(self):
+        """Подключение и авторизация сессии (сетевые ошибки повторяются с задержкой)"""
+        while True:
+            try:
+                await self.client.start()
+                break
+            except OSError as e:
+                if not await self._wait_retry(e):
+                    raise
+        self.backoff.reset()
+        self.stats['connected'] = True
+        self.stats['started_at'] = time.time()
+        logger.info(f"🚀 Сессия {self.name} подключена ({len(self.bots)} ботов)")
+
+    async def _reconnect(self) -> bool:
+        """
+        Переподключает клиент; обработчики событий остаются зарегистрированными
+
+        Returns:
+            False - сессия остановлена или попытки исчерпаны
+        """
+        error: Exception = ConnectionError("соединение потеряно")
+        while await self._wait_retry(error):
+            try:
+                await self.client.connect()
+                # Соединение может оборваться и во время проверки авторизации - это тоже повтор
+                authorized = await self.client.is_user_authorized()
+            except OSError as e:
+                error = e
+                continue
+            if not authorized:
+                # Вход по коду интерактивный - без человека сессию не восстановить
+                logger.critical(f"❌ Сессия {self.name} больше не авторизована - требуется вход заново")
+                return False
+            self.backoff.reset()
+            return True
+        if not self._stopping:
+            logger.error(f"❌ Сессия {self.name}: попытки переподключения исчерпаны ({self.backoff.attempt})")
+        return False
+
+    def subscribe(self, handler: Callable[..., Awaitable[None]], chats: Optional[List[int]]):
+        """Регистрирует общий обработчик только для чатов этой сессии (повторный вызов заменяет фильтр)"""
+        if self._handler is not None:
+            self.client.remove_event_handler(self._on_message)
+        self._handler = handler
+        # None - фильтра по чатам нет, обработчик видит все обновления сессии
+        self.stats['chats'] = len(chats) if chats is not None else None
+        self.client.add_event_handler(self._on_message, events.NewMessage(chats=chats))
+
+    @property
+    def subscribed(self) -> bool:
+        """Обработчик уже зарегистрирован"""
+        return self._handler is not None
+
+    async def _on_message(self, event):
+        self.stats['messages'] += 1
+        self.stats['last_message_at'] = time.time()
+        try:
+            await self._handler(event, self)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Ошибка обработки сообщения в сессии {self.name}: {e}")
+
+    async def run(self, on_reconnect: Optional[Callable[['SessionWorker'], Awaitable[None]]] = None,
+                  on_disconnect: Optional[Callable[['SessionWorker'], None]] = None):
+        """
+        Работает до stop(): после обрыва переподключается с нарастающей задержкой
+
+        Клиент, обработчики и все состояние монитора остаются в памяти - холодного старта нет
+
+        Args:
+            on_reconnect: Корутина после восстановления соединения (догрузка пропущенного)
+            on_disconnect: Вызывается сразу после обрыва, до переподключения
+        """
+        while True:
+            try:
+                await self.client.run_until_disconnected()
+            except Exception as e:
+                logger.warning(f"⚠️ Сессия {self.name}: соединение прервано: {e}")
+            self.stats['connected'] = False
+            if self._stopping:
+                return
+
+            disconnected_at = time.time()
+            self.stats['disconnects'] += 1
+            self.stats['disconnected_at'] = disconnected_at
+            if on_disconnect is not None:
+                on_disconnect(self)
+            if not await self._reconnect():
+                return
+            downtime = time.time() - disconnected_at
+            self.stats['connected'] = True
+            self.stats['reconnects'] += 1
+            self.stats['downtime_s'] += downtime
+            self.stats['disconnected_at'] = None
+            logger.info(f"🔌 Сессия {self.name} переподключена, простой {downtime:.1f} с")
+
+            if on_reconnect is not None:
+                try:
+                    await on_reconnect(self)
+                except Exception as e:
+                    logger.error(f"Ошибка после переподключения сессии {self.name}: {e}")
+
+    async def stop(self):
+        """Отключает сессию и прекращает переподключения"""
+        self._stopping = True
+        if self._stop_event is not None:
+            self._stop_event.set()
+        await self.client.disconnect()
+        self.stats['connected'] = False
+
+    def health(self) -> Dict:
+        """Состояние и пропускная способность сессии"""
+        now = time.time()
+        started_at = self.stats['started_at']
+        uptime = now - started_at if started_at else 0.0
+        last_message_at = self.stats['last_message_at']
+        disconnected_at = self.stats['disconnected_at']
+        # Текущий простой тоже учитывается, пока сессия не переподключилась
+        downtime = self.stats['downtime_s'] + (now - disconnected_at if disconnected_at else 0.0)
+        return {
+            'connected': self.stats['connected'],
+            'messages': self.stats['messages'],
+            'routed': self.stats['routed'],
+            'errors': self.stats['errors'],
+            'chats': self.stats['chats'],
+            'messages_per_min': self.stats['messages'] / uptime * 60 if uptime else 0.0,
+            'idle_s': now - last_message_at if last_message_at else None,
+            'reconnects': self.stats['reconnects'],
+            'downtime_s': downtime,
+        }
+
+class SessionSupervisor:
+    """Запускает сессии из конфигурации и сводит их сообщения в один обработчик"""
+
+    def __init__(self, config: Dict, entity_cache: EntityCache, router: BotRouter):
+        """
+        Args:
+            config: Полная конфигурация (секции telegram, sessions, monitored_bots)
+            entity_cache: Общий кэш username -> peer_id
+            router: Общий маршрутизатор монитора
+        """
+        self.config = config
+        self.entity_cache = entity_cache
+        self.router = router
+        self.workers: List[SessionWorker] = []
+        reconnect = config.get('settings', {}).get('reconnect', {})
+        for session in session_configs(config):
+            if not session['api_id'] or not session['api_hash']:
+                raise ValueError("Необходимо указать API ключи в config.json или переменных окружения")
+            client = TelegramClient(session['session_name'], session['api_id'], session['api_hash'])
+            self.workers.append(SessionWorker(session['session_name'], client, session['bots'],
+                                              Backoff.from_settings(reconnect)))
+
+    @property
+    def primary(self) -> SessionWorker:
+        """Первая сессия (ее клиент - monitor.client)"""
+        return self.workers[0]
+
+    @property
+    def sharded(self) -> bool:
+        """Больше одной сессии"""
+        return len(self.workers) > 1
+
+    async def start(self):
+        """Подключает сессии по очереди: вход по коду запрашивается в консоли для каждой"""
+        for worker in self.workers:
+            await worker.start()
+
+    async def _resolve_chats(self, worker: SessionWorker) -> Optional[List[int]]:
+        """Разрешает username ботов сессии в peer_id для фильтра событий Telethon"""
+        usernames = [self.config['monitored_bots'][name].get('username', name) for name in worker.bots]
+        peer_ids = await self.entity_cache.resolve(worker.client, usernames)
+        for username, peer_id in peer_ids.items():
+            self.router.bind_peer(username, peer_id)
+
+        if len(peer_ids) < len(usernames):
+            # Без ID хотя бы одного бота фильтр потеряет его сообщения
+            logger.warning(f"⚠️ Сессия {worker.name}: не все боты разрешены - фильтр по чатам отключен")
+            return None
+        return list(peer_ids.values())
+
+    def chat_ids(self, worker: SessionWorker) -> List[int]:
+        """peer_id разрешенных ботов сессии (из кэша сущностей)"""
+        usernames = [self.config['monitored_bots'][name].get('username', name) for name in worker.bots]
+        return [self.entity_cache.peer_ids[username.lower()] for username in usernames
+                if username.lower() in self.entity_cache.peer_ids]
+
+    def subscribe_cached(self, handler: Callable[..., Awaitable[None]]) -> bool:
+        """
+        Регистрирует обработчик без обращения к сети - в сессиях, все боты которых есть в кэше сущностей
+
+        Вызывается до подключения: обработчик работает с первого обновления
+
+        Returns:
+            True если обработчик зарегистрирован во всех сессиях
+        """
+        for worker in self.workers:
+            usernames = [self.config['monitored_bots'][name].get('username', name) for name in worker.bots]
+            peer_ids = {username: self.entity_cache.peer_ids.get(username.lower()) for username in usernames}
+            if worker.subscribed or None in peer_ids.values():
+                continue
+            for username, peer_id in peer_ids.items():
+                self.router.bind_peer(username, peer_id)
+            worker.subscribe(handler, list(peer_ids.values()))
+        return all(worker.subscribed for worker in self.workers)
+
+    async def subscribe(self, handler: Callable[..., Awaitable[None]]):
+        """
+        Регистрирует обработчик в сессиях, где он еще не зарегистрирован
+
+        Args:
+            handler: Корутина handler(event, worker)
+        """
+        for worker in self.workers:
+            if not worker.subscribed:
+                worker.subscribe(handler, await self._resolve_chats(worker))
+
+    async def verify_cached(self, handler: Callable[..., Awaitable[None]]) -> int:
+        """
+        Проверяет ID ботов, взятые из кэша сущностей; вызывается после подключения
+
+        Сессия, в фильтре которой оказался неверный ID, подписывается заново
+
+        Returns:
+            Количество переподписанных сессий
+        """
+        resubscribed = 0
+        for worker in self.workers:
+            usernames = [self.config['monitored_bots'][name].get('username', name) for name in worker.bots]
+            stale = await self.entity_cache.verify(worker.client, usernames)
+            if not stale:
+                continue
+            for peer_id in stale.values():
+                self.router.unbind_peer(peer_id)
+            worker.subscribe(handler, await self._resolve_chats(worker))
+            resubscribed += 1
+            logger.info(f"🔗 Сессия {worker.name}: фильтр чатов обновлен ({', '.join('@' + name for name in stale)})")
+        return resubscribed
+
+    async def run(self, on_reconnect: Optional[Callable[[SessionWorker], Awaitable[None]]] = None,
+                  on_disconnect: Optional[Callable[[SessionWorker], None]] = None):
+        """Работает, пока хотя бы одна сессия не остановлена или не исчерпала попытки переподключения"""
+        async def watch(worker: SessionWorker):
+            try:
+                await worker.run(on_reconnect, on_disconnect)
+            except Exception as e:
+                logger.error(f"❌ Сессия {worker.name} завершилась с ошибкой: {e}")
+            logger.warning(f"⚠️ Сессия {worker.name} отключена")
+
+        await asyncio.gather(*(watch(worker) for worker in self.workers))
+
+    def totals(self) -> Dict[str, float]:
+        """Переподключения и простой всех сессий"""
+        healths = [worker.health() for worker in self.workers]
+        return {
+            'reconnects': sum(health['reconnects'] for health in healths),
+            'downtime_s': sum(health['downtime_s'] for health in healths),
+        }
+
+    async def stop(self):
+        """Отключает все сессии"""
+        await asyncio.gather(*(worker.stop() for worker in self.workers), return_exceptions=True)
+
+    def format_lines(self) -> List[str]:
+        """Строки статистики сессий для лога"""
+        lines = []
+        for worker in self.workers:
+            health = worker.health()
+            idle = f"{health['idle_s']:.0f} с" if health['idle_s'] is not None else "N/A"
+            chats = health['chats'] if health['chats'] is not None else "без фильтра"
+            lines.append(f"📡 Сессия {worker.name}: {'в сети' if health['connected'] else 'отключена'}, "
+                         f"чатов {chats}, сообщений {health['messages']} "
+                         f"({health['messages_per_min']:.1f}/мин), отслеживаемых {health['routed']}, "
+                         f"ошибок {health['errors']}, без сообщений {idle}, "
+                         f"переподключений {health['reconnects']}, простой {health['downtime_s']:.0f} с")
+        return lines
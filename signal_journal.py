@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Журнал сигналов в формате JSONL
+Одна компактная JSON-строка на сигнал, ротация по размеру и времени, сжатие старых сегментов
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class SignalJournal:
+    """Буферизованная запись сигналов с ротацией и фоновым gzip"""
+
+    def __init__(self, journal_file: str = 'signals.jsonl', max_bytes: int = 10 * 1024 * 1024,
+                 rotate_seconds: float = 24 * 3600, flush_interval: float = 1.0, fsync: bool = False):
+        """
+        Args:
+            journal_file: Путь к текущему сегменту журнала
+            max_bytes: Размер сегмента, после которого он ротируется
+            rotate_seconds: Возраст сегмента, после которого он ротируется
+            flush_interval: Период сброса буфера на диск в секундах
+            fsync: Вызывать fsync после каждого сброса буфера (а не каждой записи)
+        """
+        self.journal_file = journal_file
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._buffer: List[str] = []
+        self._file = None
+        self._opened_at = 0.0
+        # Запись и ротация в одном потоке, сжатие - в отдельном, чтобы не задерживать запись
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='signal-journal')
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='signal-gzip')
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            'signals': 0,
+            'flushes': 0,
+            'rotations': 0
+        }
+
+    def record(self, verdict: str, bot_name: str, ticker: str, direction: Optional[str] = None,
+               dex_info: Optional[Dict] = None, message_id: Optional[int] = None,
+               peer_id: Optional[int] = None, marks: Optional[Dict[str, float]] = None,
+               timestamp: Optional[float] = None):
+        """
+        Добавляет сигнал в буфер записи
+
+        Args:
+            verdict: processed, duplicate, blacklisted или stale
+            bot_name: Имя бота в конфигурации
+            ticker: Тикер
+            direction: Направление (LONG/SHORT), если есть
+            dex_info: Результат extract_contract_info
+            message_id: ID сообщения Telegram
+            peer_id: ID чата
+            marks: Отметки времени этапов (SignalTrace.marks)
+            timestamp: Время сигнала (публикации в Telegram); по умолчанию - текущее
+        """
+        entry = {
+            'ts': round(timestamp if timestamp is not None else time.time(), 3),
+            'verdict': verdict,
+            'bot': bot_name,
+            'ticker': ticker,
+            'direction': direction,
+            'chain': dex_info['chain'] if dex_info else None,
+            'contract': dex_info['contract'] if dex_info else None,
+            'url': dex_info['url'] if dex_info else None,
+            'message_id': message_id,
+            'peer_id': peer_id,
+        }
+        if marks:
+            entry['marks'] = {stage: round(value, 3) for stage, value in marks.items()}
+        self._buffer.append(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.stats['signals'] += 1
+
+    def _segment_name(self) -> str:
+        """Имя ротированного сегмента по времени его открытия"""
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self._opened_at))
+        name = f"{self.journal_file}.{stamp}"
+        suffix = 1
+        while os.path.exists(name) or os.path.exists(f"{name}.gz"):
+            name = f"{self.journal_file}.{stamp}-{suffix}"
+            suffix += 1
+        return name
+
+    def _open(self):
+        self._file = open(self.journal_file, 'a', encoding='utf-8', buffering=64 * 1024)
+        # Для сегмента, оставшегося от прошлого запуска, берем время его последней записи
+        self._opened_at = os.path.getmtime(self.journal_file) if self._file.tell() else time.time()
+
+    def _rotate(self):
+        """Закрывает текущий сегмент и отдает его на сжатие (выполняется в потоке записи)"""
+        self._file.close()
+        self._file = None
+        segment = self._segment_name()
+        os.replace(self.journal_file, segment)
+        self._opened_at = 0.0
+        self.stats['rotations'] += 1
+        self._compressor.submit(self._compress, segment)
+
+    @staticmethod
+    def _compress(segment: str):
+        """Сжимает ротированный сегмент в .gz и удаляет исходный файл"""
+        try:
+            with open(segment, 'rb') as src, gzip.open(f"{segment}.gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(segment)
+        except OSError as e:
+            logger.error(f"Ошибка сжатия сегмента журнала {segment}: {e}")
+
+    def _write(self, lines: List[str]):
+        """Дописывает строки и при необходимости ротирует сегмент (выполняется в потоке записи)"""
+        if self._file is None:
+            self._open()
+        self._file.writelines(lines)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        if (self._file.tell() >= self.max_bytes
+                or time.time() - self._opened_at >= self.rotate_seconds):
+            self._rotate()
+
+    async def flush(self):
+        """Сбрасывает буфер на диск в потоке записи"""
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._write, lines)
+        self.stats['flushes'] += 1
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError as e:
+                logger.error(f"Ошибка записи журнала сигналов: {e}")
+
+    def start(self):
+        """Запускает фоновый сброс журнала"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Останавливает фоновый сброс, записывает остаток буфера и закрывает сегмент"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except OSError as e:
+            logger.error(f"Ошибка записи журнала сигналов: {e}")
+        if self._file is not None:
+            await asyncio.get_running_loop().run_in_executor(self._writer, self._file.close)
+            self._file = None
+        self._writer.shutdown(wait=True)
+        self._compressor.shutdown(wait=True)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Хранилище сигналов в SQLite (WAL)
+Пакетная запись в фоновом потоке и быстрые запросы истории по тикеру, контракту и боту
+"""
+
+import asyncio
+import bisect
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Окна счетчиков, как в сообщениях ботов: "Found: 15m: 1 | 3h: 1 | 24h: 1"
+WINDOWS: Tuple[Tuple[str, float], ...] = (('15m', 15 * 60), ('3h', 3 * 3600), ('24h', 24 * 3600))
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS signals (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        verdict TEXT NOT NULL,
+        bot TEXT NOT NULL,
+        ticker TEXT NOT NULL,
+        direction TEXT,
+        chain TEXT,
+        contract TEXT,
+        url TEXT,
+        message_id INTEGER,
+        peer_id TEXT
+    )""",
+    # Запросы истории - диапазон по времени внутри одного тикера, контракта или бота
+    "CREATE INDEX IF NOT EXISTS idx_signals_ticker_ts ON signals (ticker, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_signals_contract_bot_ts ON signals (contract, bot, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_signals_bot_ts ON signals (bot, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals (ts)",
+)
+
+# Самое длинное окно: столько держится в памяти для счетчиков обработчика
+WINDOW_SECONDS = max(seconds for _, seconds in WINDOWS)
+
+COLUMNS = ('ts', 'verdict', 'bot', 'ticker', 'direction', 'chain', 'contract', 'url', 'message_id', 'peer_id')
+
+def normalize_contract(contract: Optional[str]) -> Optional[str]:
+    """EVM-адреса без учета регистра, адреса Solana - как есть"""
+    if contract and contract[:2].lower() == '0x':
+        return contract.lower()
+    return contract
+
+class SignalStore:
+    """Все разобранные сигналы в SQLite с фоновой пакетной записью"""
+
+    def __init__(self, db_file: str = 'signals.db', flush_interval: float = 1.0,
+                 retention_days: float = 30):
+        """
+        Args:
+            db_file: Файл базы SQLite
+            flush_interval: Период записи накопленных сигналов в секундах
+            retention_days: Сигналы старше удаляются при запуске; 0 - хранить все
+        """
+        self.db_file = db_file
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self._buffer: List[Tuple] = []
+        # Незаписанные сигналы по контракту: запрос счетчиков не перебирает весь буфер
+        self._pending_by_contract: Dict[str, List[Tuple]] = {}
+        # Отсортированные времена сигналов (контракт, бот) за последние 24 часа:
+        # счетчики обработчика считаются в памяти, без запросов к SQLite в event loop
+        self._recent: Dict[Tuple[str, str], List[float]] = {}
+        self._pruned_at = 0.0
+        # Запись идет в одном потоке со своим соединением, чтение - из event loop через отдельное
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='signal-store')
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._load_task: Optional[asyncio.Task] = None
+        self.stats = {
+            'signals': 0,
+            'written': 0,
+            'flushes': 0,
+            'purged': 0
+        }
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file, check_same_thread=check_same_thread)
+        # WAL: читатели не ждут писателя; synchronous=NORMAL - без fsync на каждую транзакцию
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _writer_conn(self) -> sqlite3.Connection:
+        """Соединение потока записи (создается в нем же)"""
+        if self._write_conn is None:
+            self._write_conn = self._connect()
+            with self._write_conn:
+                for statement in SCHEMA:
+                    self._write_conn.execute(statement)
+        return self._write_conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """
+        Соединение для запросов (открывается в start())
+
+        Без start() - открывается здесь, дожидаясь схемы от потока записи: только для скриптов
+        """
+        if self._read_conn is None:
+            self._writer.submit(self._writer_conn).result()
+            self._read_conn = self._connect()
+        return self._read_conn
+
+    def record(self, verdict: str, bot_name: str, ticker: str, direction: Optional[str] = None,
+               dex_info: Optional[Dict] = None, message_id: Optional[int] = None,
+               peer_id=None, timestamp: Optional[float] = None):
+        """Добавляет сигнал в буфер записи (аргументы - как у SignalJournal.record)"""
+        contract = normalize_contract(dex_info['contract']) if dex_info else None
+        row = (
+            timestamp if timestamp is not None else time.time(),
+            verdict, bot_name, ticker.upper(), direction,
+            dex_info['chain'] if dex_info else None,
+            contract,
+            dex_info['url'] if dex_info else None,
+            message_id,
+            str(peer_id) if peer_id is not None else None,
+        )
+        self._buffer.append(row)
+        if contract is not None:
+            self._pending_by_contract.setdefault(contract, []).append(row)
+            self._remember(contract, bot_name, row[0])
+        self.stats['signals'] += 1
+
+    def _remember(self, contract: str, bot_name: str, timestamp: float):
+        """Добавляет сигнал в окно счетчиков (сигналы приходят почти всегда по порядку)"""
+        times = self._recent.setdefault((contract, bot_name), [])
+        if not times or timestamp >= times[-1]:
+            times.append(timestamp)
+        else:
+            bisect.insort(times, timestamp)
+
+    def _write(self, rows: List[Tuple]):
+        """Вставляет пакет одной транзакцией (выполняется в потоке записи)"""
+        conn = self._writer_conn()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO signals ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows
+            )
+
+    def _load_recent(self, since: float) -> List[Tuple]:
+        """Сигналы с контрактом за последнее окно (выполняется в потоке записи)"""
+        return self._writer_conn().execute(
+            "SELECT contract, bot, ts FROM signals WHERE ts >= ? AND contract IS NOT NULL ORDER BY ts", (since,)
+        ).fetchall()
+
+    def _purge(self, before: float) -> int:
+        """Удаляет старые сигналы (выполняется в потоке записи)"""
+        conn = self._writer_conn()
+        with conn:
+            return conn.execute("DELETE FROM signals WHERE ts < ?", (before,)).rowcount
+
+    async def flush(self):
+        """Записывает буфер в базу в потоке записи"""
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        pending_by_contract, self._pending_by_contract = self._pending_by_contract, {}
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._writer, self._write, rows)
+        except sqlite3.Error:
+            # Пакет не потерян: попадет в следующую запись
+            self._buffer[:0] = rows
+            for contract, pending in pending_by_contract.items():
+                self._pending_by_contract.setdefault(contract, [])[:0] = pending
+            raise
+        self.stats['written'] += len(rows)
+        self.stats['flushes'] += 1
+
+    def _prune(self, now: float):
+        """Убирает из окна счетчиков сигналы старше 24 часов"""
+        bound = now - WINDOW_SECONDS
+        for key in list(self._recent):
+            times = self._recent[key]
+            del times[:bisect.bisect_left(times, bound)]
+            if not times:
+                del self._recent[key]
+        self._pruned_at = now
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка записи хранилища сигналов: {e}")
+            now = time.time()
+            if now - self._pruned_at >= 60:
+                self._prune(now)
+
+    async def _open(self, load):
+        """Очистка, загрузка окна счетчиков и соединение чтения - в потоке записи, не в event loop"""
+        loop = asyncio.get_running_loop()
+        try:
+            rows = await asyncio.wrap_future(load)
+            if self.retention_days:
+                self.stats['purged'] = await loop.run_in_executor(
+                    self._writer, self._purge, time.time() - self.retention_days * 86400
+                )
+            # Схема уже создана потоком записи; соединение используется из event loop
+            reader = await loop.run_in_executor(self._writer, self._connect, False)
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка открытия хранилища сигналов: {e}")
+            return
+        if self._read_conn is None:
+            self._read_conn = reader
+        else:
+            reader.close()
+        # Сигналы этого запуска (догруженные - со старыми датами) сливаются с загруженными по времени
+        loaded: Dict[Tuple[str, str], List[float]] = {}
+        for contract, bot_name, ts in rows:
+            loaded.setdefault((contract, bot_name), []).append(ts)
+        for key, times in loaded.items():
+            self._recent[key] = sorted(times + self._recent.get(key, []))
+
+    def start(self):
+        """Запускает фоновую запись, очистку старых сигналов и загрузку окна счетчиков"""
+        if self._task is not None:
+            return
+        # Загрузка окна встает в поток записи раньше первого пакета: сигналы этого запуска
+        # в нее не попадут и не будут посчитаны дважды
+        load = self._writer.submit(self._load_recent, time.time() - WINDOW_SECONDS)
+        self._load_task = asyncio.create_task(self._open(load))
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Останавливает фоновую запись, записывает остаток буфера и закрывает базу"""
+        if self._load_task is not None:
+            await self._load_task
+            self._load_task = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка записи хранилища сигналов: {e}")
+        if self._write_conn is not None:
+            await asyncio.get_running_loop().run_in_executor(self._writer, self._write_conn.close)
+            self._write_conn = None
+        if self._read_conn is not None:
+            self._read_conn.close()
+            self._read_conn = None
+        self._writer.shutdown(wait=True)
+
+    @staticmethod
+    def _where(contract: Optional[str], ticker: Optional[str], bot_name: Optional[str]) -> Tuple[str, List]:
+        """Условие запроса под индексы (contract, bot, ts), (ticker, ts) и (bot, ts)"""
+        clauses, params = [], []
+        if contract is not None:
+            clauses.append("contract = ?")
+            params.append(normalize_contract(contract))
+        if ticker is not None:
+            clauses.append("ticker = ?")
+            params.append(ticker.upper())
+        if bot_name is not None:
+            clauses.append("bot = ?")
+            params.append(bot_name)
+        return " AND ".join(clauses) or "1", params
+
+    def _pending(self, contract: Optional[str], ticker: Optional[str], bot_name: Optional[str]) -> List[Tuple]:
+        """Еще не записанные сигналы под условие запроса"""
+        if contract is not None:
+            rows = self._pending_by_contract.get(normalize_contract(contract), [])
+        else:
+            rows = self._buffer
+        if ticker is not None:
+            ticker = ticker.upper()
+            rows = [row for row in rows if row[3] == ticker]
+        if bot_name is not None:
+            rows = [row for row in rows if row[2] == bot_name]
+        return rows
+
+    def counts(self, contract: Optional[str] = None, ticker: Optional[str] = None,
+               bot_name: Optional[str] = None, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Сколько раз сигнал встречался в окнах WINDOWS (запрос к базе)
+
+        Один проход по индексу за самое длинное окно; сигналы, еще не записанные
+        из буфера, тоже учитываются. Запрос синхронный - для скриптов и отчетов,
+        в обработчике сообщений - recent_counts()
+
+        Args:
+            contract: Адрес контракта
+            ticker: Тикер
+            bot_name: Имя бота в конфигурации
+
+        Returns:
+            {'15m': n, '3h': n, '24h': n}
+        """
+        now = now if now is not None else time.time()
+        where, params = self._where(contract, ticker, bot_name)
+        bounds = [now - seconds for _, seconds in WINDOWS]
+        sums = ", ".join("COALESCE(SUM(ts >= ?), 0)" for _ in WINDOWS)
+        row = self._reader().execute(
+            f"SELECT {sums} FROM signals WHERE {where} AND ts >= ?", bounds + params + [min(bounds)]
+        ).fetchone()
+        result = {label: count for (label, _), count in zip(WINDOWS, row)}
+
+        for pending in self._pending(contract, ticker, bot_name):
+            for (label, _), bound in zip(WINDOWS, bounds):
+                if pending[0] >= bound:
+                    result[label] += 1
+        return result
+
+    def recent_counts(self, contract: str, bot_name: str, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Счетчики окон WINDOWS для (контракт, бот) из памяти - без обращения к базе
+
+        Сигналы прошлых запусков учитываются, когда start() загрузит окно из базы
+        """
+        now = now if now is not None else time.time()
+        times = self._recent.get((normalize_contract(contract), bot_name), [])
+        return {label: len(times) - bisect.bisect_left(times, now - seconds) for label, seconds in WINDOWS}
+
+    def found_line(self, contract: str, bot_name: str) -> str:
+        """Счетчики в формате ботов: 'Found: 15m: 1 | 3h: 1 | 24h: 1'"""
+        counts = self.recent_counts(contract, bot_name)
+        return "Found: " + " | ".join(f"{label}: {count}" for label, count in counts.items())
+
+    def history(self, contract: Optional[str] = None, ticker: Optional[str] = None,
+                bot_name: Optional[str] = None, since: Optional[float] = None,
+                limit: int = 100) -> List[Dict]:
+        """Последние записанные сигналы (от новых к старым)"""
+        where, params = self._where(contract, ticker, bot_name)
+        if since is not None:
+            where += " AND ts >= ?"
+            params.append(since)
+        rows = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM signals WHERE {where} ORDER BY ts DESC LIMIT ?", params + [limit]
+        ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Замеры времени запуска мониторов
+Отметки этапов от импорта до регистрации обработчика и разбор вывода -X importtime
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+class StartupTimer:
+    """Отметки этапов запуска в миллисекундах от создания таймера"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, stage: str):
+        """Отмечает этап (повторная отметка не перезаписывает первую)"""
+        if stage not in self.marks:
+            self.marks[stage] = (time.perf_counter() - self.started) * 1000
+
+    def elapsed_ms(self, stage: str) -> Optional[float]:
+        """Время этапа от старта или None, если этап еще не пройден"""
+        return self.marks.get(stage)
+
+    def format_line(self) -> str:
+        """Строка для лога: этапы в порядке прохождения"""
+        stages = ", ".join(f"{stage} {elapsed:.0f} мс" for stage, elapsed in self.marks.items())
+        return f"⏱️ Запуск: {stages}"
+
+# Создается при первом импорте - entry point импортирует модуль раньше остальных
+STARTUP = StartupTimer()
+
+def import_breakdown(module: str, cwd: Optional[str] = None) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Импортирует модуль в отдельном процессе с -X importtime
+
+    Args:
+        module: Имя модуля или несколько через запятую
+        cwd: Рабочий каталог процесса (по умолчанию каталог проекта)
+
+    Returns:
+        (время всех импортов процесса в мс, [(пакет верхнего уровня, собственное время в мс)]
+        по убыванию времени)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd or os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+    )
+    total = 0.0
+    by_package: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        try:
+            self_ms = int(parts[0]) / 1000
+        except ValueError:
+            continue  # заголовок таблицы
+        package = parts[2].strip().split('.')[0]
+        by_package[package] = by_package.get(package, 0.0) + self_ms
+        total += self_ms
+    return total, sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+
+def main():
+    """Разбор времени импорта точек входа"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Время импорта модулей EugenBot (-X importtime)")
+    arg_parser.add_argument('modules', nargs='*',
+                            default=['advanced_monitor', 'debug_monitor', 'bot_monitor', 'telegram_bot_parser'],
+                            help="Модули для замера")
+    arg_parser.add_argument('--top', type=int, default=10, help="Сколько пакетов показать")
+    args = arg_parser.parse_args()
+
+    print("⏱️ Время импорта (собственное время пакетов, мс)")
+    print("=" * 50)
+    for module in args.modules:
+        total, packages = import_breakdown(module)
+        print(f"[{module}] всего {total:.1f} мс")
+        for package, elapsed in packages[:args.top]:
+            print(f"  {package:<28} {elapsed:10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Синтетические сообщения в форматах мониторимых ботов
+Потоковый генератор корпуса для бенчмарков и офлайн-прогонов с профилями всплесков
+"""
+
+import random
+import string
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BOT_NAMES = ('mexcTracker', 'kormushka_mexc', 'pumply_futures_dex', 'MexcDexSpreadTracker')
+
+# Условные ID чатов синтетических ботов
+PEER_IDS = {name: -1001000000001 - index for index, name in enumerate(BOT_NAMES)}
+
+HEX_CHAINS = ('ethereum', 'bsc', 'base', 'arbitrum', 'polygon')
+GMGN_CHAINS = {'ethereum': 'eth', 'bsc': 'bsc', 'base': 'base', 'arbitrum': 'arb', 'polygon': 'polygon',
+               'solana': 'sol'}
+NETWORK_NAMES = {'ethereum': 'ERC20', 'bsc': 'BEP20', 'base': 'BASE', 'arbitrum': 'ARB', 'polygon': 'MATIC',
+                 'solana': 'SOL'}
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+def _ticker(rng: random.Random) -> str:
+    return ''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 8)))
+
+def _hex_contract(rng: random.Random) -> str:
+    return '0x' + ''.join(rng.choice('0123456789abcdefABCDEF') for _ in range(40))
+
+def _mint(rng: random.Random) -> str:
+    return ''.join(rng.choice(BASE58_ALPHABET) for _ in range(rng.randint(32, 44)))
+
+def _percent(rng: random.Random) -> str:
+    return f"{rng.uniform(1, 30):.2f}"
+
+def _price(rng: random.Random) -> str:
+    return f"{rng.uniform(0.0001, 10):.{rng.randint(3, 6)}f}"
+
+def _money(rng: random.Random) -> str:
+    return f"${rng.uniform(1, 999):.2f}{rng.choice(('K', 'M'))}"
+
+def _chain_contract(rng: random.Random, solana_share: float = 0.3) -> Tuple[str, str]:
+    """Сеть и контракт: hex для EVM-сетей, base58 для Solana"""
+    if rng.random() < solana_share:
+        return 'solana', _mint(rng)
+    return rng.choice(HEX_CHAINS), _hex_contract(rng)
+
+class MessageParts:
+    """Текст сообщения, ссылки из сущностей и из кнопок"""
+
+    __slots__ = ('text', 'entity_urls', 'button_urls')
+
+    def __init__(self):
+        self.text = ""
+        self.entity_urls: List[str] = []
+        self.button_urls: List[str] = []
+
+    def link(self, label: str, url: str, hidden: bool) -> str:
+        """Ссылка в тексте: 'label (url)' как в пересылаемом тексте или скрытая в сущности"""
+        if hidden:
+            self.entity_urls.append(url)
+            return label
+        return f"{label} ({url})"
+
+class LayoutOptions:
+    """Вероятности вариантов оформления сообщения"""
+
+    __slots__ = ('full', 'hidden', 'truncated', 'buttons')
+
+    def __init__(self, full: float = 0.5, hidden: float = 0.2, truncated: float = 0.05,
+                 buttons: float = 0.3):
+        """
+        Args:
+            full: Доля полных макетов (как в gui_interface.load_test_data), остальные - краткие
+            hidden: Доля ссылок, скрытых в сущностях (текст без URL)
+            truncated: Доля сообщений с обрезанным контрактом вида "3a..."
+            buttons: Доля сообщений с inline-кнопками
+        """
+        self.full = full
+        self.hidden = hidden
+        self.truncated = truncated
+        self.buttons = buttons
+
+def mexc_tracker_message(rng: random.Random, options: LayoutOptions) -> MessageParts:
+    parts = MessageParts()
+    ticker = _ticker(rng)
+    chain, contract = _chain_contract(rng)
+    hidden = rng.random() < options.hidden
+    # Обрезанный контракт виден только в тексте, полный адрес остается в сущности ссылки
+    shown = f"{contract[:2]}..." if rng.random() < options.truncated else contract
+    dex_url = f"https://dexscreener.com/{chain}/{shown}"
+    if shown != contract:
+        parts.entity_urls.append(f"https://dexscreener.com/{chain}/{contract}")
+    exchange = rng.choice(('MEXC', 'Gate'))
+    exchange_url = (f"https://futures.mexc.com/exchange/{ticker}_USDT?inviteCode=1RTNH" if exchange == 'MEXC'
+                    else f"https://www.gate.io/futures/USDT/{ticker}_USDT?ref=VLMQUL9YCA")
+
+    lines = []
+    if rng.random() < options.full:
+        lines.append(f"{parts.link('Arbitrage', f'https://t.me/c/2447107119/{rng.randint(1000, 99999)}', hidden)} "
+                     f"with {ticker} ended {rng.randint(0, 59)}m, {rng.randint(0, 59)}s\n")
+    lines.append(f"{ticker} | {_percent(rng)}% | {rng.choice(('Long', 'Short'))} \n")
+    lines.append(f"Price {parts.link(exchange, exchange_url, hidden)}: {_price(rng)}")
+    lines.append(f"Price {parts.link('Dexscreener', dex_url, hidden)}: {_price(rng)}\n")
+    lines.append(f"CA: {shown}")
+    lines.append(f"Chain: {chain}")
+    if rng.random() < options.full:
+        lines.append("")
+        lines.append(f"Lim/V24h: {_money(rng)} / {_money(rng)};")
+        lines.append(f"DLiq/V1h/V24h: {_money(rng)} / {_money(rng)} / {_money(rng)}")
+        lines.append(f"{parts.link('Deposit', f'https://www.gate.io/wallet/withdraw/{ticker}', hidden)} / "
+                     f"{parts.link('Withdrawal', f'https://www.gate.io/wallet/deposit/{ticker}', hidden)} "
+                     f"Spot: {_price(rng)}\n")
+        lines.append("Chain         Deposit   Withdraw")
+        lines.append(f"{chain:<15} {rng.choice('✅❌')}        {rng.choice('✅❌')}\n")
+        lines.append(f"Found: 15m: {rng.randint(1, 5)} | 3h: {rng.randint(1, 20)} | 24h: {rng.randint(1, 50)}")
+        lines.append("Avg Duration (24h): N/A\n")
+        lines.append(f"{parts.link('source', 'https://t.me/mexcTracker', hidden)} // "
+                     f"{parts.link('chat', 'https://t.me/deadblog_chat', hidden)}")
+    parts.text = '\n'.join(lines)
+    if rng.random() < options.buttons:
+        parts.button_urls.append(exchange_url)
+    return parts
+
+def kormushka_message(rng: random.Random, options: LayoutOptions) -> MessageParts:
+    parts = MessageParts()
+    ticker = _ticker(rng)
+    chain, contract = _chain_contract(rng, solana_share=0.2)
+    hidden = rng.random() < options.hidden
+    mexc_url = f"https://futures.mexc.com/exchange/{ticker}_USDT"
+    gmgn_url = f"https://gmgn.ai/{GMGN_CHAINS[chain]}/token/{contract}"
+    parts.text = (f"{ticker} +{_percent(rng)}% in {rng.randint(5, 60)} secs!\n"
+                  f"{parts.link('MEXC', mexc_url, hidden)} — {parts.link('GMGN', gmgn_url, hidden)} "
+                  f"| Limit ~${rng.randint(1000, 200000)}")
+    if rng.random() < options.buttons:
+        parts.button_urls.extend((mexc_url, gmgn_url))
+    return parts
+
+def pumply_message(rng: random.Random, options: LayoutOptions) -> MessageParts:
+    parts = MessageParts()
+    ticker = _ticker(rng)
+    chain, contract = _chain_contract(rng)
+    hidden = rng.random() < options.hidden
+    pair = _hex_contract(rng).lower() if chain != 'solana' else _mint(rng)
+    dex_url = f"https://dexscreener.com/{chain}/{pair}"
+
+    lines = [f"🔻 {rng.choice(('SHORT', 'LONG'))} ${ticker} +{_percent(rng)}% on MEXC\n",
+             f"mexc: ${_price(rng)}", f"dex: ${_price(rng)}"]
+    if rng.random() < options.full:
+        lines.append(f"size: ${rng.randint(50, 5000)} (+${rng.randint(1, 500)})\n")
+        lines.append(f"deposit: {rng.choice('✅❌')}  withdraw: {rng.choice('✅❌')}\n")
+        lines.append(f"⏱️ {rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}\n")
+        lines.append(f"liquidity: {_money(rng)}")
+        lines.append(f"volume 24h: {_money(rng)}")
+    lines.append(f"network: {parts.link(NETWORK_NAMES[chain], dex_url, hidden)}")
+    lines.append(f"contract: {contract}")
+    parts.text = '\n'.join(lines)
+    if rng.random() < options.buttons:
+        parts.button_urls.append(f"https://futures.mexc.com/exchange/{ticker}_USDT")
+    return parts
+
+def spread_tracker_message(rng: random.Random, options: LayoutOptions) -> MessageParts:
+    parts = MessageParts()
+    ticker = _ticker(rng)
+    chain, contract = _chain_contract(rng, solana_share=0.7)
+    hidden = rng.random() < options.hidden
+    gmgn_url = f"https://gmgn.ai/{GMGN_CHAINS[chain]}/token/{contract}"
+    lines = [f"{rng.choice(('🔴 SHORT', '🟢 LONG'))}? #{ticker} Spread {_percent(rng)}%",
+             f"#{chain.upper()}",
+             f"MEXC: {_price(rng)} | DEX: {_price(rng)}"]
+    if rng.random() < options.full:
+        lines.append(f"Liquidity: {_money(rng)} | Volume 24h: {_money(rng)}")
+    lines.append(parts.link('GMGN', gmgn_url, hidden))
+    parts.text = '\n'.join(lines)
+    if rng.random() < options.buttons:
+        parts.button_urls.append(gmgn_url)
+    return parts
+
+FORMATS = {
+    'mexcTracker': mexc_tracker_message,
+    'kormushka_mexc': kormushka_message,
+    'pumply_futures_dex': pumply_message,
+    'MexcDexSpreadTracker': spread_tracker_message,
+}
+
+class BurstProfile:
+    """Поток времен прихода сообщений: фон и периодические всплески"""
+
+    def __init__(self, rate: float, burst_every: float = 0.0, burst_size: int = 0,
+                 burst_spread: float = 1.0, repeat_ratio: float = 0.0):
+        """
+        Args:
+            rate: Фоновая интенсивность, сообщений в секунду
+            burst_every: Средний интервал между всплесками в секундах (0 - без всплесков)
+            burst_size: Сообщений во всплеске
+            burst_spread: За сколько секунд приходит весь всплеск
+            repeat_ratio: Доля повторно доставленных сообщений во всплеске
+                (как догоняющая пачка после переподключения)
+        """
+        self.rate = rate
+        self.burst_every = burst_every
+        self.burst_size = burst_size
+        self.burst_spread = burst_spread
+        self.repeat_ratio = repeat_ratio
+
+    def arrivals(self, rng: random.Random, start: float) -> Iterator[Tuple[float, bool]]:
+        """Бесконечный поток (время, входит ли сообщение во всплеск)"""
+        background = start + rng.expovariate(self.rate)
+        next_burst = start + rng.expovariate(1 / self.burst_every) if self.burst_every else None
+        pending: List[float] = []
+        while True:
+            if not pending and next_burst is not None and next_burst <= background:
+                pending = sorted((next_burst + rng.uniform(0, self.burst_spread)
+                                  for _ in range(self.burst_size)), reverse=True)
+                next_burst += rng.expovariate(1 / self.burst_every)
+            # Фоновые сообщения перемежаются со всплеском в порядке времени
+            if pending and pending[-1] <= background:
+                yield pending.pop(), True
+            else:
+                yield background, False
+                background += rng.expovariate(self.rate)
+
+PROFILES = {
+    # Ровный поток: сигнал раз в ~5 секунд
+    'steady': BurstProfile(rate=0.2),
+    # Рыночные всплески: 20 сигналов за 2 секунды раз в ~5 минут
+    'bursty': BurstProfile(rate=0.05, burst_every=300, burst_size=20, burst_spread=2.0),
+    # Переподключение: 200 сообщений за секунду раз в ~10 минут, треть - повторы
+    'reconnect': BurstProfile(rate=0.1, burst_every=600, burst_size=200, burst_spread=1.0,
+                              repeat_ratio=0.3),
+}
+
+def generate_records(count: int, seed: int = 0, profile: str = 'steady',
+                     start: Optional[float] = None,
+                     options: Optional[LayoutOptions] = None) -> Iterator[Dict]:
+    """
+    Потоково выдает записи корпуса (формат corpus.CORPUS_FIELDS)
+
+    Args:
+        count: Количество записей
+        seed: Зерно генератора (одинаковое зерно - одинаковый поток)
+        profile: Имя профиля из PROFILES или готовый BurstProfile
+        start: Время первого сообщения (по умолчанию - текущее)
+        options: Вероятности вариантов оформления
+    """
+    rng = random.Random(seed)
+    burst_profile = PROFILES[profile] if isinstance(profile, str) else profile
+    options = options or LayoutOptions()
+    arrivals = burst_profile.arrivals(rng, time.time() if start is None else start)
+    message_ids = {name: 0 for name in BOT_NAMES}
+    recent: List[Dict] = []
+
+    for _ in range(count):
+        date, in_burst = next(arrivals)
+        if in_burst and recent and rng.random() < burst_profile.repeat_ratio:
+            # Повторная доставка уже отправленного сообщения
+            record = dict(rng.choice(recent))
+            record['date'] = round(date, 3)
+            yield record
+            continue
+
+        bot_name = rng.choice(BOT_NAMES)
+        parts = FORMATS[bot_name](rng, options)
+        message_ids[bot_name] += 1
+        record = {
+            'bot': bot_name,
+            'sender': bot_name,
+            'peer_id': PEER_IDS[bot_name],
+            'message_id': message_ids[bot_name],
+            'date': round(date, 3),
+            'text': parts.text,
+            'entity_urls': parts.entity_urls,
+            'button_urls': parts.button_urls,
+        }
+        recent.append(record)
+        if len(recent) > 500:
+            del recent[:250]
+        yield record
+
+def generate_messages(count: int, seed: int = 0, profile: str = 'steady',
+                      options: Optional[LayoutOptions] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Потоково выдает (имя бота, текст) - текст дополнен ссылками сущностей и кнопок,
+    как его видит парсер монитора
+    """
+    for record in generate_records(count, seed, profile, start=0.0, options=options):
+        urls = record['entity_urls'] + record['button_urls']
+        text = record['text']
+        if urls:
+            text = f"{text}\n" + " \n".join(urls)
+        yield record['bot'], text
+
+def main():
+    """Запись синтетического корпуса"""
+    import argparse
+    import json
+
+    from corpus import write_corpus
+
+    arg_parser = argparse.ArgumentParser(description="Синтетический корпус сообщений ботов")
+    arg_parser.add_argument('--count', type=int, default=100000, help="Количество сообщений")
+    arg_parser.add_argument('--seed', type=int, default=0, help="Зерно генератора")
+    arg_parser.add_argument('--profile', default='steady', choices=sorted(PROFILES), help="Профиль всплесков")
+    arg_parser.add_argument('--out', default='-', help="Файл корпуса (.jsonl, .jsonl.gz) или - для stdout")
+    arg_parser.add_argument('--full', type=float, default=0.5, help="Доля полных макетов")
+    arg_parser.add_argument('--hidden', type=float, default=0.2, help="Доля скрытых ссылок")
+    arg_parser.add_argument('--truncated', type=float, default=0.05, help="Доля обрезанных контрактов")
+    arg_parser.add_argument('--buttons', type=float, default=0.3, help="Доля сообщений с кнопками")
+    args = arg_parser.parse_args()
+
+    options = LayoutOptions(full=args.full, hidden=args.hidden, truncated=args.truncated, buttons=args.buttons)
+    records = generate_records(args.count, args.seed, args.profile, options=options)
+    if args.out == '-':
+        for record in records:
+            sys.stdout.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        return
+    count = write_corpus(args.out, records)
+    print(f"💾 Записано {count} сообщений в {args.out} (профиль {args.profile})")
+
+if __name__ == "__main__":
+    main()